@@ -11,6 +11,12 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from djisco.cache import check_shared_cache
+from djisco.template_loading import warm_template_cache
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "djisco.settings.prod")
 
 application = get_asgi_application()
+
+check_shared_cache()
+warm_template_cache()
@@ -0,0 +1,296 @@
+import pickle
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.functional import cached_property
+
+# The local tier is shared by every thread in the process, as with
+# LocMemCache, keyed by the cache's LOCATION
+_local_tiers = {}
+_local_tiers_lock = threading.Lock()
+
+_MISSING = object()
+
+
+def check_shared_cache(alias="shared"):
+    """
+    Refuse to serve without a location for the shared cache tier, such as
+    when prod's REDIS_URL is not set. Called as the servers start rather
+    than from the settings, so management commands that never touch the
+    cache still run without one.
+    """
+    if not settings.CACHES[alias].get("LOCATION"):
+        raise ImproperlyConfigured(
+            f"Set a LOCATION for the {alias!r} cache, from REDIS_URL in prod"
+        )
+
+
+class LocalTier:
+    """
+    A bounded, thread safe LRU of pickled values with expiry times.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = Counter()
+        self.flights = {}
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self.entries.pop(key, None)
+                self.stats["misses"] += 1
+                return _MISSING
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+        return pickle.loads(entry[1])
+
+    def set(self, key, value, timeout):
+        if timeout is not None and timeout <= 0:
+            self.delete(key)
+            return
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.entries[key] = (time.monotonic() + timeout, pickled)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def delete(self, key):
+        with self.lock:
+            return self.entries.pop(key, None) is not None
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def flight(self, key):
+        """
+        The lock that threads computing a value for key queue behind.
+        """
+        with self.lock:
+            lock = self.flights.get(key)
+            if lock is None:
+                lock = self.flights[key] = _Flight(self, key)
+            lock.waiters += 1
+            return lock
+
+
+class _Flight:
+    def __init__(self, tier, key):
+        self.tier = tier
+        self.key = key
+        self.lock = threading.Lock()
+        self.waiters = 0
+
+    def __enter__(self):
+        self.lock.acquire()
+
+    def __exit__(self, *exc_info):
+        self.lock.release()
+        with self.tier.lock:
+            self.waiters -= 1
+            if not self.waiters:
+                del self.tier.flights[self.key]
+
+
+class TieredCache(BaseCache):
+    """
+    A small in-process LRU in front of a cache shared by every worker.
+
+    OPTIONS:
+        SHARED: alias of the shared cache in settings.CACHES ("shared")
+        LOCAL_MAX_ENTRIES: entries kept in each process (1000)
+        LOCAL_TIMEOUT: the most seconds an entry is kept in a process (5)
+        LOCK_TIMEOUT: seconds get_or_set waits on another worker's
+            computation before computing the value itself (10)
+
+    Writes go through to both tiers, and reads fill the local tier from the
+    shared one. A process never sees its own writes late. Other processes
+    see them within LOCAL_TIMEOUT seconds, since their local tiers are not
+    told of the change.
+
+    get_or_set() is single-flight: one thread per process, and one process
+    per shared cache, computes a missing value while the rest wait for it.
+    stats() reports hits and misses for each tier in this process, which
+    events.cache.log_cache_stats logs.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.shared_alias = options.get("SHARED", "shared")
+        self.local_timeout = options.get("LOCAL_TIMEOUT", 5)
+        self.lock_timeout = options.get("LOCK_TIMEOUT", 10)
+        with _local_tiers_lock:
+            self.local = _local_tiers.setdefault(
+                location, LocalTier(options.get("LOCAL_MAX_ENTRIES", 1000))
+            )
+
+    @cached_property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def _local_key(self, key, version):
+        return self.make_and_validate_key(key, version=version)
+
+    def _resolve_timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def _local_timeout(self, timeout):
+        if timeout is None:
+            return self.local_timeout
+        return min(timeout, self.local_timeout)
+
+    def _shared_get(self, key, version):
+        value = self.shared.get(key, _MISSING, version=version)
+        self.local.stats[
+            "shared_hits" if value is not _MISSING else "shared_misses"
+        ] += 1
+        return value
+
+    def get(self, key, default=None, version=None):
+        local_key = self._local_key(key, version)
+        value = self.local.get(local_key)
+        if value is _MISSING:
+            value = self._shared_get(key, version)
+            if value is _MISSING:
+                return default
+            self.local.set(local_key, value, self.local_timeout)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._resolve_timeout(timeout)
+        self.shared.set(key, value, timeout, version=version)
+        self.local.set(
+            self._local_key(key, version), value, self._local_timeout(timeout)
+        )
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._resolve_timeout(timeout)
+        local_key = self._local_key(key, version)
+        if not self.shared.add(key, value, timeout, version=version):
+            return False
+        self.local.set(local_key, value, self._local_timeout(timeout))
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self.local.delete(self._local_key(key, version))
+        return self.shared.touch(key, self._resolve_timeout(timeout), version=version)
+
+    def delete(self, key, version=None):
+        self.local.delete(self._local_key(key, version))
+        return self.shared.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version=version) is not _MISSING
+
+    def incr(self, key, delta=1, version=None):
+        self.local.delete(self._local_key(key, version))
+        return self.shared.incr(key, delta, version=version)
+
+    def get_many(self, keys, version=None):
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.local.get(self._local_key(key, version))
+            if value is _MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        if missing:
+            shared_found = self.shared.get_many(missing, version=version)
+            self.local.stats["shared_hits"] += len(shared_found)
+            self.local.stats["shared_misses"] += len(missing) - len(shared_found)
+            for key, value in shared_found.items():
+                self.local.set(self._local_key(key, version), value, self.local_timeout)
+            found.update(shared_found)
+        return found
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._resolve_timeout(timeout)
+        failed = self.shared.set_many(data, timeout, version=version)
+        for key, value in data.items():
+            if key not in failed:
+                self.local.set(
+                    self._local_key(key, version), value, self._local_timeout(timeout)
+                )
+        return failed
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self.local.delete(self._local_key(key, version))
+        self.shared.delete_many(keys, version=version)
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        value = self.get(key, _MISSING, version=version)
+        if value is not _MISSING:
+            return value
+        if not callable(default):
+            self.add(key, default, timeout, version=version)
+            return self.get(key, default, version=version)
+
+        with self.local.flight(self._local_key(key, version)):
+            # Another thread may have filled it while this one queued
+            value = self.get(key, _MISSING, version=version)
+            if value is not _MISSING:
+                return value
+
+            lock_key = f"{key}:lock"
+            if self.shared.add(lock_key, 1, self.lock_timeout, version=version):
+                try:
+                    value = default()
+                    self.set(key, value, timeout, version=version)
+                finally:
+                    self.shared.delete(lock_key, version=version)
+                return value
+
+            # Another process is computing it - wait for its result
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                value = self.get(key, _MISSING, version=version)
+                if value is not _MISSING:
+                    return value
+            value = default()
+            self.set(key, value, timeout, version=version)
+            return value
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+    def stats(self):
+        """
+        Hits and misses for each tier, counted in this process.
+        """
+
+        def tier_stats(hits, misses):
+            lookups = hits + misses
+            return {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / lookups if lookups else None,
+            }
+
+        stats = self.local.stats
+        return {
+            "local": {
+                **tier_stats(stats["hits"], stats["misses"]),
+                "entries": len(self.local.entries),
+                "evictions": stats["evictions"],
+            },
+            "shared": tier_stats(stats["shared_hits"], stats["shared_misses"]),
+        }
@@ -0,0 +1,20 @@
+"""
+Gunicorn config for serving djisco.asgi:application with uvicorn workers.
+
+    gunicorn -c python:djisco.gunicorn_asgi djisco.asgi:application
+
+Each worker runs an event loop, so it serves many live streams and async
+page views at once rather than one request per worker as the WSGI service
+does.
+"""
+
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8052")
+workers = int(os.getenv("GUNICORN_WORKERS", 2))
+worker_class = "uvicorn.workers.UvicornWorker"
+# Live streams end themselves after EVENTS_LIVE_STREAM_SECONDS, so workers
+# restarting on deploy wait a little for them rather than cutting them off
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+accesslog = "-"
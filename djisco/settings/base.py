@@ -30,7 +30,7 @@ MIDDLEWARE = [
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "users.middleware.CachedAuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -65,6 +65,26 @@ DATABASES = {
 
 ROOT_URLCONF = "djisco.urls"
 
+# Every cache lookup goes through a small per-process LRU in front of the
+# "shared" cache (see djisco.cache.TieredCache). The shared tier is local
+# memory here, so tests stay isolated - dev and prod share it between
+# workers.
+CACHES = {
+    "default": {
+        "BACKEND": "djisco.cache.TieredCache",
+        "LOCATION": "default",
+        "OPTIONS": {
+            "SHARED": "shared",
+            "LOCAL_MAX_ENTRIES": 1000,
+            "LOCAL_TIMEOUT": 5,
+        },
+    },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "shared",
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -95,3 +115,57 @@ STATICFILES_DIRS = [BASE_DIR / "staticfiles/"]
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 LOGIN_REDIRECT_URL = "/events/"
+
+# Session engines by storage mode, chosen with SESSION_ENGINE. "cache"
+# keeps sessions in the cache, saving them to the database at most every
+# SESSION_WRITE_BEHIND_SECONDS (see users.sessions), and "signed_cookies"
+# keeps them in the browser.
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cache": "users.sessions",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+SESSION_ENGINE = SESSION_ENGINES["db"]
+SESSION_WRITE_BEHIND_SECONDS = 300
+# Past the per-process tier, so a logout is seen by every worker at once
+SESSION_CACHE_ALIAS = "shared"
+
+# Messages go in a cookie, rather than a session write and read per message
+MESSAGE_STORAGE = "django.contrib.messages.storage.cookie.CookieStorage"
+
+# Serve event list and detail pages to anonymous users from a page cache,
+# rendered as of the start of buckets this many seconds long. 0 disables it.
+EVENTS_PAGE_CACHE_SECONDS = 0
+
+# Each worker logs its cache hit rates after a request at most this often,
+# see events.cache.log_cache_stats. 0 disables it.
+EVENTS_CACHE_STATS_LOG_SECONDS = 0
+
+# How long event list result counts are cached for. On PostgreSQL, filters
+# the planner expects to match more rows than the threshold are estimated
+# rather than counted.
+EVENTS_COUNT_CACHE_SECONDS = 60
+EVENTS_COUNT_ESTIMATE_THRESHOLD = 10_000
+
+# Attendance POSTs sent with an Idempotency-Key header are answered from the
+# cache when repeated within this many seconds
+EVENTS_IDEMPOTENCY_SECONDS = 60
+
+# The most events one attendance status request may ask about
+EVENTS_ATTENDANCE_STATUS_MAX_IDS = 50
+
+# Contribution item titles suggested per autocomplete request. Without
+# pg_trgm they come from an in-memory index, which with background rebuilds
+# on is rebuilt in a thread of its own when items change, the old one
+# answering meanwhile - off here, so tests see their own changes at once.
+EVENTS_AUTOCOMPLETE_LIMIT = 10
+EVENTS_AUTOCOMPLETE_BACKGROUND_REBUILD = False
+
+# Live attendee counts are polled for by each worker this often, and each
+# stream is ended for the browser to reconnect after the stream length
+EVENTS_LIVE_POLL_SECONDS = 2
+EVENTS_LIVE_STREAM_SECONDS = 300
+
+# Serve the event and profile pages with their async views, as the ASGI
+# application does - nginx sends their requests to it
+EVENTS_ASYNC_VIEWS = False
@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 from dotenv import load_dotenv
 
@@ -30,3 +31,10 @@ DATABASES = {
         "PORT": "5432",
     }
 }
+
+CACHES["shared"] = {  # noqa: F405
+    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+    "LOCATION": os.path.join(tempfile.gettempdir(), "djisco-cache"),
+    # Sessions are kept here too, so far past the default of 300
+    "OPTIONS": {"MAX_ENTRIES": 20000},
+}
@@ -1,4 +1,5 @@
 import os
+
 from dotenv import load_dotenv
 
 from .base import *  # noqa: F401, F403
@@ -26,6 +27,36 @@ STATIC_ROOT = os.getenv("DJANGO_STATIC_ROOT")  # noqa: F405
 
 SECRET_KEY = os.getenv("DJANGO_SECRET_KEY")
 
+EVENTS_PAGE_CACHE_SECONDS = int(os.getenv("EVENTS_PAGE_CACHE_SECONDS", 30))
+EVENTS_AUTOCOMPLETE_BACKGROUND_REBUILD = True
+EVENTS_ASYNC_VIEWS = os.getenv("EVENTS_ASYNC_VIEWS") == "1"
+EVENTS_CACHE_STATS_LOG_SECONDS = int(os.getenv("EVENTS_CACHE_STATS_LOG_SECONDS", 300))
+
+SESSION_ENGINE = SESSION_ENGINES[os.getenv("SESSION_STORAGE", "cache")]  # noqa: F405
+
+# Compiled templates are kept for the life of the worker, and every project
+# template is compiled at boot - see djisco.template_loading
+TEMPLATES[0]["APP_DIRS"] = False  # noqa: F405
+TEMPLATES[0]["OPTIONS"]["loaders"] = [  # noqa: F405
+    (
+        "django.template.loaders.cached.Loader",
+        [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ],
+    ),
+]
+
+# The shared tier must be shared by every web and asgi worker, in every
+# container - a per-container fallback would leave each with its own
+# sessions and a logout seen by only some of them. The servers refuse to
+# start without REDIS_URL (see djisco.cache.check_shared_cache), while
+# collectstatic at build time, which never uses the cache, runs without it.
+CACHES["shared"] = {  # noqa: F405
+    "BACKEND": "django.core.cache.backends.redis.RedisCache",
+    "LOCATION": os.getenv("REDIS_URL"),
+}
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -39,5 +70,9 @@ LOGGING = {
             "handlers": ["console"],
             "level": "INFO",
         },
+        "events": {
+            "handlers": ["console"],
+            "level": "INFO",
+        },
     },
 }
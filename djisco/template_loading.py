@@ -0,0 +1,34 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.cached import Loader as CachedLoader
+
+
+def warm_template_cache():
+    """
+    Compile every project template into the cached template loader, so the
+    first request for each page in a worker does not pay to load and parse
+    it and everything it includes.
+
+    Templates from outside the project, such as the admin's, are left to
+    load on first use. Engines without the cached loader are skipped.
+    Returns the names of the templates compiled.
+    """
+    names = set()
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        engine = backend.engine
+        for loader in engine.template_loaders:
+            if not isinstance(loader, CachedLoader):
+                continue
+            for directory in map(Path, loader.get_dirs()):
+                if not directory.is_relative_to(settings.BASE_DIR):
+                    continue
+                for path in directory.rglob("*.html"):
+                    name = path.relative_to(directory).as_posix()
+                    engine.get_template(name)
+                    names.add(name)
+    return sorted(names)
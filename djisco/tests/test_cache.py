@@ -0,0 +1,148 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from djisco.cache import TieredCache, check_shared_cache
+
+
+class TieredCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        self.shared = caches["shared"]
+        self.cache = self.get_cache()
+        self.cache.clear()
+        self.cache.local.stats.clear()
+
+    def get_cache(self, **options):
+        return TieredCache(
+            self.id(),
+            {"OPTIONS": {"SHARED": "shared", "LOCAL_MAX_ENTRIES": 3, **options}},
+        )
+
+    def test_reads_fill_the_local_tier_from_the_shared_one(self):
+        self.shared.set("key", "value")
+
+        self.assertEqual(self.cache.get("key"), "value")
+        self.shared.delete("key")
+        self.assertEqual(self.cache.get("key"), "value")
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["local"]["hits"], 1)
+        self.assertEqual(stats["local"]["misses"], 1)
+        self.assertEqual(stats["shared"]["hits"], 1)
+        self.assertEqual(stats["shared"]["hit_rate"], 1)
+
+    def test_writes_go_through_to_both_tiers(self):
+        self.cache.set("key", "value")
+
+        self.assertEqual(self.shared.get("key"), "value")
+        self.assertEqual(self.cache.get("key"), "value")
+        self.assertEqual(self.cache.stats()["shared"]["hits"], 0)
+
+    def test_local_tier_shares_entries_between_instances(self):
+        self.cache.set("key", "value")
+        self.shared.delete("key")
+
+        self.assertEqual(self.get_cache().get("key"), "value")
+
+    def test_local_tier_is_bounded(self):
+        for i in range(4):
+            self.cache.set(f"key_{i}", i)
+        self.cache.get("key_1")
+        self.cache.set("key_4", 4)
+
+        self.assertEqual(
+            set(self.cache.local.entries),
+            {self.cache.make_key(key) for key in ("key_1", "key_3", "key_4")},
+        )
+        self.assertEqual(self.cache.stats()["local"]["evictions"], 2)
+
+    def test_other_processes_writes_are_seen_after_local_timeout(self):
+        cache = self.get_cache(LOCAL_TIMEOUT=0.05)
+        cache.set("key", "old")
+        # As another worker would, straight to the shared tier
+        self.shared.set("key", "new")
+
+        self.assertEqual(cache.get("key"), "old")
+        time.sleep(0.06)
+        self.assertEqual(cache.get("key"), "new")
+
+    def test_per_key_timeouts(self):
+        self.cache.set("short", "value", 0.05)
+        self.cache.set("long", "value", 60)
+        time.sleep(0.06)
+
+        self.assertIsNone(self.cache.get("short"))
+        self.assertEqual(self.cache.get("long"), "value")
+
+    def test_delete_and_get_many(self):
+        self.cache.set_many({"a": 1, "b": 2})
+        self.shared.set("c", 3)
+        self.cache.delete("a")
+
+        self.assertEqual(self.cache.get_many(["a", "b", "c"]), {"b": 2, "c": 3})
+        self.assertIsNone(self.shared.get("a"))
+
+    def test_incr_drops_the_local_copy(self):
+        self.cache.set("count", 1)
+
+        self.assertEqual(self.cache.incr("count"), 2)
+        self.assertEqual(self.cache.get("count"), 2)
+
+    def test_get_or_set_computes_once_across_threads(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(self.cache.get_or_set("key", compute))
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ["value"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.cache.local.flights, {})
+
+    def test_get_or_set_waits_for_another_process(self):
+        # Another worker holds the lock and is computing the value
+        self.shared.add("key:lock", 1)
+        timer = threading.Timer(0.1, lambda: self.shared.set("key", "theirs"))
+        timer.start()
+
+        value = self.cache.get_or_set("key", lambda: "ours")
+
+        timer.join()
+        self.assertEqual(value, "theirs")
+
+    def test_get_or_set_computes_when_the_lock_times_out(self):
+        cache = self.get_cache(LOCK_TIMEOUT=0.1)
+        self.shared.add("key:lock", 1)
+
+        self.assertEqual(cache.get_or_set("key", lambda: "ours"), "ours")
+
+
+class CheckSharedCacheTestCase(SimpleTestCase):
+    def test_passes_with_a_location(self):
+        check_shared_cache()
+
+    def test_refuses_a_shared_cache_without_a_location(self):
+        caches_without_location = {
+            **settings.CACHES,
+            "shared": {**settings.CACHES["shared"], "LOCATION": None},
+        }
+        with override_settings(CACHES=caches_without_location):
+            with self.assertRaises(ImproperlyConfigured):
+                check_shared_cache()
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.template import engines
+from django.test import SimpleTestCase, override_settings
+
+from djisco.template_loading import warm_template_cache
+
+CACHED_TEMPLATES = [
+    {
+        **settings.TEMPLATES[0],
+        "APP_DIRS": False,
+        "OPTIONS": {
+            **settings.TEMPLATES[0]["OPTIONS"],
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    ["django.template.loaders.app_directories.Loader"],
+                )
+            ],
+        },
+    }
+]
+
+
+class WarmTemplateCacheTestCase(SimpleTestCase):
+    @override_settings(TEMPLATES=CACHED_TEMPLATES)
+    def test_project_templates_are_compiled(self):
+        names = warm_template_cache()
+
+        self.assertIn("events/event_list.html", names)
+        self.assertIn("users/profile_detail.html", names)
+        self.assertFalse(any(name.startswith("admin/") for name in names))
+        cached_loader = engines["django"].engine.template_loaders[0]
+        self.assertTrue(set(names) <= set(cached_loader.get_template_cache))
+
+    @override_settings(
+        TEMPLATES=[
+            {
+                **CACHED_TEMPLATES[0],
+                "OPTIONS": {
+                    **CACHED_TEMPLATES[0]["OPTIONS"],
+                    "loaders": ["django.template.loaders.app_directories.Loader"],
+                },
+            }
+        ]
+    )
+    def test_engines_without_the_cached_loader_are_skipped(self):
+        self.assertEqual(warm_template_cache(), [])
@@ -12,7 +12,13 @@ import os
 import dotenv
 from django.core.wsgi import get_wsgi_application
 
+from djisco.cache import check_shared_cache
+from djisco.template_loading import warm_template_cache
+
 dotenv.load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env"))
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "djisco.settings.prod")
 
 application = get_wsgi_application()
+
+check_shared_cache()
+warm_template_cache()
@@ -7,10 +7,34 @@ from .models import (
     ContributionItem,
     ContributionRequirement,
     Event,
+    WaitlistEntry,
 )
 
+
+# The __str__ methods of these models follow foreign keys, so the change
+# lists select them up front rather than once per row.
+@admin.register(RSVP)
+class RSVPAdmin(admin.ModelAdmin):
+    list_select_related = ["event"]
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_select_related = ["event"]
+
+
+@admin.register(ContributionRequirement)
+class ContributionRequirementAdmin(admin.ModelAdmin):
+    list_select_related = ["contribution_item"]
+
+
+@admin.register(ContributionCommitment)
+class ContributionCommitmentAdmin(admin.ModelAdmin):
+    list_select_related = [
+        "RSVP__user",
+        "contribution_requirement__contribution_item",
+    ]
+
+
 admin.site.register(Event)
-admin.site.register(RSVP)
-admin.site.register(ContributionRequirement)
-admin.site.register(ContributionCommitment)
 admin.site.register(ContributionItem)
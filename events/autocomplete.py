@@ -0,0 +1,163 @@
+import logging
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+TRIGRAM_INDEX = "contribution_item_normalized_title_trgm_idx"
+
+# Whether each database has TRIGRAM_INDEX, by alias
+has_trigram_index = {}
+
+
+def normalize_title(title):
+    """
+    The form of a contribution item title that near-duplicates share, so
+    "Beer", " beer " and "Beers" are all "beer".
+
+    Case, accents, punctuation and spacing are dropped, and each word is
+    crudely singularised.
+    """
+    title = unicodedata.normalize("NFKD", title.casefold())
+    title = "".join(char for char in title if not unicodedata.combining(char))
+    return " ".join(singularize(word) for word in re.findall(r"\w+", title))
+
+
+def uses_trigram_index(alias):
+    """
+    Whether the database has the pg_trgm index on normalized titles, which
+    migration 0013 only creates where the extension could be installed.
+    """
+    if alias not in has_trigram_index:
+        connection = connections[alias]
+        if connection.vendor != "postgresql":
+            has_trigram_index[alias] = False
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM pg_indexes WHERE indexname = %s", [TRIGRAM_INDEX]
+                )
+                has_trigram_index[alias] = cursor.fetchone() is not None
+    return has_trigram_index[alias]
+
+
+def singularize(word):
+    if len(word) > 4 and word.endswith("ies"):
+        word = f"{word[:-3]}y"
+    elif word.endswith(("sses", "xes", "ches", "shes")):
+        word = word[:-2]
+    elif len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+    if len(word) > 4 and word.endswith("ie"):
+        # So "cookie" and "cookies" meet at "cooky"
+        word = f"{word[:-2]}y"
+    return word
+
+
+class TitleIndex:
+    """
+    Contribution item titles by normalized prefix, for autocomplete on
+    databases without pg_trgm.
+
+    A trie flattened into sorted arrays - one of the normalized titles,
+    one of the titles from each later word on, so "craft lager" is found
+    by "lag" too - searched with bisect. That takes a fraction of the
+    memory of a tree of nodes for hundreds of thousands of titles, and
+    answers in microseconds. It is rebuilt whenever the version it was
+    built from moves on, see events.cache.bump_contribution_item_version.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.titles = ([], [])
+        self.words = ([], [])
+        self.lock = threading.Lock()
+        # The thread of the rebuild in progress, if any
+        self.thread = None
+
+    def ensure_current(self, version, load_items, background=False):
+        """
+        Rebuild from load_items() unless already built at version.
+
+        Only the first build is waited for. After that, while one thread
+        rebuilds, the others go on searching the index it is replacing -
+        and with background on, the rebuild runs in a thread of its own
+        rather than holding up a request, as loading and sorting hundreds
+        of thousands of titles takes over a second.
+        """
+        if self.version == version:
+            return
+        if not self.lock.acquire(blocking=self.version is None):
+            return
+        if self.version is None or not background:
+            try:
+                if self.version != version:
+                    self.rebuild(load_items(), version)
+            finally:
+                self.lock.release()
+            return
+        self.thread = threading.Thread(
+            target=self.rebuild_in_background, args=(version, load_items), daemon=True
+        )
+        self.thread.start()
+
+    def rebuild_in_background(self, version, load_items):
+        try:
+            self.rebuild(load_items(), version)
+        except Exception:
+            logger.exception("Rebuilding the contribution item title index failed")
+        finally:
+            # The thread's own connections, opened by load_items()
+            connections.close_all()
+            self.lock.release()
+
+    def rebuild(self, items, version):
+        """
+        Build from (pk, title, normalized_title) rows, in pk order so items
+        with the same normalized title are suggested oldest first.
+        """
+        title_keys, title_items = [], []
+        word_keys, word_items = [], []
+        for pk, title, normalized_title in items:
+            item = (pk, title)
+            title_keys.append(normalized_title)
+            title_items.append(item)
+            start = normalized_title.find(" ") + 1
+            while start:
+                word_keys.append(normalized_title[start:])
+                word_items.append(item)
+                start = normalized_title.find(" ", start) + 1
+        # Swapped in whole, so searches in other threads never see half
+        self.titles = self.sort(title_keys, title_items)
+        self.words = self.sort(word_keys, word_items)
+        self.version = version
+
+    @staticmethod
+    def sort(keys, items):
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        return [keys[i] for i in order], [items[i] for i in order]
+
+    def search(self, prefix, limit):
+        """
+        Up to limit (pk, title) pairs whose normalized title starts with
+        prefix, then those with a later word that does.
+        """
+        matches = {}
+        for keys, items in (self.titles, self.words):
+            index = bisect_left(keys, prefix)
+            while (
+                len(matches) < limit
+                and index < len(keys)
+                and keys[index].startswith(prefix)
+            ):
+                pk, title = items[index]
+                matches.setdefault(pk, title)
+                index += 1
+        return list(matches.items())
+
+
+title_index = TitleIndex()
@@ -0,0 +1,229 @@
+import datetime
+import logging
+import time
+from collections import Counter
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import request_finished
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils import timezone
+
+EVENT_VERSION_KEY = "events:version:{pk}"
+FRAGMENT_KEY = "events:fragment:{name}:{pk}:{version}:{vary_on}"
+FRAGMENT_TIMEOUT = 60 * 60 * 24
+PAGE_GENERATION_KEY = "events:page-generation"
+ATTENDANCE_GENERATION_KEY = "events:attendance-generation"
+PAGE_KEY = "events:page:{generation}:{bucket}:{path}"
+COUNT_GENERATION_KEY = "events:count-generation"
+COUNT_KEY = "events:count:{generation}:{name}"
+ATTENDANCE_KEY = "events:attendance:{user}:{pk}:{action}:{idempotency_key}"
+CONTRIBUTION_ITEM_VERSION_KEY = "events:contribution-item-version"
+
+logger = logging.getLogger(__name__)
+
+# Hits and misses per kind of cache in this process, see get_cache_stats
+cache_stats = Counter()
+# When this process last logged them, see log_cache_stats_periodically
+cache_stats_logged_at = time.monotonic()
+
+
+def get_event_versions(pks):
+    """
+    The current version stamp of each event, seeding any that are missing.
+
+    Stamps are nanosecond timestamps, so a stamp seeded after an eviction
+    never repeats one that fragments were cached under before.
+    """
+    keys = {pk: EVENT_VERSION_KEY.format(pk=pk) for pk in pks}
+    versions = cache.get_many(keys.values())
+    for pk, key in keys.items():
+        if key not in versions:
+            # add, not set - another process may have seeded it meanwhile
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return {pk: versions[key] for pk, key in keys.items()}
+
+
+def attach_event_versions(events):
+    """
+    Set cache_version on each event, with one cache lookup for them all.
+    """
+    versions = get_event_versions([event.pk for event in events])
+    for event in events:
+        event.cache_version = versions[event.pk]
+    return events
+
+
+def bump_event_version(pk):
+    """
+    Invalidate every fragment cached for an event.
+
+    The stamp is bumped straight away and again once the transaction
+    commits, so a fragment rendered from the old rows by a concurrent
+    request in between is not kept.
+    """
+    key = EVENT_VERSION_KEY.format(pk=pk)
+    cache.set(key, time.time_ns(), timeout=None)
+    transaction.on_commit(lambda: cache.set(key, time.time_ns(), timeout=None))
+
+
+def get_page_generation():
+    return cache.get_or_set(PAGE_GENERATION_KEY, time.time_ns, timeout=None)
+
+
+def bump_page_generation():
+    """
+    Drop every cached page - list pages can show any event, so a change to
+    one means none of them can be trusted. Bumped now and on commit, as
+    with bump_event_version.
+
+    Not bumped for attendance, which changes far too often for cached pages
+    to survive it. The pages bring their attendee counts up to date in the
+    browser instead, from the attendance status and stream views.
+    """
+    cache.set(PAGE_GENERATION_KEY, time.time_ns(), timeout=None)
+    transaction.on_commit(
+        lambda: cache.set(PAGE_GENERATION_KEY, time.time_ns(), timeout=None)
+    )
+
+
+def get_attendance_generation():
+    return cache.get_or_set(ATTENDANCE_GENERATION_KEY, time.time_ns, timeout=None)
+
+
+def bump_attendance_generation():
+    """
+    Mark that an RSVP has changed somewhere, for the validators of the
+    event list pages - a client's copy of a list page may show the event.
+    Bumped now and on commit, as with bump_event_version.
+    """
+    cache.set(ATTENDANCE_GENERATION_KEY, time.time_ns(), timeout=None)
+    transaction.on_commit(
+        lambda: cache.set(ATTENDANCE_GENERATION_KEY, time.time_ns(), timeout=None)
+    )
+
+
+def get_count_generation():
+    return cache.get_or_set(COUNT_GENERATION_KEY, time.time_ns, timeout=None)
+
+
+def bump_count_generation():
+    """
+    Drop every cached event list count. Only bumped when an event is
+    created or deleted, or its end is moved - nothing else changes which
+    list it is in. Edits that change which events match a search are left
+    to EVENTS_COUNT_CACHE_SECONDS, as is events ending as time passes.
+    Bumped now and on commit, as with bump_event_version.
+    """
+    cache.set(COUNT_GENERATION_KEY, time.time_ns(), timeout=None)
+    transaction.on_commit(
+        lambda: cache.set(COUNT_GENERATION_KEY, time.time_ns(), timeout=None)
+    )
+
+
+def get_contribution_item_version():
+    return cache.get_or_set(CONTRIBUTION_ITEM_VERSION_KEY, time.time_ns, timeout=None)
+
+
+def bump_contribution_item_version():
+    """
+    Have every process rebuild its autocomplete index of contribution item
+    titles. Bumped now and on commit, as with bump_event_version.
+    """
+    cache.set(CONTRIBUTION_ITEM_VERSION_KEY, time.time_ns(), timeout=None)
+    transaction.on_commit(
+        lambda: cache.set(CONTRIBUTION_ITEM_VERSION_KEY, time.time_ns(), timeout=None)
+    )
+
+
+def get_time_bucket(now=None):
+    """
+    The bucket number of now, and the time that bucket started.
+
+    Pages cached within a bucket are rendered as of its start, so every
+    request in it gets an identical page.
+    """
+    now = now or timezone.now()
+    seconds = settings.EVENTS_PAGE_CACHE_SECONDS
+    bucket = int(now.timestamp() // seconds)
+    return bucket, datetime.datetime.fromtimestamp(
+        bucket * seconds, tz=datetime.timezone.utc
+    )
+
+
+def get_page_cache_key(request, bucket):
+    path = md5(request.get_full_path().encode(), usedforsecurity=False).hexdigest()
+    return PAGE_KEY.format(generation=get_page_generation(), bucket=bucket, path=path)
+
+
+def get_count_cache_key(name):
+    """
+    Key for a cached event list count, dropped with bump_count_generation.
+    Counts have a generation of their own rather than sharing the pages',
+    as attendance changes pages all the time but never how many events
+    there are.
+    """
+    return COUNT_KEY.format(generation=get_count_generation(), name=name)
+
+
+def get_attendance_cache_key(user_pk, pk, action, idempotency_key):
+    """
+    Key for the stored result of an attendance POST. Idempotency keys are
+    chosen by clients, so they are hashed and scoped to the user.
+    """
+    idempotency_key = md5(idempotency_key.encode(), usedforsecurity=False).hexdigest()
+    return ATTENDANCE_KEY.format(
+        user=user_pk, pk=pk, action=action, idempotency_key=idempotency_key
+    )
+
+
+def get_cache_stats(kind):
+    hits = cache_stats[f"{kind}_hits"]
+    misses = cache_stats[f"{kind}_misses"]
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / lookups if lookups else None,
+    }
+
+
+def log_cache_stats():
+    """
+    Log this process's fragment and page cache hit rates since it started,
+    and those of each tier of the default cache if it is tiered (see
+    djisco.cache.TieredCache.stats).
+    """
+    all_stats = {
+        f"{kind} cache": get_cache_stats(kind) for kind in ("fragment", "page")
+    }
+    if hasattr(cache, "stats"):
+        for tier, stats in cache.stats().items():
+            all_stats[f"{tier} cache tier"] = stats
+    for name, stats in all_stats.items():
+        stats = dict(stats)
+        hits, misses, hit_rate = (
+            stats.pop(key) for key in ("hits", "misses", "hit_rate")
+        )
+        logger.info(
+            "%s: %d hits, %d misses, %s hit rate%s",
+            name,
+            hits,
+            misses,
+            "no" if hit_rate is None else f"{hit_rate:.0%}",
+            "".join(f", {value} {key}" for key, value in stats.items()),
+        )
+
+
+@receiver(request_finished)
+def log_cache_stats_periodically(sender, **kwargs):
+    # Counted per process, so each worker logs its own
+    global cache_stats_logged_at
+    seconds = settings.EVENTS_CACHE_STATS_LOG_SECONDS
+    now = time.monotonic()
+    if seconds and now - cache_stats_logged_at >= seconds:
+        cache_stats_logged_at = now
+        log_cache_stats()
@@ -5,34 +5,32 @@ from django.utils import timezone
 class TimeFilterOptions:
     """
     Used by EventListView to determine the view title, queryset
-    orderfing and filtering.
+    orderfing and filtering, relative to now (the current time by default).
 
     returns:
     (string for view title, string used in qs "order_by", qs filter)
     """
 
     @classmethod
-    def get_option(cls, when) -> tuple[str, str, models.Q]:
+    def get_option(cls, when, now=None) -> tuple[str, str, models.Q]:
+        now = now or timezone.now()
         if when == "future":
-            return cls.future
+            return cls.future(now)
         elif when == "past":
-            return cls.past
+            return cls.past(now)
         elif when == "all":
-            return cls.all
+            return cls.all(now)
         else:
             raise ValueError
 
     @classmethod
-    @property
-    def all(cls):
+    def all(cls, now):
         return ("All Events", "-attendee_count", models.Q())
 
     @classmethod
-    @property
-    def past(cls):
-        return ("Past Events", "-ends_at", models.Q(ends_at__lte=timezone.now()))
+    def past(cls, now):
+        return ("Past Events", "-ends_at", models.Q(ends_at__lte=now))
 
     @classmethod
-    @property
-    def future(cls):
-        return ("Events", "ends_at", models.Q(ends_at__gt=timezone.now()))
+    def future(cls, now):
+        return ("Events", "ends_at", models.Q(ends_at__gt=now))
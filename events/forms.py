@@ -1,5 +1,6 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
+from django.urls import reverse_lazy
 from users.models import User
 from django.utils import timezone
 
@@ -74,8 +75,31 @@ class DeleteEventForm(forms.Form):
         return confirm
 
 
+class EventSearchForm(forms.Form):
+    q = forms.CharField(
+        max_length=100,
+        required=False,
+        widget=forms.TextInput(
+            attrs={
+                "type": "search",
+                "placeholder": "Search events",
+                "aria-label": "Search events",
+            }
+        ),
+    )
+
+
 class ContributionForm(forms.Form):
-    contribution_item = forms.CharField(label="Contribution Name")
+    contribution_item = forms.CharField(
+        label="Contribution Name",
+        widget=forms.TextInput(
+            attrs={
+                "list": "contribution-item-options",
+                "autocomplete": "off",
+                "data-autocomplete-url": reverse_lazy("contribution_item_autocomplete"),
+            }
+        ),
+    )
     quantity = forms.IntegerField(min_value=1, label="Quantity")
 
 
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+
+from .models import Event
+
+logger = logging.getLogger(__name__)
+
+# Comment lines sent to idle streams, so dropped connections are noticed
+KEEPALIVE_SECONDS = 15
+
+
+class CapacityBroadcaster:
+    """
+    Fans attendee count changes out to this worker's live streams.
+
+    One task polls the events any stream is watching, with a single query
+    every settings.EVENTS_LIVE_POLL_SECONDS however many streams there are,
+    and queues each change to the streams watching that event. An idle
+    stream is a queue and a suspended coroutine, so a worker can hold
+    thousands of them.
+    """
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+        # The last (attendee_count, maximum_attendees) published per event
+        self.capacities = {}
+        self.task = None
+
+    def subscribe(self, pks):
+        queue = asyncio.Queue()
+        for pk in pks:
+            self.subscribers[pk].add(queue)
+            if pk in self.capacities:
+                queue.put_nowait((pk, *self.capacities[pk]))
+        return queue
+
+    def unsubscribe(self, pks, queue):
+        for pk in pks:
+            self.subscribers[pk].discard(queue)
+            if not self.subscribers[pk]:
+                del self.subscribers[pk]
+                self.capacities.pop(pk, None)
+
+    def ensure_polling(self):
+        loop = asyncio.get_running_loop()
+        if self.task is None or self.task.done() or self.task.get_loop() is not loop:
+            self.task = loop.create_task(self.poll())
+
+    async def poll(self):
+        while self.subscribers:
+            try:
+                await self.publish_changes()
+            except Exception:
+                logger.exception("Polling event capacities failed")
+            await asyncio.sleep(settings.EVENTS_LIVE_POLL_SECONDS)
+
+    async def publish_changes(self):
+        capacities = await self.get_capacities(list(self.subscribers))
+        for pk, *capacity in capacities:
+            capacity = tuple(capacity)
+            if self.capacities.get(pk) != capacity:
+                self.capacities[pk] = capacity
+                for queue in self.subscribers.get(pk, ()):
+                    queue.put_nowait((pk, *capacity))
+
+    @staticmethod
+    @sync_to_async
+    def get_capacities(pks):
+        try:
+            return list(
+                Event.objects.filter(pk__in=pks).values_list(
+                    "pk", "attendee_count", "maximum_attendees"
+                )
+            )
+        except DatabaseError:
+            # The poll outlives any request, so nothing else closes a broken
+            # connection - after a database restart every poll would fail
+            # on it. Closed, the next poll reconnects.
+            close_old_connections()
+            raise
+
+
+broadcaster = CapacityBroadcaster()
+
+
+async def stream_capacities(pks):
+    """
+    Server-sent events for the capacity of each event in pks, as it changes.
+
+    Streams end after settings.EVENTS_LIVE_STREAM_SECONDS and the browser
+    reconnects, as Django 4.2 does not stop streaming to a client that has
+    gone away.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.EVENTS_LIVE_STREAM_SECONDS
+    queue = broadcaster.subscribe(pks)
+    broadcaster.ensure_polling()
+    try:
+        yield "retry: 1000\n\n"
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                pk, attendee_count, maximum_attendees = await asyncio.wait_for(
+                    queue.get(), min(remaining, KEEPALIVE_SECONDS)
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            data = json.dumps(
+                {
+                    "id": pk,
+                    "attendee_count": attendee_count,
+                    "maximum_attendees": maximum_attendees,
+                }
+            )
+            yield f"event: capacity\ndata: {data}\n\n"
+    finally:
+        broadcaster.unsubscribe(pks, queue)
@@ -0,0 +1,180 @@
+import asyncio
+import datetime
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .cache import get_attendance_generation, get_page_generation
+from .models import RSVP, ContributionCommitment, Event
+
+
+async def alist(queryset):
+    """
+    list(queryset) with the async ORM.
+    """
+    return [obj async for obj in queryset]
+
+
+def get_rsvp_event_ids(request):
+    """
+    The ids of the events the requesting user has RSVP'd to.
+
+    Loaded with a single index-only query the first time it is asked for
+    and kept on the request, so every view and template rendering for the
+    request can share one set rather than each annotating has_user_rsvp
+    with a per-row subquery.
+    """
+    if not hasattr(request, "_rsvp_event_ids"):
+        if request.user.is_authenticated:
+            request._rsvp_event_ids = frozenset(
+                RSVP.objects.filter(user=request.user).values_list(
+                    "event_id", flat=True
+                )
+            )
+        else:
+            request._rsvp_event_ids = frozenset()
+    return request._rsvp_event_ids
+
+
+async def aget_rsvp_event_ids(request):
+    """
+    get_rsvp_event_ids() with the async ORM, for async views, once they have
+    loaded request.user.
+    """
+    if not hasattr(request, "_rsvp_event_ids"):
+        if request.user.is_authenticated:
+            request._rsvp_event_ids = frozenset(
+                await alist(
+                    RSVP.objects.filter(user=request.user).values_list(
+                        "event_id", flat=True
+                    )
+                )
+            )
+        else:
+            request._rsvp_event_ids = frozenset()
+    return request._rsvp_event_ids
+
+
+def attach_user_commitments(events, user):
+    """
+    Set commitments_for_user_by_item on each event to a list of
+    (contribution item title, quantity) pairs for what user is bringing.
+
+    Totals for every event are fetched in a single grouped query, however
+    many events there are.
+    """
+    events = list(events)
+    commitments = list(_user_commitments(events, user)) if events else []
+    return _set_user_commitments(events, commitments)
+
+
+async def aattach_user_commitments(events, user):
+    """
+    attach_user_commitments() with the async ORM, for async views.
+    """
+    events = list(events)
+    commitments = await alist(_user_commitments(events, user)) if events else []
+    return _set_user_commitments(events, commitments)
+
+
+def _user_commitments(events, user):
+    return (
+        ContributionCommitment.objects.filter(
+            RSVP__user=user, RSVP__event__in=[event.pk for event in events]
+        )
+        .values_list(
+            "RSVP__event_id", "contribution_requirement__contribution_item__title"
+        )
+        .annotate(quantity=Count("pk"))
+        .order_by(
+            "RSVP__event_id", "contribution_requirement__contribution_item__title"
+        )
+    )
+
+
+def _set_user_commitments(events, commitments):
+    commitments_by_event = {event.pk: [] for event in events}
+    for event_id, title, quantity in commitments:
+        commitments_by_event[event_id].append((title, quantity))
+    for event in events:
+        event.commitments_for_user_by_item = commitments_by_event[event.pk]
+    return events
+
+
+def get_event_validators(pk):
+    """
+    The version and last modified time of an event's pages, for
+    ConditionalGetMixin, or None if there is no such event.
+
+    Read with one primary key lookup of updated_at, which every change to
+    the event and its RSVPs, requirements and commitments moves on. Pages
+    also change when the event ends, as attendance closes.
+    """
+    row = Event.objects.filter(pk=pk).values_list("updated_at", "ends_at").first()
+    return _event_validators(row)
+
+
+async def aget_event_validators(pk):
+    """
+    get_event_validators() with the async ORM, for async views.
+    """
+    row = (
+        await Event.objects.filter(pk=pk).values_list("updated_at", "ends_at").afirst()
+    )
+    return _event_validators(row)
+
+
+def _event_validators(row):
+    if row is None:
+        return None
+    updated_at, ends_at = row
+    if ends_at <= timezone.now():
+        return f"{updated_at.isoformat()}:ended", max(updated_at, ends_at)
+    return updated_at.isoformat(), updated_at
+
+
+def get_event_list_validators():
+    """
+    The version and last modified time of the event list pages, for
+    ConditionalGetMixin.
+
+    The cached page and attendance generations move on whenever an event
+    or RSVP changes, and are the times they did so. Pages also change
+    whenever an event ends, moving from the future list to the past one,
+    which is found with one read of the ends_at index.
+    """
+    generations = _get_list_generations()
+    last_ended = Event.objects.filter(ends_at__lte=timezone.now()).aggregate(
+        last_ended=Max("ends_at")
+    )["last_ended"]
+    return _event_list_validators(generations, last_ended)
+
+
+async def aget_event_list_validators():
+    """
+    get_event_list_validators() with the async ORM, for async views. The
+    generations are read in the sync thread, as a cache miss may wait on
+    another worker setting them.
+    """
+    generations, last_ended = await asyncio.gather(
+        sync_to_async(_get_list_generations)(),
+        Event.objects.filter(ends_at__lte=timezone.now()).aaggregate(
+            last_ended=Max("ends_at")
+        ),
+    )
+    return _event_list_validators(generations, last_ended["last_ended"])
+
+
+def _get_list_generations():
+    return get_page_generation(), get_attendance_generation()
+
+
+def _event_list_validators(generations, last_ended):
+    generation = ":".join(map(str, generations))
+    changed_at = datetime.datetime.fromtimestamp(
+        max(generations) / 10**9, tz=datetime.timezone.utc
+    )
+    if last_ended is None:
+        return generation, changed_at
+    return f"{generation}:{last_ended.isoformat()}", max(changed_at, last_ended)
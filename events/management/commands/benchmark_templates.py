@@ -0,0 +1,155 @@
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.template import engines
+from django.template.loader import render_to_string
+from django.template.loaders.cached import Loader as CachedLoader
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+
+from events.forms import ContributionForm
+from events.models import ContributionItem, ContributionSummary, Event
+from events.pagination import KeysetPage, KeysetPaginator
+from users.models import User
+
+TEMPLATES = [
+    "events/event_list.html",
+    "events/event_list_card.html",
+    "events/attendance.html",
+    "events/contributions_table.html",
+    "events/event_detail.html",
+    "events/event_detail_contributions.html",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the event templates against realistic context many times and "
+        "report render latency percentiles for each. Run with the settings "
+        "module under test, e.g. --settings djisco.settings.prod to include "
+        "the cached loader. Nothing is read from or written to the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "templates",
+            nargs="*",
+            default=TEMPLATES,
+            help="Templates to render (default: the event page templates)",
+        )
+        parser.add_argument("--iterations", type=int, default=1000)
+        parser.add_argument("--warmup", type=int, default=50)
+        parser.add_argument(
+            "--page-size", type=int, default=5, help="Events on the list page"
+        )
+        parser.add_argument("--items", type=int, default=8, help="Requested items")
+        parser.add_argument(
+            "--as",
+            dest="role",
+            choices=["anonymous", "attendee", "organiser"],
+            default="attendee",
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options["templates"]) - set(TEMPLATES)
+        if unknown:
+            raise CommandError(f"No context for {', '.join(sorted(unknown))}")
+
+        self.stdout.write(f"Cached template loader: {self.uses_cached_loader()}")
+        for name in options["templates"]:
+            context, request = self.get_context(name, options)
+            for _ in range(options["warmup"]):
+                render_to_string(name, context, request)
+            timings = []
+            for _ in range(options["iterations"]):
+                started = time.perf_counter_ns()
+                render_to_string(name, context, request)
+                timings.append((time.perf_counter_ns() - started) / 10**6)
+            percentiles = statistics.quantiles(timings, n=100)
+            self.stdout.write(
+                f"{name}: p50 {percentiles[49]:.3f} ms, p90 {percentiles[89]:.3f} ms, "
+                f"p99 {percentiles[98]:.3f} ms, max {max(timings):.3f} ms "
+                f"over {len(timings)} renders"
+            )
+
+    def uses_cached_loader(self):
+        return any(
+            isinstance(loader, CachedLoader)
+            for loader in engines["django"].engine.template_loaders
+        )
+
+    def get_context(self, name, options):
+        """
+        Context like the view's for name, built from unsaved objects.
+        """
+        now = timezone.now()
+        organiser = User(pk=1, username="organiser")
+        attendee = User(pk=2, username="attendee")
+        user = {
+            "anonymous": AnonymousUser(),
+            "attendee": attendee,
+            "organiser": organiser,
+        }[options["role"]]
+
+        events = []
+        for i in range(options["page_size"]):
+            event = Event(
+                pk=i + 1,
+                title=f"Benchmark event {i}",
+                organiser=organiser,
+                contact=organiser,
+                maximum_attendees=50,
+                attendee_count=20 + i,
+                starts_at=now + timezone.timedelta(days=1, hours=i),
+                ends_at=now + timezone.timedelta(days=1, hours=i + 3),
+                location="12 Benchmark Street, Benchmarkton",
+                description="A realistic length description of the event. " * 8,
+                updated_at=now,
+            )
+            event.remaining_spaces = event.maximum_attendees - event.attendee_count
+            event.has_user_rsvp = options["role"] != "anonymous" and i % 2 == 0
+            event.cache_version = f"benchmark-{now.timestamp()}"
+            events.append(event)
+        event = events[0]
+
+        paginator = KeysetPaginator(Event.objects.order_by("ends_at"), len(events))
+        paginator.count = 120
+        page = KeysetPage(events, 2, paginator, True, True)
+        summaries = [
+            ContributionSummary(
+                event=event,
+                contribution_item=ContributionItem(pk=i + 1, title=f"Item {i}"),
+                required=4,
+                committed=i % 5,
+            )
+            for i in range(options["items"])
+        ]
+
+        context = {
+            "now": now,
+            "event": event,
+            "object": event,
+            "button_text_unattend": "Cancel",
+            "button_text_attend": "Join!",
+            "form": ContributionForm,
+            "contribution_summaries": summaries,
+        }
+        if name == "events/event_list.html":
+            context.update(
+                when="future",
+                title="Future Events",
+                page_obj=page,
+                paginator=paginator,
+                object_list=events,
+                is_paginated=True,
+            )
+            path = reverse("event_list", kwargs={"when": "future"})
+        else:
+            path = reverse("event_detail", kwargs={"pk": event.pk})
+
+        request = RequestFactory().get(path)
+        request.user = user
+        return context, request
@@ -0,0 +1,72 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.parse import urljoin
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Request pages from running servers, several requests at once, and "
+        "report throughput and latency percentiles for each, e.g. to compare "
+        "the WSGI service with the ASGI one serving the async views: "
+        "benchmark_throughput http://localhost:8051 http://localhost:8052"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("servers", nargs="+", help="Base URLs of the servers")
+        parser.add_argument(
+            "--path",
+            dest="paths",
+            action="append",
+            help="Path to request, may be repeated (default: /events/)",
+        )
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=20)
+        parser.add_argument("--timeout", type=float, default=30)
+
+    def handle(self, *args, **options):
+        paths = options["paths"] or ["/events/"]
+        for server in options["servers"]:
+            for path in paths:
+                url = urljoin(server, path)
+                try:
+                    for _ in range(options["warmup"]):
+                        self.fetch(url, options["timeout"])
+                except (HTTPError, URLError) as error:
+                    raise CommandError(f"Could not fetch {url}: {error}")
+                self.stdout.write(self.benchmark(url, options))
+
+    def fetch(self, url, timeout):
+        started = time.perf_counter_ns()
+        with urlopen(url, timeout=timeout) as response:
+            response.read()
+        return (time.perf_counter_ns() - started) / 10**6
+
+    def benchmark(self, url, options):
+        def fetch(_):
+            try:
+                return self.fetch(url, options["timeout"])
+            except (HTTPError, URLError, TimeoutError):
+                return None
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options["concurrency"]) as executor:
+            results = list(executor.map(fetch, range(options["requests"])))
+        elapsed = time.perf_counter() - started
+
+        timings = [timing for timing in results if timing is not None]
+        if len(timings) < 2:
+            return f"{url}: {len(results) - len(timings)} of {len(results)} failed"
+        percentiles = statistics.quantiles(timings, n=100)
+        return (
+            f"{url}: {len(timings) / elapsed:.1f} req/s, "
+            f"p50 {percentiles[49]:.1f} ms, p90 {percentiles[89]:.1f} ms, "
+            f"p99 {percentiles[98]:.1f} ms over {len(timings)} requests "
+            f"at concurrency {options['concurrency']}, "
+            f"{len(results) - len(timings)} failed"
+        )
@@ -0,0 +1,265 @@
+import random
+import statistics
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.utils import timezone
+
+from events.models import (
+    RSVP,
+    ContributionCommitment,
+    ContributionItem,
+    ContributionRequirement,
+    ContributionSummary,
+    Event,
+)
+from users.models import User
+
+BENCHMARK_PREFIX = "benchmark_"
+
+# Added by migration 0008 for the shapes below, see --without-indexes
+QUERY_INDEXES = [
+    "event_ends_at_id_idx",
+    "event_attendee_count_id_idx",
+    "requirement_event_item_idx",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Record EXPLAIN plans and timings for the hot query shapes in "
+        "events.models. To compare index sets, run against a fully migrated "
+        "scratch database: --seed 1000000 once, then --without-indexes "
+        "--label before and --label after."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Bulk load this many benchmark events (with RSVPs and requirements) first",
+        )
+        parser.add_argument("--rsvps-per-event", type=int, default=3)
+        parser.add_argument("--requirements-per-event", type=int, default=2)
+        parser.add_argument("--label", default="plans")
+        parser.add_argument(
+            "--output", default=".", help="Directory to write <label>.txt to"
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--database", default="default")
+        parser.add_argument(
+            "--without-indexes",
+            action="store_true",
+            help="Drop the indexes from migration 0008 while timing, then restore them",
+        )
+
+    def handle(self, *args, **options):
+        self.database = options["database"]
+        if options["seed"]:
+            self.seed(
+                options["seed"],
+                options["rsvps_per_event"],
+                options["requirements_per_event"],
+            )
+
+        report = []
+        dropped = (
+            self.query_indexes_dropped()
+            if options["without_indexes"]
+            else nullcontext()
+        )
+        with dropped:
+            for name, queryset in self.get_query_shapes():
+                timings = []
+                for _ in range(options["repeat"]):
+                    started = time.perf_counter()
+                    list(queryset.all())
+                    timings.append((time.perf_counter() - started) * 1000)
+                report.append(
+                    f"== {name}\n"
+                    f"{queryset.query}\n\n"
+                    f"{self.explain(queryset)}\n\n"
+                    f"median {statistics.median(timings):.2f} ms, "
+                    f"max {max(timings):.2f} ms over {len(timings)} runs\n"
+                )
+                self.stdout.write(f"{name}: {statistics.median(timings):.2f} ms")
+
+        output_path = Path(options["output"]) / f"{options['label']}.txt"
+        output_path.write_text("\n".join(report))
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully wrote query plans to {output_path}")
+        )
+
+    @contextmanager
+    def query_indexes_dropped(self):
+        """
+        Drop QUERY_INDEXES from the schema as it is now, and restore them by
+        rolling the drop back - rather than migrating back to before 0008,
+        which the models no longer match.
+        """
+        connection = connections[self.database]
+        with transaction.atomic(using=self.database):
+            with connection.cursor() as cursor:
+                for index_name in QUERY_INDEXES:
+                    cursor.execute(
+                        f"DROP INDEX {connection.ops.quote_name(index_name)}"
+                    )
+            yield
+            transaction.set_rollback(True, using=self.database)
+
+    def explain(self, queryset):
+        if connections[self.database].vendor == "postgresql":
+            return queryset.explain(analyze=True, buffers=True)
+        return queryset.explain()
+
+    def get_query_shapes(self):
+        events = Event.objects.using(self.database)
+        now = timezone.now()
+        user = (
+            User.objects.using(self.database)
+            .filter(username__startswith=BENCHMARK_PREFIX)
+            .order_by("pk")
+            .first()
+        ) or User.objects.using(self.database).order_by("pk").first()
+        requirement = (
+            ContributionRequirement.objects.using(self.database).order_by("pk").first()
+        )
+        page_size = 6
+
+        shapes = [
+            (
+                "future events page",
+                events.with_attendance_fields()
+                .filter(ends_at__gt=now)
+                .order_by("ends_at", "id")[:page_size],
+            ),
+            (
+                "past events page",
+                events.with_attendance_fields()
+                .filter(ends_at__lte=now)
+                .order_by("-ends_at", "-id")[:page_size],
+            ),
+            (
+                "all events page",
+                events.with_attendance_fields().order_by("-attendee_count", "-id")[
+                    :page_size
+                ],
+            ),
+        ]
+        if user is not None:
+            shapes += [
+                (
+                    "future events page with has_user_rsvp",
+                    events.with_attendance_fields()
+                    .with_has_user_rsvp(user)
+                    .filter(ends_at__gt=now)
+                    .order_by("ends_at", "id")[:page_size],
+                ),
+                ("events for user", events.for_user(user).filter(ends_at__gt=now)),
+            ]
+        if requirement is not None:
+            requirements = ContributionRequirement.objects.using(self.database)
+            shapes += [
+                (
+                    "requirements for item for event",
+                    requirements.filter(
+                        event_id=requirement.event_id,
+                        contribution_item_id=requirement.contribution_item_id,
+                    ),
+                ),
+                (
+                    "unfulfilled requirements for item for event",
+                    requirements.get_unfulfilled_requirements_for_item_for_event(
+                        requirement.contribution_item_id, requirement.event_id
+                    ),
+                ),
+                (
+                    "contribution summaries for event",
+                    ContributionSummary.objects.using(self.database)
+                    .filter(event_id=requirement.event_id, required__gt=0)
+                    .select_related("contribution_item")
+                    .order_by("contribution_item_id"),
+                ),
+            ]
+        return shapes
+
+    def seed(self, event_count, rsvps_per_event, requirements_per_event):
+        batch_size = 5000
+        user_count = max(event_count // 1000, rsvps_per_event + 1)
+        now = timezone.now()
+        password = make_password(None)
+
+        users = User.objects.using(self.database).bulk_create(
+            [
+                User(username=f"{BENCHMARK_PREFIX}user_{i}", password=password)
+                for i in range(user_count)
+            ],
+            batch_size=batch_size,
+        )
+        items = ContributionItem.objects.using(self.database).bulk_create(
+            [ContributionItem(title=f"{BENCHMARK_PREFIX}item_{i}") for i in range(50)]
+        )
+
+        for start in range(0, event_count, batch_size):
+            event_batch = []
+            for i in range(start, min(start + batch_size, event_count)):
+                starts_at = now + timezone.timedelta(
+                    minutes=random.randint(-(10**6), 10**6)
+                )
+                organiser = random.choice(users)
+                event_batch.append(
+                    Event(
+                        title=f"{BENCHMARK_PREFIX}event_{i}",
+                        organiser=organiser,
+                        contact=organiser,
+                        maximum_attendees=50,
+                        attendee_count=rsvps_per_event,
+                        starts_at=starts_at,
+                        ends_at=starts_at + timezone.timedelta(hours=3),
+                        location="Benchmark",
+                    )
+                )
+            event_batch = Event.objects.using(self.database).bulk_create(event_batch)
+
+            # bulk_create skips the RSVP signals, attendee_count is set above
+            rsvps = RSVP.objects.using(self.database).bulk_create(
+                [
+                    RSVP(event=event, user=user)
+                    for event in event_batch
+                    for user in random.sample(users, rsvps_per_event)
+                ]
+            )
+            requirements = ContributionRequirement.objects.using(
+                self.database
+            ).bulk_create(
+                [
+                    ContributionRequirement(
+                        event=event, contribution_item=random.choice(items)
+                    )
+                    for event in event_batch
+                    for _ in range(requirements_per_event)
+                ]
+            )
+            rsvps_by_event = {rsvp.event_id: rsvp for rsvp in rsvps}
+            ContributionCommitment.objects.using(self.database).bulk_create(
+                [
+                    ContributionCommitment(
+                        RSVP=rsvps_by_event[requirement.event_id],
+                        contribution_requirement=requirement,
+                    )
+                    for requirement in requirements[::2]
+                ]
+            )
+            self.stdout.write(f"Seeded {start + len(event_batch)} / {event_count}")
+
+        # The bulk loaded requirements and commitments skipped the signals
+        ContributionSummary.objects.using(self.database).rebuild()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully seeded {event_count} benchmark events")
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from events.models import ContributionSummary, Event
+
+
+class Command(BaseCommand):
+    help = "Recalculate denormalised counters that have drifted from their source rows"
+
+    def handle(self, *args, **kwargs):
+        repaired_events = Event.objects.repair_attendee_counts()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully repaired attendee counts for {repaired_events} events"
+            )
+        )
+        repaired_summaries = ContributionSummary.objects.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully repaired {repaired_summaries} contribution summaries"
+            )
+        )
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_attendee_count(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    RSVP = apps.get_model("events", "RSVP")
+    rsvp_count = (
+        RSVP.objects.filter(event=OuterRef("pk"))
+        .order_by()
+        .values("event")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Event.objects.update(attendee_count=Coalesce(Subquery(rsvp_count), 0))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0006_event_contact"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="attendee_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_attendee_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.6 on 2026-10-17 22:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0007_event_attendee_count"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="contributionrequirement",
+            index=models.Index(
+                fields=["event", "contribution_item"], name="requirement_event_item_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["ends_at", "id"], name="event_ends_at_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["attendee_count", "id"], name="event_attendee_count_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,83 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_contribution_summaries(apps, schema_editor):
+    ContributionRequirement = apps.get_model("events", "ContributionRequirement")
+    ContributionCommitment = apps.get_model("events", "ContributionCommitment")
+    ContributionSummary = apps.get_model("events", "ContributionSummary")
+    commitments = (
+        ContributionCommitment.objects.order_by()
+        .values_list(
+            "contribution_requirement__event_id",
+            "contribution_requirement__contribution_item_id",
+        )
+        .annotate(count=Count("pk"))
+    )
+    committed = {(event_id, item_id): count for event_id, item_id, count in commitments}
+    requirements = (
+        ContributionRequirement.objects.order_by()
+        .values_list("event_id", "contribution_item_id")
+        .annotate(count=Count("pk"))
+    )
+    ContributionSummary.objects.bulk_create(
+        (
+            ContributionSummary(
+                event_id=event_id,
+                contribution_item_id=item_id,
+                required=count,
+                committed=committed.get((event_id, item_id), 0),
+            )
+            for event_id, item_id, count in requirements
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0008_event_and_requirement_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContributionSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("required", models.PositiveIntegerField(default=0)),
+                ("committed", models.PositiveIntegerField(default=0)),
+                (
+                    "contribution_item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="events.contributionitem",
+                    ),
+                ),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="events.event"
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="contributionsummary",
+            constraint=models.UniqueConstraint(
+                fields=("event", "contribution_item"),
+                name="contribution_summary_event_item_unique",
+            ),
+        ),
+        migrations.RunPython(
+            populate_contribution_summaries, migrations.RunPython.noop
+        ),
+    ]
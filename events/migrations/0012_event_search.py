@@ -0,0 +1,90 @@
+"""
+Full-text search indexes for Event.objects.search().
+
+Neither is a model field, as each is specific to its database. On
+PostgreSQL a stored, generated tsvector column with a GIN index. On SQLite
+an FTS5 table indexing the events table's own columns, kept up to date by
+triggers - SQLite drops triggers with their table, so a later migration
+that makes Django rebuild events_event must create them again.
+"""
+
+from django.db import migrations
+
+POSTGRESQL_FORWARDS = [
+    """
+    ALTER TABLE events_event ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(location, '')), 'B')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX event_search_vector_idx ON events_event USING gin (search_vector)",
+]
+POSTGRESQL_BACKWARDS = [
+    "ALTER TABLE events_event DROP COLUMN search_vector",
+]
+
+SQLITE_FORWARDS = [
+    """
+    CREATE VIRTUAL TABLE events_event_fts USING fts5(
+        title, location, description,
+        content='events_event', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER events_event_fts_insert AFTER INSERT ON events_event BEGIN
+        INSERT INTO events_event_fts (rowid, title, location, description)
+        VALUES (new.id, new.title, new.location, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER events_event_fts_delete AFTER DELETE ON events_event BEGIN
+        INSERT INTO events_event_fts
+            (events_event_fts, rowid, title, location, description)
+        VALUES ('delete', old.id, old.title, old.location, old.description);
+    END
+    """,
+    # Only for the indexed columns, so attendee count updates do not reindex
+    """
+    CREATE TRIGGER events_event_fts_update
+    AFTER UPDATE OF title, location, description ON events_event BEGIN
+        INSERT INTO events_event_fts
+            (events_event_fts, rowid, title, location, description)
+        VALUES ('delete', old.id, old.title, old.location, old.description);
+        INSERT INTO events_event_fts (rowid, title, location, description)
+        VALUES (new.id, new.title, new.location, new.description);
+    END
+    """,
+    "INSERT INTO events_event_fts (events_event_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARDS = [
+    "DROP TRIGGER events_event_fts_update",
+    "DROP TRIGGER events_event_fts_delete",
+    "DROP TRIGGER events_event_fts_insert",
+    "DROP TABLE events_event_fts",
+]
+
+
+def run_for_vendor(postgresql, sqlite):
+    def run(apps, schema_editor):
+        statements = {"postgresql": postgresql, "sqlite": sqlite}.get(
+            schema_editor.connection.vendor, []
+        )
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0011_waitlistentry"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor(POSTGRESQL_FORWARDS, SQLITE_FORWARDS),
+            run_for_vendor(POSTGRESQL_BACKWARDS, SQLITE_BACKWARDS),
+        ),
+    ]
@@ -0,0 +1,92 @@
+"""
+Normalized contribution item titles, and on PostgreSQL the indexes for
+autocompleting them: a trigram index for similar titles, and one in "C"
+collation order that both finds and orders titles by prefix. They are only
+created where pg_trgm is installed or can be - elsewhere
+ContributionItem.objects.autocomplete() uses its in-memory index instead.
+"""
+
+import re
+import unicodedata
+
+from django.db import DatabaseError, migrations, models, transaction
+
+# Copied from events.autocomplete as they were when this migration was
+# written, so later changes there do not change what it does
+TRIGRAM_INDEX = "contribution_item_normalized_title_trgm_idx"
+
+
+def normalize_title(title):
+    title = unicodedata.normalize("NFKD", title.casefold())
+    title = "".join(char for char in title if not unicodedata.combining(char))
+    return " ".join(singularize(word) for word in re.findall(r"\w+", title))
+
+
+def singularize(word):
+    if len(word) > 4 and word.endswith("ies"):
+        word = f"{word[:-3]}y"
+    elif word.endswith(("sses", "xes", "ches", "shes")):
+        word = word[:-2]
+    elif len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+    if len(word) > 4 and word.endswith("ie"):
+        word = f"{word[:-2]}y"
+    return word
+
+
+def fill_normalized_titles(apps, schema_editor):
+    ContributionItem = apps.get_model("events", "ContributionItem")
+    items = ContributionItem.objects.using(schema_editor.connection.alias)
+    batch = []
+    for item in items.only("pk", "title").iterator(chunk_size=2000):
+        item.normalized_title = normalize_title(item.title)
+        batch.append(item)
+        if len(batch) == 2000:
+            items.bulk_update(batch, ["normalized_title"])
+            batch = []
+    items.bulk_update(batch, ["normalized_title"])
+
+
+def create_trigram_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    try:
+        # In a savepoint, as failing to install it must not end the migration
+        with transaction.atomic(using=connection.alias):
+            schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except DatabaseError:
+        return
+    schema_editor.execute(
+        f"CREATE INDEX {TRIGRAM_INDEX} ON events_contributionitem "
+        "USING gin (normalized_title gin_trgm_ops)"
+    )
+    schema_editor.execute(
+        "CREATE INDEX contribution_item_normalized_title_prefix_idx "
+        'ON events_contributionitem ((normalized_title COLLATE "C"), id)'
+    )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {TRIGRAM_INDEX}")
+        schema_editor.execute(
+            "DROP INDEX IF EXISTS contribution_item_normalized_title_prefix_idx"
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0012_event_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contributionitem",
+            name="normalized_title",
+            field=models.TextField(db_index=True, default="", editable=False),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_normalized_titles, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -1,7 +1,21 @@
+import asyncio
+from hashlib import md5
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import UserPassesTestMixin
 from django.contrib.auth.views import redirect_to_login
+from django.core.cache import cache
 from django.shortcuts import redirect
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import condition
+from django.views.generic import View
+
+from .cache import cache_stats, get_page_cache_key, get_time_bucket
+from .loaders import aget_rsvp_event_ids, get_rsvp_event_ids
 
 
 class AuthenticatedEventOrganiserMixin(UserPassesTestMixin):
@@ -20,3 +34,200 @@ class AuthenticatedEventOrganiserMixin(UserPassesTestMixin):
     def test_func(self):
         event = self.get_object()
         return event.organiser == self.request.user
+
+
+class UserRSVPMixin:
+    """
+    Set has_user_rsvp on events from the request's set of RSVP'd event ids,
+    instead of annotating the queryset with a subquery.
+    """
+
+    def mark_user_rsvps(self, events):
+        rsvp_event_ids = get_rsvp_event_ids(self.request)
+        for event in events:
+            event.has_user_rsvp = event.pk in rsvp_event_ids
+        return events
+
+
+class AnonymousPageCacheMixin:
+    """
+    Serve GET requests from anonymous users from a whole page cache.
+
+    Time is rounded down to settings.EVENTS_PAGE_CACHE_SECONDS, so pages
+    rendered within one bucket are identical and cached for the rest of it.
+    Views use self.now in place of timezone.now(). Pages are keyed on the
+    full path, so the URL kwargs and cursor are varied on, and on a
+    generation that events.cache.bump_page_generation moves on whenever an
+    event changes. RSVPs leave cached pages be - their attendee counts are
+    brought up to date in the browser. Requests with messages waiting to be
+    shown are never served from, or added to, the cache.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        self.now = timezone.now()
+        self.page_is_shared = self.is_page_cacheable(request)
+        if not self.page_is_shared:
+            return super().dispatch(request, *args, **kwargs)
+
+        bucket, self.now = get_time_bucket(self.now)
+        key = get_page_cache_key(request, bucket)
+        response = cache.get(key)
+        if response is not None:
+            cache_stats["page_hits"] += 1
+            # Validators set by ConditionalGetMixin are cached with the page
+            return get_conditional_response(
+                request,
+                etag=response.get("ETag"),
+                last_modified=parse_http_date_safe(response.get("Last-Modified")),
+                response=response,
+            )
+        cache_stats["page_misses"] += 1
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and not response.cookies:
+            timeout = settings.EVENTS_PAGE_CACHE_SECONDS
+            if hasattr(response, "render") and callable(response.render):
+                response.add_post_render_callback(
+                    lambda rendered: self.cache_page(key, rendered, timeout)
+                )
+            else:
+                self.cache_page(key, response, timeout)
+        return response
+
+    def get_context_data(self, **kwargs):
+        # Shared pages bring their attendance up to date in the browser, see
+        # hydrateEventCards in attendance-form.js. Others are rendered for
+        # one user, and are only ever revalidated while still current.
+        return super().get_context_data(page_is_shared=self.page_is_shared, **kwargs)
+
+    def cache_page(self, key, response, timeout):
+        # A page that rendered a CSRF token must not be shared
+        if not self.request.META.get("CSRF_COOKIE_NEEDS_UPDATE"):
+            cache.set(key, response, timeout)
+
+    def is_page_cacheable(self, request):
+        return bool(
+            settings.EVENTS_PAGE_CACHE_SECONDS
+            and request.method == "GET"
+            and not request.user.is_authenticated
+            and not messages.get_messages(request)
+        )
+
+
+class ConditionalGetMixin:
+    """
+    Answer GET and HEAD requests with 304 Not Modified when the client's
+    copy of the page is current, before the view runs any of its queries.
+    Goes after AnonymousPageCacheMixin, which answers from the validators
+    of the pages it has cached.
+
+    Views implement get_validators(), returning (version, last_modified)
+    for the page as cheaply as they can, or None to skip the check. The
+    ETag combines the version with the user and the full path, as pages
+    differ between users. Requests with messages waiting to be shown are
+    always answered in full.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD") or messages.get_messages(request):
+            return super().dispatch(request, *args, **kwargs)
+        validators = self.get_validators()
+        if validators is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        version, last_modified = validators
+        etag = self.get_etag(version)
+        return condition(
+            etag_func=lambda request, *args, **kwargs: etag,
+            last_modified_func=lambda request, *args, **kwargs: last_modified,
+        )(super().dispatch)(request, *args, **kwargs)
+
+    def get_validators(self):
+        raise NotImplementedError(
+            "ConditionalGetMixin requires a get_validators() method"
+        )
+
+    def get_etag(self, version):
+        request = self.request
+        return md5(
+            f"{version}:{request.user.pk}:{request.get_full_path()}".encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+
+
+class AsyncPageMixin:
+    """
+    Serve an event page's GET and HEAD requests with an async view, for the
+    ASGI application. Goes first, in front of the view's
+    AnonymousPageCacheMixin and ConditionalGetMixin, and does their work in
+    place of their dispatch(), which cannot wait on an async view.
+
+    Views implement aget_validators(), and an async get() making its queries
+    with the async ORM, so that a worker's event loop goes on serving other
+    requests while they run. The validators and the user's RSVPs are loaded
+    together with asyncio.gather. The user and session, the caches, and
+    rendering the template are left to the request's sync thread, as they
+    are for a sync view.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            # Past the sync mixins, to the view's async 405 or OPTIONS
+            return await View.dispatch(self, request, *args, **kwargs)
+        self.now = timezone.now()
+        # Loads the session and user, so reading them from here on is free
+        await sync_to_async(lambda: request.user.is_authenticated)()
+        self.page_is_shared = isinstance(
+            self, AnonymousPageCacheMixin
+        ) and self.is_page_cacheable(request)
+        if not self.page_is_shared:
+            return await self.conditional_dispatch(request, *args, **kwargs)
+
+        bucket, self.now = get_time_bucket(self.now)
+        key = await sync_to_async(get_page_cache_key)(request, bucket)
+        response = await cache.aget(key)
+        if response is not None:
+            cache_stats["page_hits"] += 1
+            return get_conditional_response(
+                request,
+                etag=response.get("ETag"),
+                last_modified=parse_http_date_safe(response.get("Last-Modified")),
+                response=response,
+            )
+        cache_stats["page_misses"] += 1
+
+        response = await self.conditional_dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and not response.cookies:
+            timeout = settings.EVENTS_PAGE_CACHE_SECONDS
+            # Rendered, and so cached, in the sync thread
+            response.add_post_render_callback(
+                lambda rendered: self.cache_page(key, rendered, timeout)
+            )
+        return response
+
+    async def conditional_dispatch(self, request, *args, **kwargs):
+        if messages.get_messages(request):
+            await aget_rsvp_event_ids(request)
+            return await self.get(request, *args, **kwargs)
+        validators, _ = await asyncio.gather(
+            self.aget_validators(), aget_rsvp_event_ids(request)
+        )
+        if validators is None:
+            return await self.get(request, *args, **kwargs)
+
+        version, last_modified = validators
+        etag = quote_etag(self.get_etag(version))
+        last_modified = int(last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = await self.get(request, *args, **kwargs)
+        # As condition() sets them
+        if not response.has_header("Last-Modified"):
+            response.headers["Last-Modified"] = http_date(last_modified)
+        response.headers.setdefault("ETag", etag)
+        return response
+
+    async def aget_validators(self):
+        raise NotImplementedError("AsyncPageMixin requires an aget_validators() method")
@@ -1,19 +1,33 @@
-from django.db import models
-from django.db.models import BooleanField, Case, Count, F, Q, Value, When
-from django.db.models.functions import Greatest
+import re
+
+from django.conf import settings
+from django.db import IntegrityError, connections, models, router, transaction
+from django.db.models import Count, Exists, F, OuterRef, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Coalesce, Collate, Greatest
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
 from django.utils import timezone
 
 from users.models import User
 
+from .autocomplete import normalize_title, title_index, uses_trigram_index
+from .cache import (
+    bump_attendance_generation,
+    bump_contribution_item_version,
+    bump_event_version,
+    bump_count_generation,
+    bump_page_generation,
+    get_contribution_item_version,
+)
+
 
 class EventQuerySet(models.QuerySet):
     def for_user(self, user):
-        subquery = RSVP.objects.filter(user=user).values("event_id")
-        return self.filter(id__in=models.Subquery(subquery))
+        return self.filter(Exists(RSVP.objects.filter(user=user, event=OuterRef("pk"))))
 
     def with_attendance_fields(self):
         return self.annotate(
-            attendee_count=Count("respondents"),
             remaining_spaces=Greatest(
                 F("maximum_attendees") - F("attendee_count"),
                 0,
@@ -21,12 +35,19 @@ class EventQuerySet(models.QuerySet):
         )
 
     def with_has_user_rsvp(self, user):
-        subquery = RSVP.objects.filter(user=user).values("event_id")
         return self.annotate(
-            has_user_rsvp=Case(
-                When(id__in=models.Subquery(subquery), then=Value(True)),
-                default=Value(False),
-                output_field=BooleanField(),
+            has_user_rsvp=Exists(RSVP.objects.filter(user=user, event=OuterRef("pk")))
+        )
+
+    def with_is_accepting_attendees(self, now=None):
+        """
+        Annotate Event.accepting_attendees, for reading it with values().
+        """
+        now = now or timezone.now()
+        return self.annotate(
+            is_accepting_attendees=models.ExpressionWrapper(
+                Q(ends_at__gt=now, attendee_count__lt=F("maximum_attendees")),
+                output_field=models.BooleanField(),
             )
         )
 
@@ -36,6 +57,87 @@ class EventQuerySet(models.QuerySet):
     def in_past(self):
         return self.filter(ends_at__lte=timezone.now())
 
+    def search(self, terms):
+        """
+        Events matching the search terms in their title, location or
+        description, annotated with a rank to order them by, highest first.
+
+        Matched with the full-text indexes from migration 0012 - the
+        search_vector column on PostgreSQL and the events_event_fts table on
+        SQLite - so only the matching rows are read. Title matches rank
+        above location matches, which rank above description matches.
+        """
+        if connections[self.db].vendor == "postgresql":
+            return self._search_postgresql(terms)
+        return self._search_sqlite(terms)
+
+    def _search_postgresql(self, terms):
+        from django.contrib.postgres.search import (
+            SearchQuery,
+            SearchRank,
+            SearchVectorField,
+        )
+
+        query = SearchQuery(terms, config="english", search_type="websearch")
+        vector = RawSQL(
+            f"{self.model._meta.db_table}.search_vector",
+            [],
+            output_field=SearchVectorField(),
+        )
+        # As double precision, so ranks in page cursors compare equal
+        rank = Cast(SearchRank(F("search_vector"), query), models.FloatField())
+        return (
+            self.alias(search_vector=vector)
+            .filter(search_vector=query)
+            .annotate(rank=rank)
+        )
+
+    def _search_sqlite(self, terms):
+        # Quoted, so FTS5 query syntax in the terms is searched for as text
+        words = re.findall(r"\w+", terms)
+        if not words:
+            return self.annotate(rank=models.Value(0.0)).none()
+        match = " ".join(f'"{word}"' for word in words)
+        table = self.model._meta.db_table
+        rank = RawSQL(
+            # bm25() is lower for better matches, weighted by column
+            f"SELECT -bm25({table}_fts, 10.0, 5.0, 1.0) FROM {table}_fts "
+            f"WHERE {table}_fts MATCH %s AND rowid = {table}.id",
+            [match],
+            output_field=models.FloatField(),
+        )
+        matches = RawSQL(
+            f"SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH %s", [match]
+        )
+        return self.filter(pk__in=matches).annotate(rank=rank)
+
+    def touch(self):
+        """
+        Mark events as changed, for changes to rows that belong to them.
+        """
+        return self.update(updated_at=timezone.now())
+
+    def repair_attendee_counts(self):
+        """
+        Recalculate the denormalised attendee_count from the RSVP table.
+
+        Only rows whose stored count has drifted are written. Returns the
+        number of events that were corrected.
+        """
+        rsvp_count = (
+            RSVP.objects.filter(event=OuterRef("pk"))
+            .order_by()
+            .values("event")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        actual_count = Coalesce(models.Subquery(rsvp_count), 0)
+        return (
+            self.annotate(actual_count=actual_count)
+            .exclude(attendee_count=F("actual_count"))
+            .update(attendee_count=actual_count)
+        )
+
 
 class EventManager(models.Manager):
     def get_queryset(self):
@@ -50,12 +152,24 @@ class EventManager(models.Manager):
     def with_has_user_rsvp(self, user):
         return self.get_queryset().with_has_user_rsvp(user)
 
+    def with_is_accepting_attendees(self, now=None):
+        return self.get_queryset().with_is_accepting_attendees(now)
+
     def in_future(self):
         return self.get_queryset().in_future()
 
     def in_past(self):
         return self.get_queryset().in_past()
 
+    def search(self, terms):
+        return self.get_queryset().search(terms)
+
+    def touch(self):
+        return self.get_queryset().touch()
+
+    def repair_attendee_counts(self):
+        return self.get_queryset().repair_attendee_counts()
+
 
 class Event(models.Model):
     objects = EventManager()
@@ -67,11 +181,16 @@ class Event(models.Model):
         User, on_delete=models.CASCADE, related_name="is_contact"
     )
     maximum_attendees = models.IntegerField()
+    # Maintained by the RSVP signal handlers below, see repair_attendee_counts
+    attendee_count = models.PositiveIntegerField(default=0, editable=False)
     respondents = models.ManyToManyField(User, through="RSVP")
     starts_at = models.DateTimeField()
     ends_at = models.DateTimeField()
     location = models.TextField(max_length=400)
     description = models.TextField(max_length=2000, blank=True)
+    # Also moved on by changes to the event's RSVPs, requirements and
+    # commitments, for conditional GETs of its pages
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         constraints = [
@@ -80,10 +199,36 @@ class Event(models.Model):
                 name="end_datetime_after_start_datetime",
             )
         ]
+        indexes = [
+            # Keyset pagination keys for the TimeFilterOptions orderings
+            models.Index(fields=["ends_at", "id"], name="event_ends_at_id_idx"),
+            models.Index(
+                fields=["attendee_count", "id"], name="event_attendee_count_id_idx"
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        event = super().from_db(db, field_names, values)
+        # To tell whether a save moves the event's end, see
+        # bump_cached_event_counts
+        event._loaded_ends_at = event.__dict__.get("ends_at")
+        return event
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            # attendee_count is only ever changed with F() updates - writing
+            # back this instance's copy could undo a concurrent (un)attend.
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "attendee_count"
+            ]
+        super().save(*args, **kwargs)
 
     @property
     def accepting_attendees(self):
-        remaining_spaces = max(self.maximum_attendees - self.get_attendee_count(), 0)
+        remaining_spaces = max(self.maximum_attendees - self.attendee_count, 0)
 
         return self.ends_at > timezone.now() and remaining_spaces > 0
 
@@ -94,18 +239,55 @@ class Event(models.Model):
     def get_contribution_requirements(self):
         return ContributionRequirement.objects.filter(event=self)
 
-    def get_attendee_count(self):
-        return RSVP.objects.filter(event=self).count()
-
     def __str__(self):
         return f"{self.title}, {self.starts_at} - {self.ends_at}"
 
 
+class RSVPQuerySet(models.QuerySet):
+    def attend(self, event, user):
+        """
+        RSVP user to event, if it has space left and has not ended.
+
+        The space is taken by one conditional UPDATE of the event's
+        attendee_count, so the capacity check and the increment happen
+        together under the row's write lock and concurrent requests can
+        never take the count past maximum_attendees. Returns the new RSVP,
+        or None if the event was full, had ended or does not exist. If user
+        is already attending, IntegrityError is raised and the space given
+        back.
+        """
+        event_id = getattr(event, "pk", event)
+        now = timezone.now()
+        with transaction.atomic(using=self.db):
+            claimed = (
+                Event.objects.using(self.db)
+                .filter(
+                    pk=event_id,
+                    attendee_count__lt=F("maximum_attendees"),
+                    ends_at__gt=now,
+                )
+                .update(attendee_count=F("attendee_count") + 1, updated_at=now)
+            )
+            if not claimed:
+                return None
+            # bulk_create skips increment_attendee_count, as the space is
+            # already counted, and with it the other post_save handlers
+            (rsvp,) = self.bulk_create([RSVP(event_id=event_id, user=user)])
+            WaitlistEntry.objects.using(self.db).filter(
+                event_id=event_id, user=user
+            ).delete()
+        bump_event_version(event_id)
+        bump_attendance_generation()
+        return rsvp
+
+
 class RSVP(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = RSVPQuerySet.as_manager()
+
     class Meta:
         unique_together = [("user", "event")]
 
@@ -113,30 +295,280 @@ class RSVP(models.Model):
         return f"Attending {self.event.title}"
 
 
-class ContributionItemQuerySet(models.QuerySet):
-    def filter_for_event(self, event):
-        subquery = ContributionRequirement.objects.filter(event=event).values(
-            "contribution_item_id"
+@receiver(post_save, sender=RSVP)
+def increment_attendee_count(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Event.objects.filter(pk=instance.event_id).update(
+            attendee_count=F("attendee_count") + 1, updated_at=timezone.now()
         )
-        return self.filter(id__in=models.Subquery(subquery))
 
-    def with_counts_for_event(self, event):
-        return self.annotate(
-            requirements_count=Count(
-                "contributionrequirement",
-                filter=Q(contributionrequirement__event=event),
-                distinct=True,
-            ),
-            commitments_count=Count(
-                "contributionrequirement__contributioncommitment",
-                filter=Q(contributionrequirement__event=event),
+
+@receiver(post_delete, sender=RSVP)
+def decrement_attendee_count(sender, instance, **kwargs):
+    Event.objects.filter(pk=instance.event_id).update(
+        attendee_count=Greatest(F("attendee_count") - 1, 0),
+        updated_at=timezone.now(),
+    )
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=RSVP)
+@receiver(post_delete, sender=RSVP)
+def bump_cached_event_version(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if sender is Event:
+        bump_event_version(instance.pk)
+        bump_page_generation()
+    else:
+        # Cached pages are kept, and brought up to date in the browser
+        bump_event_version(instance.event_id)
+        bump_attendance_generation()
+
+
+@receiver(post_delete, sender=Event)
+def purge_cached_pages(sender, instance, **kwargs):
+    bump_page_generation()
+    bump_count_generation()
+
+
+@receiver(post_save, sender=Event)
+def bump_cached_event_counts(sender, instance, created, raw=False, **kwargs):
+    # Only when the event is new or may have moved between the future and
+    # past lists
+    if raw:
+        return
+    if created or getattr(instance, "_loaded_ends_at", None) != instance.ends_at:
+        bump_count_generation()
+    instance._loaded_ends_at = instance.ends_at
+
+
+class WaitlistEntryQuerySet(models.QuerySet):
+    def join(self, event, user):
+        """
+        Add user to the end of event's waitlist, then fill any free spaces,
+        which may take user straight off it again. Returns the entry, or
+        None if user was given a space.
+        """
+        event_id = getattr(event, "pk", event)
+        entry, created = self.get_or_create(event_id=event_id, user=user)
+        if created:
+            # The event's pages now show user's place on the waitlist
+            Event.objects.using(self.db).filter(pk=event_id).touch()
+        self.promote(event_id)
+        return self.filter(pk=entry.pk).first()
+
+    def leave(self, event, user):
+        """
+        Take user off event's waitlist, returning whether they were on it.
+        The event is touched, as everyone behind user moves up a place.
+        """
+        event_id = getattr(event, "pk", event)
+        deleted, _ = self.filter(event_id=event_id, user=user).delete()
+        if deleted:
+            Event.objects.using(self.db).filter(pk=event_id).touch()
+        return bool(deleted)
+
+    def position(self, event, user):
+        """
+        user's place on event's waitlist, counting from 1, or 0 if they are
+        not on it. One query, so views can show it without loading the entry.
+        """
+        return self._up_to(event, user).count()
+
+    async def aposition(self, event, user):
+        return await self._up_to(event, user).acount()
+
+    def _up_to(self, event, user):
+        entry = self.filter(event=event, user=user).values("pk")
+        return self.filter(event=event, pk__lte=models.Subquery(entry))
+
+    def promote(self, event):
+        """
+        Give event's free spaces to the users who have waited longest.
+
+        Set based, whatever the number of spaces: one query each to lock the
+        event and count its spaces, pick the entries, create their RSVPs,
+        count them and remove the entries. The event row is locked first,
+        as RSVPQuerySet.attend's UPDATE locks it, so attends and promotions
+        never take the same space or wait on each other's RSVPs. Returns the
+        number of users promoted.
+        """
+        event_id = getattr(event, "pk", event)
+        now = timezone.now()
+        with transaction.atomic(using=self.db):
+            spaces = (
+                Event.objects.using(self.db)
+                .select_for_update()
+                .filter(pk=event_id, ends_at__gt=now)
+                .values_list(
+                    Greatest(F("maximum_attendees") - F("attendee_count"), 0),
+                    flat=True,
+                )
+                .first()
+            )
+            if not spaces:
+                return 0
+            promoted = list(
+                self.filter(event_id=event_id)
+                .filter(
+                    ~Exists(
+                        RSVP.objects.filter(event_id=event_id, user=OuterRef("user"))
+                    )
+                )
+                .order_by("pk")
+                .values_list("pk", "user_id")[:spaces]
+            )
+            if not promoted:
+                return 0
+            # bulk_create skips the RSVP signal handlers, so the spaces are
+            # counted with one UPDATE and the caches bumped below
+            RSVP.objects.using(self.db).bulk_create(
+                RSVP(event_id=event_id, user_id=user_id) for _, user_id in promoted
+            )
+            Event.objects.using(self.db).filter(pk=event_id).update(
+                attendee_count=F("attendee_count") + len(promoted), updated_at=now
+            )
+            self.filter(pk__in=[pk for pk, _ in promoted]).delete()
+        bump_event_version(event_id)
+        bump_attendance_generation()
+        return len(promoted)
+
+
+class WaitlistEntry(models.Model):
+    """
+    A user waiting for a space at a full event, promoted in pk order.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = WaitlistEntryQuerySet.as_manager()
+
+    class Meta:
+        unique_together = [("user", "event")]
+        indexes = [
+            models.Index(fields=["event", "id"], name="waitlist_event_id_idx"),
+        ]
+        verbose_name_plural = "waitlist entries"
+
+    def get_position(self):
+        return WaitlistEntry.objects.filter(
+            event_id=self.event_id, pk__lte=self.pk
+        ).count()
+
+    def __str__(self):
+        return f"Waiting for {self.event.title}"
+
+
+@receiver(post_delete, sender=RSVP)
+def promote_from_waitlist(sender, instance, using, origin=None, **kwargs):
+    # Wherever the space was freed - unattending, an admin delete, a user
+    # deleting their account - once it is committed, so promote() can see
+    # it. Not when the event itself is being deleted, as there is nothing
+    # left to promote to.
+    if not isinstance(origin, (Event, EventQuerySet)):
+        transaction.on_commit(
+            lambda: WaitlistEntry.objects.using(using).promote(instance.event_id),
+            using=using,
+        )
+
+
+class ContributionItemQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.normalized_title = normalize_title(obj.title)
+        created = super().bulk_create(objs, *args, **kwargs)
+        # There are no signals from bulk_create to bump it
+        bump_contribution_item_version()
+        return created
+
+    def get_or_create_by_title(self, title):
+        """
+        The item whose title normalizes to the same as title, so "Beers"
+        finds "beer", or a new item titled title. Returns (item, created).
+        """
+        item = (
+            self.filter(normalized_title=normalize_title(title)).order_by("pk").first()
+        )
+        if item is not None:
+            return item, False
+        return self.get_or_create(title=title)
+
+    def autocomplete(self, terms, limit):
+        """
+        Up to limit (pk, title) pairs of items to suggest for terms, those
+        whose normalized title starts with them first.
+
+        On PostgreSQL with pg_trgm, the rest are the items most similar to
+        the terms by trigrams, with both read from indexes on
+        normalized_title (see migration 0013). Elsewhere they are the items
+        with a later word that starts with the terms, from the in-memory
+        events.autocomplete.title_index.
+        """
+        prefix = normalize_title(terms)
+        if not prefix:
+            return []
+        if uses_trigram_index(self.db):
+            return self._autocomplete_trigram(prefix, limit)
+        title_index.ensure_current(
+            get_contribution_item_version(),
+            lambda: list(
+                ContributionItem.objects.using(self.db)
+                .order_by("pk")
+                .values_list("pk", "title", "normalized_title")
             ),
+            background=settings.EVENTS_AUTOCOMPLETE_BACKGROUND_REBUILD,
         )
+        return title_index.search(prefix, limit)
+
+    def _autocomplete_trigram(self, prefix, limit):
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        matches = list(
+            # In the order of the "C" collation index, which can answer both
+            self.alias(sort_title=Collate("normalized_title", "C"))
+            .filter(sort_title__startswith=prefix)
+            .order_by("sort_title", "pk")
+            .values_list("pk", "title")[:limit]
+        )
+        if len(matches) < limit:
+            matches += (
+                self.filter(TrigramMatch(F("normalized_title"), models.Value(prefix)))
+                .exclude(pk__in=[pk for pk, _ in matches])
+                .annotate(similarity=TrigramSimilarity("normalized_title", prefix))
+                .order_by("-similarity", "pk")
+                .values_list("pk", "title")[: limit - len(matches)]
+            )
+        return matches
+
+
+class TrigramMatch(models.Func):
+    """
+    pg_trgm's similarity operator, true when the trigram similarity of the
+    two is above pg_trgm.similarity_threshold - which its indexes can
+    answer, unlike a comparison with similarity().
+    """
+
+    arg_joiner = " %% "
+    template = "%(expressions)s"
+    output_field = models.BooleanField()
 
 
 class ContributionItem(models.Model):
     objects = ContributionItemQuerySet.as_manager()
     title = models.TextField(unique=True)
+    # Shared by near-duplicate titles, see events.autocomplete.normalize_title
+    normalized_title = models.TextField(db_index=True, editable=False)
+
+    def save(self, *args, **kwargs):
+        self.normalized_title = normalize_title(self.title)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "title" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "normalized_title"}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.pk} - {self.title}"
@@ -148,21 +580,382 @@ class ContributionRequirementQuerySet(models.QuerySet):
             contributioncommitment__isnull=False
         )
 
+    def claim_for_rsvp(self, rsvp, contribution_item, quantity):
+        """
+        Commit rsvp to bring up to quantity of contribution_item, claiming
+        unfulfilled requirements for its event.
+
+        On databases with SKIP LOCKED, requirements being claimed by a
+        concurrent request are passed over rather than waited for. Elsewhere
+        (SQLite) claims for the item are serialized by writing to its summary
+        row first, which takes the database write lock. Returns the number of
+        requirements claimed, which is less than quantity if there were not
+        enough left.
+        """
+        event_id = rsvp.event_id
+        contribution_item_id = getattr(contribution_item, "pk", contribution_item)
+        unfulfilled = self.get_unfulfilled_requirements_for_item_for_event(
+            contribution_item_id, event_id
+        ).order_by("pk")
+        with transaction.atomic(using=self.db):
+            if connections[self.db].features.has_select_for_update_skip_locked:
+                locked_pks = list(
+                    unfulfilled.select_for_update(
+                        skip_locked=True, of=("self",)
+                    ).values_list("pk", flat=True)[:quantity]
+                )
+                # Check again now the rows are locked - a claim committed
+                # while the locking query ran would not have been visible to
+                # it, and nothing else can claim these rows from here on.
+                requirement_pks = list(
+                    self.filter(
+                        pk__in=locked_pks, contributioncommitment__isnull=True
+                    ).values_list("pk", flat=True)
+                )
+            else:
+                ContributionSummary.objects.using(self.db).filter(
+                    event_id=event_id, contribution_item_id=contribution_item_id
+                ).update(committed=F("committed"))
+                requirement_pks = list(
+                    unfulfilled.values_list("pk", flat=True)[:quantity]
+                )
+
+            ContributionCommitment.objects.using(self.db).bulk_create(
+                ContributionCommitment(RSVP=rsvp, contribution_requirement_id=pk)
+                for pk in requirement_pks
+            )
+            # bulk_create skips the signal handlers that maintain the summary
+            ContributionSummary.objects.using(self.db).adjust(
+                event_id, contribution_item_id, committed=len(requirement_pks)
+            )
+        return len(requirement_pks)
+
+    def set_quantity(self, event, contribution_item, quantity):
+        """
+        Add or remove unfulfilled requirements so that quantity of
+        contribution_item are required for event.
+
+        Resizes for the item are serialized by writing to its summary row
+        before anything else is read, and the current counts are read under
+        that lock. Growing is a
+        single bulk insert and shrinking a single DELETE of the newest
+        unfulfilled requirements - on databases with SKIP LOCKED, any being
+        claimed at that moment are left alone. Requirements that have been
+        committed to are never removed, so a quantity below the committed
+        count is refused and nothing changes. Returns the number of
+        requirements there are afterwards.
+        """
+        event_id = getattr(event, "pk", event)
+        contribution_item_id = getattr(contribution_item, "pk", contribution_item)
+        requirements = self.filter(
+            event_id=event_id, contribution_item_id=contribution_item_id
+        )
+        summary = ContributionSummary.objects.using(self.db).filter(
+            event_id=event_id, contribution_item_id=contribution_item_id
+        )
+        with transaction.atomic(using=self.db):
+            # The event row is locked before the summary row, as everywhere
+            # else that writes both
+            Event.objects.using(self.db).filter(pk=event_id).touch()
+            summary.update(required=F("required"))
+            counts = requirements.aggregate(
+                required=Count("pk", distinct=True),
+                committed=Count("contributioncommitment"),
+            )
+            required = counts["required"]
+            if quantity < counts["committed"]:
+                return required
+
+            if quantity > required:
+                self.bulk_create(
+                    ContributionRequirement(
+                        event_id=event_id, contribution_item_id=contribution_item_id
+                    )
+                    for _ in range(quantity - required)
+                )
+                required = quantity
+            elif quantity < required:
+                unfulfilled = self.get_unfulfilled_requirements_for_item_for_event(
+                    contribution_item_id, event_id
+                ).order_by("-pk")
+                if connections[self.db].features.has_select_for_update_skip_locked:
+                    unfulfilled = unfulfilled.select_for_update(
+                        skip_locked=True, of=("self",)
+                    )
+                required -= self._delete_in_one_statement(
+                    unfulfilled.values("pk")[: required - quantity]
+                )
+
+            # Written outright rather than adjusted, as the counts were read
+            # under the lock - this also corrects any drift for the item.
+            if not summary.update(required=required, committed=counts["committed"]):
+                summary.create(
+                    event_id=event_id,
+                    contribution_item_id=contribution_item_id,
+                    required=required,
+                    committed=counts["committed"],
+                )
+        return required
+
+    def _delete_in_one_statement(self, pks):
+        """
+        DELETE the requirements whose pk is in the pks queryset, returning
+        how many there were.
+
+        Through the cursor, as QuerySet.delete() would load every row to
+        send the post_delete signal that adjusts the summary one row at a
+        time, and check each for commitments. Unfulfilled requirements have
+        none, and set_quantity() writes the summary itself.
+        """
+        connection = connections[self.db]
+        subquery, params = pks.query.get_compiler(self.db).as_sql()
+        meta = self.model._meta
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {connection.ops.quote_name(meta.db_table)} "
+                f"WHERE {connection.ops.quote_name(meta.pk.column)} IN ({subquery})",
+                params,
+            )
+            return cursor.rowcount
+
 
 class ContributionRequirement(models.Model):
     objects = ContributionRequirementQuerySet.as_manager()
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
     contribution_item = models.ForeignKey(ContributionItem, on_delete=models.PROTECT)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["event", "contribution_item"],
+                name="requirement_event_item_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.pk} - {self.contribution_item.title}"
 
 
+class ContributionCommitmentQuerySet(models.QuerySet):
+    def delete(self):
+        """
+        Delete the commitments, taking them off ContributionSummary in the
+        same transaction with one adjust() per item.
+
+        Cascades from a deleted RSVP go through the base manager rather than
+        this, so stay a single DELETE - decrement_committed_counts takes
+        those off the summary.
+        """
+        with transaction.atomic(using=self.db):
+            counts = list(
+                self.order_by()
+                .values_list(
+                    "contribution_requirement__event_id",
+                    "contribution_requirement__contribution_item_id",
+                )
+                .annotate(count=Count("pk"))
+            )
+            for event_id, contribution_item_id, count in counts:
+                ContributionSummary.objects.using(self.db).adjust(
+                    event_id, contribution_item_id, committed=-count
+                )
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class ContributionCommitment(models.Model):
     RSVP = models.ForeignKey(RSVP, on_delete=models.CASCADE)
     contribution_requirement = models.ForeignKey(
         ContributionRequirement, on_delete=models.RESTRICT
     )
 
+    objects = ContributionCommitmentQuerySet.as_manager()
+
+    def delete(self, using=None, keep_parents=False):
+        using = using or router.db_for_write(self.__class__, instance=self)
+        with transaction.atomic(using=using):
+            requirement = self.contribution_requirement
+            ContributionSummary.objects.using(using).adjust(
+                requirement.event_id, requirement.contribution_item_id, committed=-1
+            )
+            return super().delete(using, keep_parents)
+
     def __str__(self):
         return f"{self.RSVP.user} bringing {self.contribution_requirement}"
+
+
+class ContributionSummaryQuerySet(models.QuerySet):
+    def adjust(self, event_id, contribution_item_id, required=0, committed=0):
+        """
+        Add to the required and committed counts for an item at an event.
+
+        The row is created the first time an item is required. Decrements
+        only ever update an existing row, so they are safe to run while an
+        event and its summaries are being cascade deleted. The event is
+        touched, as its contributions have changed.
+        """
+        Event.objects.using(self.db).filter(pk=event_id).touch()
+        summary = self.filter(
+            event_id=event_id, contribution_item_id=contribution_item_id
+        )
+        changes = {
+            "required": Greatest(F("required") + required, 0),
+            "committed": Greatest(F("committed") + committed, 0),
+        }
+        if summary.update(**changes) or required <= 0:
+            return
+        try:
+            with transaction.atomic(using=self.db):
+                self.create(
+                    event_id=event_id,
+                    contribution_item_id=contribution_item_id,
+                    required=required,
+                    committed=max(committed, 0),
+                )
+        except IntegrityError:
+            # Created by a concurrent request since the update above
+            summary.update(**changes)
+
+    def rebuild(self):
+        """
+        Recalculate every summary row from the requirement and commitment
+        tables.
+
+        Only rows that have drifted are written. Returns the number of rows
+        that were created, corrected or removed.
+        """
+        counts = {}
+        requirements = (
+            ContributionRequirement.objects.using(self.db)
+            .order_by()
+            .values_list("event_id", "contribution_item_id")
+            .annotate(count=Count("pk"))
+        )
+        for event_id, contribution_item_id, count in requirements:
+            counts[event_id, contribution_item_id] = [count, 0]
+        commitments = (
+            ContributionCommitment.objects.using(self.db)
+            .order_by()
+            .values_list(
+                "contribution_requirement__event_id",
+                "contribution_requirement__contribution_item_id",
+            )
+            .annotate(count=Count("pk"))
+        )
+        for event_id, contribution_item_id, count in commitments:
+            counts[event_id, contribution_item_id][1] = count
+
+        repaired = 0
+        with transaction.atomic(using=self.db):
+            for summary in self.select_for_update():
+                key = (summary.event_id, summary.contribution_item_id)
+                required, committed = counts.pop(key, (0, 0))
+                if required == 0:
+                    summary.delete()
+                    repaired += 1
+                elif (summary.required, summary.committed) != (required, committed):
+                    summary.required = required
+                    summary.committed = committed
+                    summary.save(update_fields=["required", "committed"])
+                    repaired += 1
+            self.bulk_create(
+                ContributionSummary(
+                    event_id=event_id,
+                    contribution_item_id=contribution_item_id,
+                    required=required,
+                    committed=committed,
+                )
+                for (event_id, contribution_item_id), (
+                    required,
+                    committed,
+                ) in counts.items()
+            )
+        return repaired + len(counts)
+
+
+class ContributionSummary(models.Model):
+    """
+    Requirement and commitment counts for each item requested for an event.
+
+    Kept in step with the requirement and commitment tables in the same
+    transaction as every write to them - by the signal handlers below, and
+    by explicit adjust() calls after bulk writes. See
+    ContributionSummaryQuerySet.rebuild for recovering from drift.
+    """
+
+    objects = ContributionSummaryQuerySet.as_manager()
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    contribution_item = models.ForeignKey(ContributionItem, on_delete=models.CASCADE)
+    required = models.PositiveIntegerField(default=0)
+    committed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event", "contribution_item"],
+                name="contribution_summary_event_item_unique",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.committed} / {self.required} {self.contribution_item}"
+
+
+@receiver(post_save, sender=ContributionItem)
+@receiver(post_delete, sender=ContributionItem)
+def bump_cached_contribution_item_version(sender, raw=False, **kwargs):
+    if not raw:
+        bump_contribution_item_version()
+
+
+@receiver(post_save, sender=ContributionRequirement)
+def increment_required_count(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        ContributionSummary.objects.adjust(
+            instance.event_id, instance.contribution_item_id, required=1
+        )
+
+
+@receiver(post_delete, sender=ContributionRequirement)
+def decrement_required_count(sender, instance, **kwargs):
+    ContributionSummary.objects.adjust(
+        instance.event_id, instance.contribution_item_id, required=-1
+    )
+
+
+@receiver(post_save, sender=ContributionCommitment)
+def increment_committed_count(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        requirement = instance.contribution_requirement
+        ContributionSummary.objects.adjust(
+            requirement.event_id, requirement.contribution_item_id, committed=1
+        )
+
+
+@receiver(pre_delete, sender=RSVP)
+def decrement_committed_counts(sender, instance, **kwargs):
+    """
+    Take an RSVP's commitments off the summary before they are cascade
+    deleted with it, in one UPDATE for all of the RSVP's items.
+
+    Commitments deleted on their own take themselves off the summary, see
+    ContributionCommitmentQuerySet.delete. Leaving them without delete
+    signal handlers lets the cascade from an RSVP be a single DELETE.
+    """
+    commitments = ContributionCommitment.objects.filter(RSVP=instance).order_by()
+    committed_by_rsvp = (
+        commitments.filter(
+            contribution_requirement__contribution_item=OuterRef("contribution_item")
+        )
+        .values("RSVP")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    ContributionSummary.objects.filter(
+        event_id=instance.event_id,
+        contribution_item__in=commitments.values(
+            "contribution_requirement__contribution_item"
+        ),
+    ).update(committed=Greatest(F("committed") - models.Subquery(committed_by_rsvp), 0))
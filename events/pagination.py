@@ -0,0 +1,356 @@
+import collections.abc
+import datetime
+import json
+import math
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class KeysetPaginator:
+    """
+    Paginate an ordered queryset by seeking past the ordering keys of the
+    page the user came from, rather than with OFFSET.
+
+    The queryset's order_by() fields are the keys, with the primary key
+    appended as a tie-breaker, so every page is an index range read that
+    costs the same however deep it is. Pages are addressed by opaque signed
+    cursors instead of numbers. Page numbers are carried along in the cursor
+    for display only.
+
+    count and num_pages are only computed if they are used, and are a
+    snapshot - rows added after the first page was served are not reflected
+    in cursors that were already handed out.
+    """
+
+    salt = "events.pagination"
+
+    def __init__(self, object_list, per_page, with_count=True):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.with_count = with_count
+        self.ordering = self._get_ordering(object_list)
+
+    @staticmethod
+    def _get_ordering(object_list):
+        ordering = [str(field) for field in object_list.query.order_by]
+        if not ordering:
+            raise ValueError("KeysetPaginator requires an ordered queryset")
+        pk_name = object_list.model._meta.pk.name
+        if ordering[-1].lstrip("-") not in (pk_name, "pk"):
+            descending = ordering[0].startswith("-")
+            ordering.append(f"-{pk_name}" if descending else pk_name)
+        return ordering
+
+    @cached_property
+    def count(self):
+        if not self.with_count:
+            return None
+        return self.object_list.order_by().count()
+
+    @cached_property
+    def num_pages(self):
+        if self.count is None:
+            return None
+        return max(math.ceil(self.count / self.per_page), 1)
+
+    def page(self, cursor=None):
+        queryset, ordering, size, build = self._plan_page(cursor)
+        page = build(self._fetch(queryset, ordering, size))
+        if page is None:
+            # Walked back to the start - realign with the first page
+            queryset, ordering, size, build = self._plan_page(None)
+            page = build(self._fetch(queryset, ordering, size))
+        return page
+
+    async def apage(self, cursor=None):
+        """
+        page() with the async ORM, for async views.
+        """
+        if cursor and self.decode_cursor(cursor).get("d") == "last":
+            # The last page's size depends on the count, which may have to
+            # be counted - and cached - in the sync thread
+            await sync_to_async(lambda: self.count)()
+        queryset, ordering, size, build = self._plan_page(cursor)
+        page = build(await self._afetch(queryset, ordering, size))
+        if page is None:
+            queryset, ordering, size, build = self._plan_page(None)
+            page = build(await self._afetch(queryset, ordering, size))
+        return page
+
+    def _plan_page(self, cursor):
+        """
+        The queryset, ordering and size of the rows to fetch for the page at
+        cursor, and a function building the page from them - which returns
+        None if the first page should be built instead.
+        """
+        if not cursor:
+            return self.object_list, self.ordering, None, self._first_page
+        position = self.decode_cursor(cursor)
+        direction = position.get("d")
+        if direction == "last":
+            return self._plan_last_page()
+        elif "v" not in position:
+            raise InvalidCursor("That page cursor is not valid")
+        elif direction == "next":
+            return (
+                self.object_list.filter(self._seek(position["v"], forwards=True)),
+                self.ordering,
+                None,
+                lambda rows: self._page_after(rows, position.get("p")),
+            )
+        elif direction == "previous":
+            return (
+                self.object_list.filter(self._seek(position["v"], forwards=False)),
+                self._reversed_ordering(),
+                None,
+                lambda rows: self._page_before(rows, position.get("p")),
+            )
+        raise InvalidCursor("That page cursor is not valid")
+
+    def encode_cursor(self, direction, values=None, number=None):
+        position = {"d": direction, "p": number}
+        if values is not None:
+            position["v"] = [self._to_json(value) for value in values]
+        return signing.dumps(position, salt=self.salt, compress=True)
+
+    def decode_cursor(self, cursor):
+        try:
+            position = signing.loads(cursor, salt=self.salt)
+        except signing.BadSignature:
+            raise InvalidCursor("That page cursor is not valid")
+        if not isinstance(position, dict):
+            raise InvalidCursor("That page cursor is not valid")
+        if "v" in position:
+            if len(position["v"]) != len(self.ordering):
+                raise InvalidCursor("That page cursor is not valid")
+            try:
+                position["v"] = [
+                    self._to_python(name, value)
+                    for name, value in zip(self.ordering, position["v"])
+                ]
+            except ValidationError:
+                raise InvalidCursor("That page cursor is not valid")
+        return position
+
+    def get_values(self, obj):
+        return [getattr(obj, name.lstrip("-")) for name in self.ordering]
+
+    @staticmethod
+    def _to_json(value):
+        if isinstance(value, (datetime.date, datetime.time)):
+            # Full precision - DjangoJSONEncoder drops microseconds
+            return value.isoformat()
+        return value
+
+    def _to_python(self, name, value):
+        try:
+            field = self.object_list.model._meta.get_field(name.lstrip("-"))
+        except FieldDoesNotExist:
+            return value
+        return field.to_python(value)
+
+    def _seek(self, values, forwards):
+        """
+        Q matching the rows after (or before) values in the page ordering.
+
+        Expands (a, b) > (x, y) to a > x OR (a = x AND b > y), which works
+        for mixed sort directions and on every backend.
+        """
+        condition = Q()
+        for index, name in enumerate(self.ordering):
+            field = name.lstrip("-")
+            descending = name.startswith("-")
+            lookup = "lt" if descending == forwards else "gt"
+            clause = Q(**{f"{field}__{lookup}": values[index]})
+            for previous_name, previous_value in zip(
+                self.ordering[:index], values[:index]
+            ):
+                clause &= Q(**{previous_name.lstrip("-"): previous_value})
+            condition |= clause
+        return condition
+
+    def _reversed_ordering(self):
+        return [
+            name[1:] if name.startswith("-") else f"-{name}" for name in self.ordering
+        ]
+
+    def _fetch(self, queryset, ordering, size=None):
+        """
+        Up to size rows (per_page by default), and one more to tell whether
+        there are others beyond them.
+        """
+        size = size or self.per_page
+        return list(queryset.order_by(*ordering)[: size + 1])
+
+    async def _afetch(self, queryset, ordering, size=None):
+        size = size or self.per_page
+        return [row async for row in queryset.order_by(*ordering)[: size + 1]]
+
+    def _first_page(self, rows):
+        has_next = len(rows) > self.per_page
+        if not has_next and self.with_count:
+            # Everything fits on one page, so the rows are the total
+            self.__dict__["count"] = len(rows)
+        return KeysetPage(rows[: self.per_page], 1, self, False, has_next)
+
+    def _page_after(self, rows, number):
+        has_next = len(rows) > self.per_page
+        return KeysetPage(rows[: self.per_page], number, self, True, has_next)
+
+    def _page_before(self, rows, number):
+        if len(rows) <= self.per_page:
+            return None
+        rows = rows[: self.per_page]
+        rows.reverse()
+        number = max(number, 2) if number else None
+        return KeysetPage(rows, number, self, True, True)
+
+    def _plan_last_page(self):
+        # Only the rows past the last full page, so that walking back from
+        # here lands on the same pages as walking forwards. Without a count
+        # its size is unknown, and it is a full page of the final rows.
+        size = self.per_page
+        if self.count:
+            size = self.count % self.per_page or self.per_page
+
+        def build(rows):
+            if len(rows) <= size:
+                return None
+            rows = rows[:size]
+            rows.reverse()
+            return KeysetPage(rows, self.num_pages, self, True, False)
+
+        return self.object_list, self._reversed_ordering(), size, build
+
+
+class CachedCountKeysetPaginator(KeysetPaginator):
+    """
+    A KeysetPaginator whose count is cached under count_cache_key for
+    settings.EVENTS_COUNT_CACHE_SECONDS, so it is not recounted on every
+    page view, and only one request recounts it when it expires.
+
+    On PostgreSQL the planner's row estimate is used instead of a COUNT
+    when it is above settings.EVENTS_COUNT_ESTIMATE_THRESHOLD, as counting
+    that many rows costs more than a precise total is worth. count_is_estimate
+    says which it is.
+    """
+
+    def __init__(self, object_list, per_page, count_cache_key=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_cache_key = count_cache_key
+        self._count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        if not self.with_count:
+            return None
+        if self.count_cache_key:
+            # Single-flight, so an expired count is only recounted once
+            count, self._count_is_estimate = cache.get_or_set(
+                self.count_cache_key,
+                self._get_count,
+                settings.EVENTS_COUNT_CACHE_SECONDS,
+            )
+        else:
+            count, self._count_is_estimate = self._get_count()
+        return count
+
+    def _get_count(self):
+        estimate = self.estimate_count()
+        if estimate is not None and estimate > settings.EVENTS_COUNT_ESTIMATE_THRESHOLD:
+            return estimate, True
+        return self.object_list.order_by().count(), False
+
+    @property
+    def count_is_estimate(self):
+        return self.count is not None and self._count_is_estimate
+
+    def estimate_count(self):
+        """
+        The planner's estimate of the rows in object_list, or None if the
+        database cannot give one.
+        """
+        queryset = self.object_list.order_by()
+        if connections[queryset.db].vendor != "postgresql":
+            return None
+        plan = json.loads(queryset.explain(format="json"))
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetPage(collections.abc.Sequence):
+    """
+    A single page of a KeysetPaginator, with cursors for its neighbours.
+
+    Mirrors the parts of django.core.paginator.Page the templates use.
+    """
+
+    def __init__(self, object_list, number, paginator, has_previous, has_next):
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __repr__(self):
+        return f"<Page {self.number}>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_previous or self._has_next
+
+    @cached_property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        values = self.paginator.get_values(self.object_list[-1])
+        number = self.number + 1 if self.number else None
+        return self.paginator.encode_cursor("next", values, number)
+
+    @cached_property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        values = self.paginator.get_values(self.object_list[0])
+        number = self.number - 1 if self.number else None
+        return self.paginator.encode_cursor("previous", values, number)
+
+    @cached_property
+    def last_cursor(self):
+        if not self._has_next:
+            return None
+        return self.paginator.encode_cursor("last")
+
+    def start_index(self):
+        if not self.object_list:
+            return 0
+        if self.number is None:
+            return None
+        return (self.number - 1) * self.paginator.per_page + 1
+
+    def end_index(self):
+        if self.number is None:
+            return None
+        return self.start_index() + len(self.object_list) - 1
@@ -0,0 +1,73 @@
+from hashlib import md5
+
+from django import template
+from django.core.cache import cache
+
+from events.cache import (
+    FRAGMENT_KEY,
+    FRAGMENT_TIMEOUT,
+    cache_stats,
+    get_event_versions,
+)
+
+register = template.Library()
+
+
+class VersionedCacheNode(template.Node):
+    def __init__(self, nodelist, fragment_name, event, vary_on):
+        self.nodelist = nodelist
+        self.fragment_name = fragment_name
+        self.event = event
+        self.vary_on = vary_on
+
+    def render(self, context):
+        event = self.event.resolve(context)
+        version = getattr(event, "cache_version", None)
+        if version is None:
+            version = get_event_versions([event.pk])[event.pk]
+        vary_on = md5(
+            ":".join(str(var.resolve(context)) for var in self.vary_on).encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+        key = FRAGMENT_KEY.format(
+            name=self.fragment_name, pk=event.pk, version=version, vary_on=vary_on
+        )
+        fragment = cache.get(key)
+        if fragment is None:
+            cache_stats["fragment_misses"] += 1
+            fragment = self.nodelist.render(context)
+            cache.set(key, fragment, FRAGMENT_TIMEOUT)
+        else:
+            cache_stats["fragment_hits"] += 1
+        return fragment
+
+
+@register.tag
+def versioned_cache(parser, token):
+    """
+    Cache the enclosed fragment until the event's version stamp changes.
+
+    Usage::
+
+        {% versioned_cache "fragment_name" event [vary_on ...] %}
+            ...
+        {% endversioned_cache %}
+
+    The stamp is bumped whenever the event or its RSVPs change (see
+    events.cache.bump_event_version), so nothing else needs invalidating.
+    Anything else the fragment depends on must be passed as vary_on.
+    """
+    nodelist = parser.parse(("endversioned_cache",))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' tag requires at least 2 arguments."
+        )
+    fragment_name = bits[1].strip("'\"")
+    return VersionedCacheNode(
+        nodelist,
+        fragment_name,
+        parser.compile_filter(bits[2]),
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
@@ -0,0 +1,170 @@
+import threading
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from events.autocomplete import TitleIndex, normalize_title, uses_trigram_index
+from events.models import ContributionItem
+
+
+class NormalizeTitleTestCase(SimpleTestCase):
+    def test_near_duplicates_share_a_normalized_title(self):
+        for titles in [
+            ["Beer", "beer", " BEERS ", "beer!"],
+            ["Paper plates", "paper-plates", "paper  plate"],
+            ["Crème brûlée", "creme brulee"],
+            ["Cookie", "cookies"],
+            ["Battery", "batteries"],
+            ["Glass", "glasses"],
+            ["Box", "boxes"],
+        ]:
+            with self.subTest(titles=titles):
+                self.assertEqual(len({normalize_title(title) for title in titles}), 1)
+
+    def test_different_items_stay_apart(self):
+        self.assertNotEqual(normalize_title("Bus"), normalize_title("Bu"))
+        self.assertNotEqual(normalize_title("Chips"), normalize_title("Crisps"))
+
+    def test_punctuation_only(self):
+        self.assertEqual(normalize_title(" -!- "), "")
+
+
+class TitleIndexTestCase(SimpleTestCase):
+    def setUp(self):
+        self.index = TitleIndex()
+        items = [
+            (1, "Craft lager", "craft lager"),
+            (2, "Lager", "lager"),
+            (3, "Lemonade", "lemonade"),
+            (4, "Lager shandy", "lager shandy"),
+        ]
+        self.index.rebuild(items, version=1)
+
+    def test_title_prefixes_come_before_word_prefixes(self):
+        self.assertEqual(
+            self.index.search("lag", 10),
+            [(2, "Lager"), (4, "Lager shandy"), (1, "Craft lager")],
+        )
+
+    def test_limit(self):
+        self.assertEqual(self.index.search("l", 2), [(2, "Lager"), (4, "Lager shandy")])
+
+    def test_items_are_suggested_once(self):
+        self.index.rebuild([(1, "Lager lager", "lager lager")], version=2)
+
+        self.assertEqual(self.index.search("lager", 10), [(1, "Lager lager")])
+
+    def test_only_rebuilt_when_the_version_moves_on(self):
+        def load_items():
+            loads.append(1)
+            return [(5, "Lime", "lime")]
+
+        loads = []
+        self.index.ensure_current(1, load_items)
+        self.assertEqual(loads, [])
+
+        self.index.ensure_current(2, load_items)
+        self.index.ensure_current(2, load_items)
+
+        self.assertEqual(loads, [1])
+        self.assertEqual(self.index.search("l", 10), [(5, "Lime")])
+
+    def test_background_rebuilds_keep_serving_the_old_index(self):
+        loading = threading.Event()
+
+        def load_items():
+            loading.wait(5)
+            return [(5, "Lime", "lime")]
+
+        self.index.ensure_current(2, load_items, background=True)
+        self.assertEqual(self.index.search("lem", 10), [(3, "Lemonade")])
+        self.assertEqual(self.index.version, 1)
+
+        loading.set()
+        self.index.thread.join(5)
+        self.assertEqual(self.index.search("l", 10), [(5, "Lime")])
+        self.assertEqual(self.index.version, 2)
+
+    def test_first_build_is_waited_for(self):
+        index = TitleIndex()
+
+        index.ensure_current(1, lambda: [(5, "Lime", "lime")], background=True)
+
+        self.assertIsNone(index.thread)
+        self.assertEqual(index.search("l", 10), [(5, "Lime")])
+
+
+class ContributionItemAutocompleteTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_normalized_title_is_kept_up_to_date(self):
+        item = ContributionItem.objects.create(title="Beers")
+        self.assertEqual(item.normalized_title, "beer")
+
+        item.title = "Ciders"
+        item.save(update_fields=["title"])
+        item.refresh_from_db()
+        self.assertEqual(item.normalized_title, "cider")
+
+        [bulk_item] = ContributionItem.objects.bulk_create(
+            [ContributionItem(title="Paper Plates")]
+        )
+        self.assertEqual(
+            ContributionItem.objects.get(pk=bulk_item.pk).normalized_title,
+            "paper plate",
+        )
+
+    def test_near_duplicates_are_found_by_title(self):
+        beer = ContributionItem.objects.create(title="Beer")
+
+        item, created = ContributionItem.objects.get_or_create_by_title("BEERS")
+        self.assertEqual((item, created), (beer, False))
+
+        item, created = ContributionItem.objects.get_or_create_by_title("Cider")
+        self.assertTrue(created)
+        self.assertEqual(item.title, "Cider")
+
+    def test_suggestions_follow_changes_to_items(self):
+        beer = ContributionItem.objects.create(title="Beer")
+        ContributionItem.objects.create(title="Cider")
+
+        self.assertEqual(
+            ContributionItem.objects.autocomplete("be", 10), [(beer.pk, "Beer")]
+        )
+
+        bean_dip = ContributionItem.objects.create(title="Bean dip")
+        beer.delete()
+
+        self.assertEqual(
+            ContributionItem.objects.autocomplete("be", 10), [(bean_dip.pk, "Bean dip")]
+        )
+
+    def test_index_is_not_reloaded_while_items_are_unchanged(self):
+        if uses_trigram_index(connection.alias):
+            self.skipTest("Suggestions come from the trigram index")
+        ContributionItem.objects.create(title="Beer")
+        ContributionItem.objects.autocomplete("be", 10)
+
+        with CaptureQueriesContext(connection) as ctx:
+            ContributionItem.objects.autocomplete("bee", 10)
+
+        self.assertEqual(len(ctx), 0)
+
+    def test_similar_titles_are_suggested_with_pg_trgm(self):
+        if not uses_trigram_index(connection.alias):
+            self.skipTest("pg_trgm is not installed")
+        lemonade = ContributionItem.objects.create(title="Lemonade")
+        ContributionItem.objects.create(title="Lemon cake")
+
+        self.assertEqual(
+            ContributionItem.objects.autocomplete("lemonaid", 10),
+            [(lemonade.pk, "Lemonade")],
+        )
+
+    def test_blank_terms_suggest_nothing(self):
+        ContributionItem.objects.create(title="Beer")
+
+        self.assertEqual(ContributionItem.objects.autocomplete(" ?! ", 10), [])
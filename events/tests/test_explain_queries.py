@@ -0,0 +1,36 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from events.management.commands.explain_queries import QUERY_INDEXES
+
+
+class ExplainQueriesTestCase(TestCase):
+    def get_index_names(self):
+        with connection.cursor() as cursor:
+            return {
+                name
+                for table in ["events_event", "events_contributionrequirement"]
+                for name in connection.introspection.get_constraints(cursor, table)
+            }
+
+    def test_plans_without_the_query_indexes(self):
+        with tempfile.TemporaryDirectory() as output:
+            call_command(
+                "explain_queries",
+                seed=10,
+                without_indexes=True,
+                label="before",
+                output=output,
+                repeat=1,
+                stdout=StringIO(),
+            )
+            plans = (Path(output) / "before.txt").read_text()
+
+        self.assertIn("== future events page", plans)
+        self.assertIn("== unfulfilled requirements for item for event", plans)
+        self.assertLessEqual(set(QUERY_INDEXES), self.get_index_names())
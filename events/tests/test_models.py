@@ -1,9 +1,20 @@
+import threading
 from datetime import datetime
 
-from django.test import TestCase
+from django.db import IntegrityError, connection
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
-from events.models import Event, RSVP
+from events.models import (
+    RSVP,
+    ContributionCommitment,
+    ContributionItem,
+    ContributionRequirement,
+    ContributionSummary,
+    Event,
+    WaitlistEntry,
+)
 from users.models import User
 
 
@@ -53,13 +64,17 @@ class EventTestCase(TestCase):
         RSVP.objects.create(event=cls.event_03, user=new_user_03)
 
         cls.event_queryset = Event.objects.with_attendance_fields()
-        cls.event_with_spaces = cls.event_queryset.get(pk=1)
-        cls.event_oversubscribed = cls.event_queryset.get(pk=2)
-        cls.event_past = cls.event_queryset.get(pk=3)
+        cls.event_with_spaces = cls.event_queryset.get(pk=cls.event_01.pk)
+        cls.event_oversubscribed = cls.event_queryset.get(pk=cls.event_02.pk)
+        cls.event_past = cls.event_queryset.get(pk=cls.event_03.pk)
 
         cls.event_authenticated_queryset = Event.objects.with_has_user_rsvp(new_user_01)
-        cls.event_user_attending = cls.event_authenticated_queryset.get(pk=2)
-        cls.event_user_not_attending = cls.event_authenticated_queryset.get(pk=1)
+        cls.event_user_attending = cls.event_authenticated_queryset.get(
+            pk=cls.event_02.pk
+        )
+        cls.event_user_not_attending = cls.event_authenticated_queryset.get(
+            pk=cls.event_01.pk
+        )
 
     def test_event_manager_with_attendance_fields_attendee_count(self):
         """
@@ -165,3 +180,643 @@ class EventTestCase(TestCase):
         will be false if the user is not attending.
         """
         self.assertFalse(self.event_user_not_attending.has_user_rsvp)
+
+
+class RSVPAttendeeCountTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organiser = User.objects.create(username="b", password="b")
+        cls.attendee = User.objects.create(username="c", password="c")
+        cls.event = Event.objects.create(
+            title="future with space",
+            organiser=cls.organiser,
+            contact=cls.organiser,
+            starts_at=timezone.make_aware(datetime(2035, 10, 10, 14, 30, 0)),
+            ends_at=timezone.make_aware(datetime(2036, 10, 10, 15, 30, 0)),
+            location="here",
+            description="brillientay",
+            maximum_attendees=20,
+        )
+
+    def test_attendee_count_incremented_when_rsvp_created(self):
+        RSVP.objects.create(event=self.event, user=self.attendee)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendee_count, 1)
+
+    def test_attendee_count_decremented_when_rsvp_deleted(self):
+        rsvp = RSVP.objects.create(event=self.event, user=self.attendee)
+
+        rsvp.delete()
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendee_count, 0)
+
+    def test_attendee_count_decremented_when_rsvp_deleted_by_cascade(self):
+        """
+        Deleting a User cascades to their RSVPs, which must still be counted.
+        """
+        RSVP.objects.create(event=self.event, user=self.organiser)
+        RSVP.objects.create(event=self.event, user=self.attendee)
+
+        self.attendee.delete()
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendee_count, 1)
+
+    def test_saving_stale_event_does_not_overwrite_attendee_count(self):
+        """
+        Event.save must not write back an attendee_count read before an RSVP.
+        """
+        stale_event = Event.objects.get(pk=self.event.pk)
+        RSVP.objects.create(event=self.event, user=self.attendee)
+
+        stale_event.title = "renamed"
+        stale_event.save()
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.title, "renamed")
+        self.assertEqual(self.event.attendee_count, 1)
+
+    def test_repair_attendee_counts_corrects_drift(self):
+        RSVP.objects.create(event=self.event, user=self.attendee)
+        Event.objects.filter(pk=self.event.pk).update(attendee_count=7)
+
+        repaired_events = Event.objects.repair_attendee_counts()
+
+        self.event.refresh_from_db()
+        self.assertEqual(repaired_events, 1)
+        self.assertEqual(self.event.attendee_count, 1)
+        self.assertEqual(Event.objects.repair_attendee_counts(), 0)
+
+    def test_attend_counts_the_rsvp_once(self):
+        rsvp = RSVP.objects.attend(self.event, self.attendee)
+
+        self.event.refresh_from_db()
+        self.assertEqual(rsvp.user, self.attendee)
+        self.assertEqual(self.event.attendee_count, 1)
+
+    def test_attend_when_full_or_ended(self):
+        RSVP.objects.attend(self.event, self.organiser)
+        Event.objects.filter(pk=self.event.pk).update(maximum_attendees=1)
+
+        self.assertIsNone(RSVP.objects.attend(self.event, self.attendee))
+
+        Event.objects.filter(pk=self.event.pk).update(
+            maximum_attendees=20,
+            starts_at=timezone.make_aware(datetime(2001, 10, 10, 14, 30, 0)),
+            ends_at=timezone.make_aware(datetime(2001, 10, 10, 15, 30, 0)),
+        )
+        self.assertIsNone(RSVP.objects.attend(self.event, self.attendee))
+        self.assertIsNone(RSVP.objects.attend(0, self.attendee))
+        self.assertFalse(RSVP.objects.filter(user=self.attendee).exists())
+
+    def test_attend_twice_gives_the_space_back(self):
+        RSVP.objects.attend(self.event, self.attendee)
+
+        with self.assertRaises(IntegrityError):
+            RSVP.objects.attend(self.event, self.attendee)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendee_count, 1)
+
+
+class FullTextSearchTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organiser = User.objects.create(username="b", password="b")
+
+    def create_event(self, title, location="here", description=""):
+        return Event.objects.create(
+            title=title,
+            organiser=self.organiser,
+            contact=self.organiser,
+            starts_at=timezone.make_aware(datetime(2035, 10, 10, 14, 30, 0)),
+            ends_at=timezone.make_aware(datetime(2035, 10, 10, 15, 30, 0)),
+            location=location,
+            description=description,
+            maximum_attendees=20,
+        )
+
+    def search(self, terms):
+        return list(
+            Event.objects.search(terms)
+            .order_by("-rank", "id")
+            .values_list("title", flat=True)
+        )
+
+    def test_title_matches_rank_above_location_and_description_matches(self):
+        self.create_event("Quiz night", description="Prizes include a barbecue")
+        self.create_event("Picnic", location="Barbecue area, the park")
+        self.create_event("Barbecue")
+        self.create_event("Bake sale")
+
+        self.assertEqual(self.search("barbecue"), ["Barbecue", "Picnic", "Quiz night"])
+
+    def test_every_term_must_match(self):
+        self.create_event("Summer barbecue")
+        self.create_event("Winter barbecue")
+
+        self.assertEqual(self.search("winter barbecue"), ["Winter barbecue"])
+
+    def test_changed_and_deleted_events_are_reindexed(self):
+        event = self.create_event("Barbecue")
+        deleted = self.create_event("Barbecue again")
+
+        event.title = "Bake sale"
+        event.save()
+        deleted.delete()
+
+        self.assertEqual(self.search("barbecue"), [])
+        self.assertEqual(self.search("bake"), ["Bake sale"])
+
+    def test_query_syntax_is_searched_for_as_text(self):
+        self.create_event("Barbecue")
+
+        self.assertEqual(self.search('barbecue" NEAR(*'), [])
+        self.assertEqual(self.search("***"), [])
+
+
+class WaitlistPromoteTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organiser = User.objects.create(username="b", password="b")
+        cls.event = Event.objects.create(
+            title="future and full",
+            organiser=cls.organiser,
+            contact=cls.organiser,
+            starts_at=timezone.make_aware(datetime(2035, 10, 10, 14, 30, 0)),
+            ends_at=timezone.make_aware(datetime(2036, 10, 10, 15, 30, 0)),
+            location="here",
+            maximum_attendees=1,
+        )
+        RSVP.objects.create(event=cls.event, user=cls.organiser)
+        cls.users = [User.objects.create(username=f"user_{i}") for i in range(6)]
+        for user in cls.users:
+            WaitlistEntry.objects.join(cls.event, user)
+
+    def set_maximum_attendees(self, maximum_attendees):
+        Event.objects.filter(pk=self.event.pk).update(
+            maximum_attendees=maximum_attendees
+        )
+
+    def test_promote_fills_spaces_in_order_in_one_batch(self):
+        self.set_maximum_attendees(4)
+
+        with self.assertNumQueries(7):
+            promoted = WaitlistEntry.objects.promote(self.event)
+
+        self.event.refresh_from_db()
+        self.assertEqual(promoted, 3)
+        self.assertEqual(self.event.attendee_count, 4)
+        self.assertEqual(
+            set(RSVP.objects.exclude(user=self.organiser).values_list("user_id")),
+            {(user.pk,) for user in self.users[:3]},
+        )
+        self.assertEqual(
+            [entry.get_position() for entry in WaitlistEntry.objects.order_by("pk")],
+            [1, 2, 3],
+        )
+
+    def test_promote_without_spaces(self):
+        self.assertEqual(WaitlistEntry.objects.promote(self.event), 0)
+
+        self.set_maximum_attendees(4)
+        Event.objects.filter(pk=self.event.pk).update(
+            starts_at=timezone.make_aware(datetime(2001, 10, 10, 14, 30, 0)),
+            ends_at=timezone.make_aware(datetime(2001, 10, 10, 15, 30, 0)),
+        )
+        self.assertEqual(WaitlistEntry.objects.promote(self.event), 0)
+        self.assertEqual(WaitlistEntry.objects.count(), 6)
+
+    def test_promote_passes_over_users_already_attending(self):
+        self.set_maximum_attendees(3)
+        RSVP.objects.create(event=self.event, user=self.users[0])
+
+        self.assertEqual(WaitlistEntry.objects.promote(self.event), 1)
+
+        self.assertTrue(RSVP.objects.filter(user=self.users[1]).exists())
+
+    def test_attend_leaves_the_waitlist(self):
+        self.set_maximum_attendees(2)
+
+        RSVP.objects.attend(self.event, self.users[3])
+
+        self.assertFalse(WaitlistEntry.objects.filter(user=self.users[3]).exists())
+
+
+class RequirementSummaryTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organiser = User.objects.create(username="b", password="b")
+        cls.attendee = User.objects.create(username="c", password="c")
+        cls.event = Event.objects.create(
+            title="future with space",
+            organiser=cls.organiser,
+            contact=cls.organiser,
+            starts_at=timezone.make_aware(datetime(2035, 10, 10, 14, 30, 0)),
+            ends_at=timezone.make_aware(datetime(2036, 10, 10, 15, 30, 0)),
+            location="here",
+            description="brillientay",
+            maximum_attendees=20,
+        )
+        cls.item = ContributionItem.objects.create(title="crisps")
+
+    def get_summary(self):
+        return ContributionSummary.objects.get(
+            event=self.event, contribution_item=self.item
+        )
+
+    def create_requirements(self, quantity):
+        return [
+            ContributionRequirement.objects.create(
+                event=self.event, contribution_item=self.item
+            )
+            for _ in range(quantity)
+        ]
+
+    def test_summary_created_with_first_requirement(self):
+        self.create_requirements(2)
+
+        summary = self.get_summary()
+        self.assertEqual((summary.required, summary.committed), (2, 0))
+
+    def test_required_decremented_when_requirement_deleted(self):
+        requirement, _ = self.create_requirements(2)
+
+        requirement.delete()
+
+        self.assertEqual(self.get_summary().required, 1)
+
+    def test_committed_follows_commitments_and_their_rsvp(self):
+        requirement, _ = self.create_requirements(2)
+        rsvp = RSVP.objects.create(event=self.event, user=self.attendee)
+        ContributionCommitment.objects.create(
+            RSVP=rsvp, contribution_requirement=requirement
+        )
+        self.assertEqual(self.get_summary().committed, 1)
+
+        rsvp.delete()
+
+        summary = self.get_summary()
+        self.assertEqual((summary.required, summary.committed), (2, 0))
+
+    def test_committed_follows_commitments_deleted_on_their_own(self):
+        dip = ContributionItem.objects.create(title="dip")
+        rsvp = RSVP.objects.create(event=self.event, user=self.attendee)
+        for item in [self.item, dip]:
+            for _ in range(3):
+                ContributionRequirement.objects.create(
+                    event=self.event, contribution_item=item
+                )
+            ContributionRequirement.objects.claim_for_rsvp(rsvp, item, 2)
+
+        ContributionCommitment.objects.filter(
+            contribution_requirement__contribution_item=self.item
+        ).first().delete()
+        self.assertEqual(self.get_summary().committed, 1)
+
+        ContributionCommitment.objects.filter(RSVP=rsvp).delete()
+        self.assertEqual(
+            list(ContributionSummary.objects.values_list("required", "committed")),
+            [(3, 0), (3, 0)],
+        )
+
+    def test_deleting_rsvp_decrements_each_item_once(self):
+        dip = ContributionItem.objects.create(title="dip")
+        rsvp = RSVP.objects.create(event=self.event, user=self.attendee)
+        for item, quantity in [(self.item, 2), (dip, 1)]:
+            for _ in range(quantity + 1):
+                ContributionRequirement.objects.create(
+                    event=self.event, contribution_item=item
+                )
+            ContributionRequirement.objects.claim_for_rsvp(rsvp, item, quantity)
+
+        rsvp.delete()
+
+        self.assertEqual(
+            list(
+                ContributionSummary.objects.order_by(
+                    "contribution_item__title"
+                ).values_list("required", "committed")
+            ),
+            [(3, 0), (2, 0)],
+        )
+
+    def test_adjust_adds_to_existing_counts(self):
+        self.create_requirements(1)
+
+        ContributionSummary.objects.adjust(self.event.pk, self.item.pk, required=3)
+
+        self.assertEqual(self.get_summary().required, 4)
+
+    def test_deleting_event_removes_summaries(self):
+        requirement, _ = self.create_requirements(2)
+        rsvp = RSVP.objects.create(event=self.event, user=self.attendee)
+        ContributionCommitment.objects.create(
+            RSVP=rsvp, contribution_requirement=requirement
+        )
+
+        self.event.delete()
+
+        self.assertFalse(ContributionSummary.objects.exists())
+
+    def test_rebuild_corrects_drift(self):
+        requirement, _ = self.create_requirements(2)
+        ContributionRequirement.objects.bulk_create(
+            [ContributionRequirement(event=self.event, contribution_item=self.item)]
+        )
+        rsvp = RSVP.objects.create(event=self.event, user=self.attendee)
+        ContributionCommitment.objects.bulk_create(
+            [ContributionCommitment(RSVP=rsvp, contribution_requirement=requirement)]
+        )
+
+        repaired_summaries = ContributionSummary.objects.rebuild()
+
+        summary = self.get_summary()
+        self.assertEqual(repaired_summaries, 1)
+        self.assertEqual((summary.required, summary.committed), (3, 1))
+        self.assertEqual(ContributionSummary.objects.rebuild(), 0)
+
+
+class RequirementClaimTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organiser = User.objects.create(username="b", password="b")
+        cls.attendee = User.objects.create(username="c", password="c")
+        cls.event = Event.objects.create(
+            title="future with space",
+            organiser=cls.organiser,
+            contact=cls.organiser,
+            starts_at=timezone.make_aware(datetime(2035, 10, 10, 14, 30, 0)),
+            ends_at=timezone.make_aware(datetime(2036, 10, 10, 15, 30, 0)),
+            location="here",
+            description="brillientay",
+            maximum_attendees=20,
+        )
+        cls.item = ContributionItem.objects.create(title="crisps")
+        cls.rsvp = RSVP.objects.create(event=cls.event, user=cls.attendee)
+        for _ in range(3):
+            ContributionRequirement.objects.create(
+                event=cls.event, contribution_item=cls.item
+            )
+
+    def test_claims_requested_quantity(self):
+        claimed = ContributionRequirement.objects.claim_for_rsvp(
+            self.rsvp, self.item, 2
+        )
+
+        self.assertEqual(claimed, 2)
+        self.assertEqual(
+            ContributionCommitment.objects.filter(RSVP=self.rsvp).count(), 2
+        )
+        self.assertEqual(ContributionSummary.objects.get(event=self.event).committed, 2)
+
+    def test_claims_only_what_is_left(self):
+        ContributionRequirement.objects.claim_for_rsvp(self.rsvp, self.item, 2)
+
+        claimed = ContributionRequirement.objects.claim_for_rsvp(
+            self.rsvp, self.item, 2
+        )
+
+        self.assertEqual(claimed, 1)
+        self.assertFalse(
+            ContributionRequirement.objects.get_unfulfilled_requirements_for_item_for_event(
+                self.item, self.event
+            ).exists()
+        )
+
+    def test_query_count_does_not_grow_with_quantity(self):
+        with CaptureQueriesContext(connection) as one_claim:
+            ContributionRequirement.objects.claim_for_rsvp(self.rsvp, self.item, 1)
+
+        with self.assertNumQueries(len(one_claim)):
+            ContributionRequirement.objects.claim_for_rsvp(self.rsvp, self.item, 2)
+
+
+class RequirementSetQuantityTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organiser = User.objects.create(username="b", password="b")
+        cls.event = Event.objects.create(
+            title="future with space",
+            organiser=cls.organiser,
+            contact=cls.organiser,
+            starts_at=timezone.make_aware(datetime(2035, 10, 10, 14, 30, 0)),
+            ends_at=timezone.make_aware(datetime(2036, 10, 10, 15, 30, 0)),
+            location="here",
+            description="brillientay",
+            maximum_attendees=20,
+        )
+        cls.item = ContributionItem.objects.create(title="crisps")
+        cls.rsvp = RSVP.objects.create(event=cls.event, user=cls.organiser)
+        ContributionRequirement.objects.set_quantity(cls.event, cls.item, 5)
+        ContributionRequirement.objects.claim_for_rsvp(cls.rsvp, cls.item, 2)
+
+    def assertCounts(self, required, committed):
+        requirements = ContributionRequirement.objects.filter(event=self.event)
+        summary = ContributionSummary.objects.get(event=self.event)
+        self.assertEqual(requirements.count(), required)
+        self.assertEqual(
+            ContributionCommitment.objects.filter(RSVP=self.rsvp).count(), committed
+        )
+        self.assertEqual((summary.required, summary.committed), (required, committed))
+
+    def test_grows_with_one_insert(self):
+        with CaptureQueriesContext(connection) as ctx:
+            required = ContributionRequirement.objects.set_quantity(
+                self.event, self.item, 9
+            )
+
+        self.assertEqual(required, 9)
+        self.assertCounts(9, 2)
+        inserts = [q for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 1)
+
+    def test_shrinks_with_one_delete_keeping_commitments(self):
+        with CaptureQueriesContext(connection) as ctx:
+            required = ContributionRequirement.objects.set_quantity(
+                self.event, self.item, 2
+            )
+
+        self.assertEqual(required, 2)
+        self.assertCounts(2, 2)
+        deletes = [q for q in ctx.captured_queries if q["sql"].startswith("DELETE")]
+        self.assertEqual(len(deletes), 1)
+        self.assertFalse(
+            ContributionRequirement.objects.get_unfulfilled_requirements_for_item_for_event(
+                self.item, self.event
+            ).exists()
+        )
+
+    def test_refuses_quantity_below_committed(self):
+        required = ContributionRequirement.objects.set_quantity(
+            self.event, self.item, 1
+        )
+
+        self.assertEqual(required, 5)
+        self.assertCounts(5, 2)
+
+    def test_corrects_drifted_summary(self):
+        ContributionSummary.objects.filter(event=self.event).update(
+            required=40, committed=0
+        )
+
+        ContributionRequirement.objects.set_quantity(self.event, self.item, 4)
+
+        self.assertCounts(4, 2)
+
+
+@skipUnlessDBFeature("test_db_allows_multiple_connections")
+class RequirementConcurrentClaimTestCase(TransactionTestCase):
+    def test_concurrent_claims_never_share_a_requirement(self):
+        organiser = User.objects.create(username="b", password="b")
+        event = Event.objects.create(
+            title="future with space",
+            organiser=organiser,
+            contact=organiser,
+            starts_at=timezone.make_aware(datetime(2035, 10, 10, 14, 30, 0)),
+            ends_at=timezone.make_aware(datetime(2036, 10, 10, 15, 30, 0)),
+            location="here",
+            maximum_attendees=20,
+        )
+        item = ContributionItem.objects.create(title="crisps")
+        for _ in range(5):
+            ContributionRequirement.objects.create(event=event, contribution_item=item)
+        rsvps = [
+            RSVP.objects.create(
+                event=event, user=User.objects.create(username=f"user_{i}")
+            )
+            for i in range(4)
+        ]
+        barrier = threading.Barrier(len(rsvps))
+        claimed = []
+
+        def claim(rsvp):
+            try:
+                barrier.wait()
+                claimed.append(
+                    ContributionRequirement.objects.claim_for_rsvp(rsvp, item, 3)
+                )
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=claim, args=[rsvp]) for rsvp in rsvps]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        commitments = ContributionCommitment.objects.all()
+        self.assertEqual(sum(claimed), 5)
+        self.assertEqual(commitments.count(), 5)
+        self.assertEqual(
+            commitments.values("contribution_requirement").distinct().count(), 5
+        )
+        self.assertEqual(ContributionSummary.objects.get(event=event).committed, 5)
+
+
+@skipUnlessDBFeature("test_db_allows_multiple_connections")
+class RequirementConcurrentResizeTestCase(TransactionTestCase):
+    def test_concurrent_resizes_and_claims_keep_counts_consistent(self):
+        organiser = User.objects.create(username="b", password="b")
+        event = Event.objects.create(
+            title="future with space",
+            organiser=organiser,
+            contact=organiser,
+            starts_at=timezone.make_aware(datetime(2035, 10, 10, 14, 30, 0)),
+            ends_at=timezone.make_aware(datetime(2036, 10, 10, 15, 30, 0)),
+            location="here",
+            maximum_attendees=20,
+        )
+        item = ContributionItem.objects.create(title="crisps")
+        ContributionRequirement.objects.set_quantity(event, item, 8)
+        rsvps = [
+            RSVP.objects.create(
+                event=event, user=User.objects.create(username=f"user_{i}")
+            )
+            for i in range(3)
+        ]
+        quantities = [3, 6, 10, 4]
+        barrier = threading.Barrier(len(quantities) + len(rsvps))
+        errors = []
+
+        def run(operation, *args):
+            try:
+                barrier.wait()
+                operation(*args)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        requirements = ContributionRequirement.objects
+        threads = [
+            threading.Thread(
+                target=run, args=[requirements.set_quantity, event, item, n]
+            )
+            for n in quantities
+        ] + [
+            threading.Thread(
+                target=run, args=[requirements.claim_for_rsvp, rsvp, item, 2]
+            )
+            for rsvp in rsvps
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        required = ContributionRequirement.objects.filter(event=event).count()
+        committed = ContributionCommitment.objects.filter(RSVP__event=event).count()
+        summary = ContributionSummary.objects.get(event=event)
+        self.assertGreaterEqual(required, committed)
+        self.assertEqual((summary.required, summary.committed), (required, committed))
+        self.assertEqual(
+            ContributionCommitment.objects.values("contribution_requirement")
+            .distinct()
+            .count(),
+            committed,
+        )
+
+
+@skipUnlessDBFeature("test_db_allows_multiple_connections")
+class RSVPConcurrentAttendTestCase(TransactionTestCase):
+    def test_concurrent_attends_never_exceed_maximum_attendees(self):
+        organiser = User.objects.create(username="b", password="b")
+        event = Event.objects.create(
+            title="future with space",
+            organiser=organiser,
+            contact=organiser,
+            starts_at=timezone.make_aware(datetime(2035, 10, 10, 14, 30, 0)),
+            ends_at=timezone.make_aware(datetime(2036, 10, 10, 15, 30, 0)),
+            location="here",
+            maximum_attendees=5,
+        )
+        users = [User.objects.create(username=f"user_{i}") for i in range(16)]
+        barrier = threading.Barrier(len(users))
+        attended = []
+
+        def attend(user):
+            try:
+                barrier.wait()
+                # Each user tries twice, as a double-submitted form would
+                for _ in range(2):
+                    try:
+                        attended.append(RSVP.objects.attend(event, user))
+                    except IntegrityError:
+                        pass
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=attend, args=[user]) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        event.refresh_from_db()
+        self.assertEqual(len([rsvp for rsvp in attended if rsvp is not None]), 5)
+        self.assertEqual(RSVP.objects.filter(event=event).count(), 5)
+        self.assertEqual(event.attendee_count, 5)
@@ -0,0 +1,278 @@
+from http import HTTPStatus
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from events.cache import get_count_cache_key
+from events.models import RSVP, Event
+from events.pagination import (
+    CachedCountKeysetPaginator,
+    InvalidCursor,
+    KeysetPaginator,
+)
+from users.models import User
+
+
+class KeysetPaginatorTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="b", password="b")
+        ends_at = timezone.now() + timezone.timedelta(days=1)
+        # Pairs of events share an ends_at, so pages split across ties
+        for i in range(11):
+            Event.objects.create(
+                title=f"event_{i}",
+                organiser=cls.user,
+                contact=cls.user,
+                starts_at=ends_at - timezone.timedelta(hours=1),
+                ends_at=ends_at + timezone.timedelta(minutes=i // 2),
+                location="here",
+                maximum_attendees=15,
+            )
+        cls.ordered_pks = list(
+            Event.objects.order_by("ends_at", "id").values_list("pk", flat=True)
+        )
+
+    def get_paginator(self, ordering="ends_at"):
+        return KeysetPaginator(Event.objects.order_by(ordering), 3)
+
+    def walk_forwards(self, paginator):
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        return pages
+
+    def test_pages_cover_every_row_once_in_order(self):
+        pages = self.walk_forwards(self.get_paginator())
+
+        seen_pks = [event.pk for page in pages for event in page]
+        self.assertEqual(seen_pks, self.ordered_pks)
+        self.assertEqual([page.number for page in pages], [1, 2, 3, 4])
+
+    def test_descending_pages_cover_every_row_once_in_order(self):
+        pages = self.walk_forwards(self.get_paginator("-ends_at"))
+
+        seen_pks = [event.pk for page in pages for event in page]
+        self.assertEqual(seen_pks, list(reversed(self.ordered_pks)))
+
+    def test_previous_cursor_returns_preceding_page(self):
+        paginator = self.get_paginator()
+        pages = self.walk_forwards(paginator)
+
+        previous_page = paginator.page(pages[2].previous_cursor)
+
+        self.assertEqual(list(previous_page), list(pages[1]))
+        self.assertEqual(previous_page.number, 2)
+        self.assertTrue(previous_page.has_previous())
+
+    def test_last_cursor_returns_final_rows(self):
+        paginator = self.get_paginator()
+
+        last_page = paginator.page(paginator.page().last_cursor)
+
+        # The two rows past the last full page of three
+        self.assertEqual([event.pk for event in last_page], self.ordered_pks[-2:])
+        self.assertFalse(last_page.has_next())
+        self.assertEqual(last_page.number, 4)
+        self.assertEqual((last_page.start_index(), last_page.end_index()), (10, 11))
+
+    def test_walking_back_from_the_last_page_matches_walking_forwards(self):
+        paginator = self.get_paginator()
+        forward_pages = self.walk_forwards(paginator)
+
+        backward_pages = [paginator.page(paginator.page().last_cursor)]
+        while backward_pages[-1].has_previous():
+            backward_pages.append(paginator.page(backward_pages[-1].previous_cursor))
+        backward_pages.reverse()
+
+        self.assertEqual(
+            [list(page) for page in backward_pages],
+            [list(page) for page in forward_pages],
+        )
+        self.assertEqual(
+            [page.start_index() for page in backward_pages],
+            [page.start_index() for page in forward_pages],
+        )
+
+    def test_last_page_is_a_full_page_when_the_count_divides_evenly(self):
+        paginator = KeysetPaginator(
+            Event.objects.exclude(pk=self.ordered_pks[0]).order_by("ends_at"), 5
+        )
+
+        last_page = paginator.page(paginator.page().last_cursor)
+
+        self.assertEqual([event.pk for event in last_page], self.ordered_pks[-5:])
+        self.assertEqual(last_page.number, 2)
+        self.assertEqual(paginator.page(last_page.previous_cursor).number, 1)
+
+    def test_tampered_cursor_is_invalid(self):
+        paginator = self.get_paginator()
+        cursor = paginator.page().next_cursor
+
+        with self.assertRaises(InvalidCursor):
+            paginator.page(cursor[:-1] + "x")
+
+    def test_deep_pages_cost_the_same_as_the_first(self):
+        paginator = self.get_paginator()
+        with CaptureQueriesContext(connection) as first_page_queries:
+            first_page = paginator.page()
+        cursor = first_page.next_cursor
+        for _ in range(2):
+            cursor = paginator.page(cursor).next_cursor
+
+        with CaptureQueriesContext(connection) as deep_page_queries:
+            paginator.page(cursor)
+
+        self.assertEqual(len(first_page_queries), len(deep_page_queries))
+        self.assertNotIn("OFFSET", deep_page_queries[0]["sql"])
+
+
+class CachedCountKeysetPaginatorTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="b", password="b")
+        for i in range(7):
+            cls.create_event(i)
+
+    @classmethod
+    def create_event(cls, i):
+        return Event.objects.create(
+            title=f"event_{i}",
+            organiser=cls.user,
+            contact=cls.user,
+            starts_at=timezone.now() + timezone.timedelta(hours=i),
+            ends_at=timezone.now() + timezone.timedelta(hours=i + 1),
+            location="here",
+            maximum_attendees=15,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def get_paginator(self):
+        return CachedCountKeysetPaginator(
+            Event.objects.order_by("ends_at"),
+            3,
+            count_cache_key=get_count_cache_key("test"),
+        )
+
+    def test_count_is_cached(self):
+        self.assertEqual(self.get_paginator().count, 7)
+
+        with self.assertNumQueries(0):
+            paginator = self.get_paginator()
+            self.assertEqual(paginator.count, 7)
+            self.assertEqual(paginator.num_pages, 3)
+
+    def test_changing_events_drops_cached_count(self):
+        self.assertEqual(self.get_paginator().count, 7)
+
+        self.create_event(7)
+
+        self.assertEqual(self.get_paginator().count, 8)
+
+        Event.objects.order_by("pk").first().delete()
+
+        self.assertEqual(self.get_paginator().count, 7)
+
+    def test_moving_an_events_end_drops_cached_count(self):
+        self.get_paginator().count
+        event = Event.objects.order_by("pk").first()
+
+        event.title = "renamed"
+        event.save()
+        with self.assertNumQueries(0):
+            self.get_paginator().count
+
+        event.ends_at += timezone.timedelta(hours=1)
+        event.save()
+        with CaptureQueriesContext(connection) as recount_queries:
+            self.get_paginator().count
+        self.assertTrue(recount_queries)
+
+    def test_attendance_changes_keep_cached_count(self):
+        self.get_paginator().count
+        event = Event.objects.order_by("pk").first()
+
+        rsvp = RSVP.objects.create(event=event, user=self.user)
+        rsvp.delete()
+        RSVP.objects.attend(event, self.user)
+
+        with self.assertNumQueries(0):
+            self.get_paginator().count
+
+    def test_small_counts_are_exact(self):
+        paginator = self.get_paginator()
+
+        self.assertEqual(paginator.count, 7)
+        self.assertFalse(paginator.count_is_estimate)
+
+    @skipUnless(connection.vendor == "postgresql", "Estimates need PostgreSQL")
+    @override_settings(EVENTS_COUNT_ESTIMATE_THRESHOLD=0)
+    def test_large_counts_are_estimated(self):
+        paginator = self.get_paginator()
+
+        with self.assertNumQueries(1):
+            self.assertGreater(paginator.count, 0)
+        self.assertTrue(paginator.count_is_estimate)
+        self.assertTrue(self.get_paginator().count_is_estimate)
+
+    def test_estimate_count_needs_postgresql(self):
+        if connection.vendor == "postgresql":
+            self.assertIsNotNone(self.get_paginator().estimate_count())
+        else:
+            self.assertIsNone(self.get_paginator().estimate_count())
+
+
+class EventListPaginationTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="b", password="b")
+        for i in range(7):
+            Event.objects.create(
+                title=f"event_{i}",
+                organiser=cls.user,
+                contact=cls.user,
+                starts_at=timezone.now() + timezone.timedelta(hours=i),
+                ends_at=timezone.now() + timezone.timedelta(hours=i + 1),
+                location="here",
+                maximum_attendees=15,
+            )
+
+    def test_next_cursor_link_shows_second_page(self):
+        url = reverse("event_list", kwargs={"when": "future"})
+        first_page = self.client.get(url).context["page_obj"]
+
+        response = self.client.get(url, {"cursor": first_page.next_cursor})
+
+        second_page = response.context["page_obj"]
+        self.assertEqual(second_page.number, 2)
+        self.assertEqual(len(second_page), 2)
+        self.assertEqual(response.context["paginator"].num_pages, 2)
+
+    def test_result_count_is_cached(self):
+        url = reverse("event_list", kwargs={"when": "future"})
+        self.client.get(url)
+        first_page = self.client.get(url).context["page_obj"]
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, {"cursor": first_page.next_cursor})
+
+        self.assertContains(response, "of 7 results")
+        self.assertFalse(any("COUNT(" in query["sql"] for query in ctx))
+
+    def test_invalid_cursor_returns_404(self):
+        url = reverse("event_list", kwargs={"when": "future"})
+        response = self.client.get(url, {"cursor": "nonsense"})
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_numbered_page_redirects_to_first_page(self):
+        response = self.client.get(reverse("event_list", args=["past", 3]))
+
+        self.assertRedirects(response, reverse("event_list", kwargs={"when": "past"}))
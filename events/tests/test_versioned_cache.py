@@ -0,0 +1,164 @@
+from django.core.cache import cache
+from django.core.signals import request_finished
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from events import cache as event_cache
+from events.cache import get_cache_stats, get_event_versions
+from events.models import RSVP, Event
+from users.models import User
+
+
+class EventVersionTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="b", password="b")
+        cls.event = Event.objects.create(
+            title="event",
+            organiser=cls.user,
+            contact=cls.user,
+            starts_at=timezone.now() + timezone.timedelta(hours=1),
+            ends_at=timezone.now() + timezone.timedelta(hours=2),
+            location="here",
+            maximum_attendees=15,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def get_version(self):
+        return get_event_versions([self.event.pk])[self.event.pk]
+
+    def test_missing_version_is_seeded_once(self):
+        self.assertEqual(self.get_version(), self.get_version())
+
+    def test_saving_event_bumps_version(self):
+        version = self.get_version()
+
+        self.event.save()
+
+        self.assertNotEqual(self.get_version(), version)
+
+    def test_rsvp_create_and_delete_bump_version(self):
+        version = self.get_version()
+        rsvp = RSVP.objects.create(event=self.event, user=self.user)
+        created_version = self.get_version()
+
+        rsvp.delete()
+
+        self.assertNotEqual(created_version, version)
+        self.assertNotEqual(self.get_version(), created_version)
+
+
+class VersionedCacheTagTestCase(TestCase):
+    template = Template(
+        "{% load event_cache %}"
+        "{% versioned_cache 'card' event flag %}{{ event.title }} {{ flag }}"
+        "{% endversioned_cache %}"
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="b", password="b")
+        cls.event = Event.objects.create(
+            title="event",
+            organiser=cls.user,
+            contact=cls.user,
+            starts_at=timezone.now() + timezone.timedelta(hours=1),
+            ends_at=timezone.now() + timezone.timedelta(hours=2),
+            location="here",
+            maximum_attendees=15,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def render(self, event, flag=False):
+        return self.template.render(Context({"event": event, "flag": flag}))
+
+    def test_fragment_served_from_cache_until_event_changes(self):
+        stats = get_cache_stats("fragment")
+        self.render(self.event)
+        stale_event = Event.objects.get(pk=self.event.pk)
+        stale_event.title = "not saved"
+
+        self.assertEqual(self.render(stale_event), "event False")
+
+        self.event.title = "renamed"
+        self.event.save()
+        self.assertEqual(self.render(self.event), "renamed False")
+        after = get_cache_stats("fragment")
+        self.assertEqual(after["hits"] - stats["hits"], 1)
+        self.assertEqual(after["misses"] - stats["misses"], 2)
+
+    def test_vary_on_values_are_cached_separately(self):
+        self.render(self.event, flag=False)
+
+        self.assertEqual(self.render(self.event, flag=True), "event True")
+
+
+class EventListCardCacheTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="b", password="b")
+        cls.attendee = User.objects.create(username="c", password="c")
+        cls.event = Event.objects.create(
+            title="event",
+            organiser=cls.user,
+            contact=cls.user,
+            starts_at=timezone.now() + timezone.timedelta(hours=1),
+            ends_at=timezone.now() + timezone.timedelta(hours=2),
+            location="here",
+            maximum_attendees=15,
+        )
+        cls.url = reverse("event_list", kwargs={"when": "future"})
+
+    def setUp(self):
+        cache.clear()
+
+    def test_attending_text_not_shared_between_users(self):
+        RSVP.objects.create(event=self.event, user=self.attendee)
+        self.client.get(self.url)
+
+        self.client.force_login(self.attendee)
+        attendee_response = self.client.get(self.url)
+        self.client.force_login(self.user)
+        other_response = self.client.get(self.url)
+
+        self.assertContains(attendee_response, "14 spaces left - you are attending")
+        self.assertNotContains(other_response, "you are attending")
+
+    def test_rsvp_refreshes_remaining_spaces(self):
+        self.assertContains(self.client.get(self.url), "15 spaces left")
+
+        RSVP.objects.create(event=self.event, user=self.attendee)
+
+        self.assertContains(self.client.get(self.url), "14 spaces left")
+
+
+class CacheStatsLoggingTestCase(SimpleTestCase):
+    def setUp(self):
+        logged_at = event_cache.cache_stats_logged_at
+        self.addCleanup(setattr, event_cache, "cache_stats_logged_at", logged_at)
+
+    @override_settings(EVENTS_CACHE_STATS_LOG_SECONDS=60)
+    def test_logged_after_requests_at_most_every_interval(self):
+        event_cache.cache_stats_logged_at -= 60
+
+        with self.assertLogs("events.cache", "INFO") as logs:
+            request_finished.send(sender=None)
+            request_finished.send(sender=None)
+
+        self.assertEqual(
+            [record.getMessage().split(":")[0] for record in logs.records],
+            ["fragment cache", "page cache", "local cache tier", "shared cache tier"],
+        )
+        self.assertIn("evictions", logs.records[2].getMessage())
+
+    def test_disabled_by_default(self):
+        event_cache.cache_stats_logged_at -= 60
+
+        with self.assertNoLogs("events.cache", "INFO"):
+            request_finished.send(sender=None)
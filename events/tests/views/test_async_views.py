@@ -0,0 +1,154 @@
+from asyncio import iscoroutinefunction
+from http import HTTPStatus
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import include, path, resolve, reverse
+from django.utils import timezone
+
+import events.urls  # noqa: F401 - registers the "when" converter
+from events import views
+from events.models import (
+    RSVP,
+    ContributionItem,
+    ContributionRequirement,
+    Event,
+    WaitlistEntry,
+)
+from users.models import User
+from users.views import AsyncProfileView
+
+# The project's routes, with the async read views in front
+urlpatterns = [
+    path("events/<when:when>/", views.AsyncEventListView.as_view(), name="event_list"),
+    path("events/<int:pk>/", views.AsyncEventDetailView.as_view(), name="event_detail"),
+    path(
+        "events/<int:pk>/contributions/",
+        views.AsyncEventDetailContributionsView.as_view(),
+        name="event_detail_contributions",
+    ),
+    path("users/<str:username>/", AsyncProfileView.as_view(), name="profile"),
+    path("", include("djisco.urls")),
+]
+
+
+def create_event(organiser, hours):
+    return Event.objects.create(
+        title=f"event {hours}",
+        organiser=organiser,
+        contact=organiser,
+        starts_at=timezone.now() + timezone.timedelta(hours=hours),
+        ends_at=timezone.now() + timezone.timedelta(hours=hours + 1),
+        location="here",
+        maximum_attendees=15,
+    )
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncReadViewTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="b")
+        cls.event = create_event(cls.user, 1)
+        cls.past_event = create_event(cls.user, -2)
+        RSVP.objects.create(event=cls.event, user=cls.user)
+        RSVP.objects.create(event=cls.past_event, user=cls.user)
+        ContributionRequirement.objects.set_quantity(
+            cls.event, ContributionItem.objects.create(title="crisps"), 2
+        )
+        cls.urls = {
+            "list": reverse("event_list", kwargs={"when": "future"}),
+            "detail": reverse("event_detail", kwargs={"pk": cls.event.pk}),
+            "contributions": reverse(
+                "event_detail_contributions", kwargs={"pk": cls.event.pk}
+            ),
+            "profile": reverse("profile", kwargs={"username": cls.user.username}),
+        }
+
+    def setUp(self):
+        self.async_client.force_login(self.user)
+
+    def get(self, url, **headers):
+        return async_to_sync(self.async_client.get)(url, headers=headers)
+
+    def test_views_are_async(self):
+        for name, url in self.urls.items():
+            with self.subTest(view=name):
+                self.assertTrue(iscoroutinefunction(resolve(url).func))
+
+    def test_pages_show_what_the_sync_views_do(self):
+        responses = {name: self.get(url) for name, url in self.urls.items()}
+
+        self.assertEqual(list(responses["list"].context["object_list"]), [self.event])
+        self.assertTrue(responses["list"].context["object_list"][0].has_user_rsvp)
+        self.assertEqual(responses["detail"].context["event"], self.event)
+        self.assertTrue(responses["detail"].context["event"].has_user_rsvp)
+        self.assertEqual(
+            [
+                summary.required
+                for summary in responses["contributions"].context[
+                    "contribution_summaries"
+                ]
+            ],
+            [2],
+        )
+        self.assertEqual(responses["profile"].context["events"], [self.event])
+        self.assertEqual(responses["profile"].context["past_events"], [self.past_event])
+
+    def test_unchanged_pages_are_not_modified(self):
+        for name in ("list", "detail", "contributions"):
+            with self.subTest(view=name):
+                etag = self.get(self.urls[name])["ETag"]
+
+                response = self.get(self.urls[name], if_none_match=etag)
+
+                self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_missing_objects_are_not_found(self):
+        for url in (
+            reverse("event_detail", kwargs={"pk": 0}),
+            reverse("profile", kwargs={"username": "nobody"}),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.get(url).status_code, HTTPStatus.NOT_FOUND)
+
+    def test_cursors_page_through_the_list(self):
+        for hours in range(2, 8):
+            create_event(self.user, hours)
+        first = self.get(self.urls["list"])
+        page = first.context["page_obj"]
+
+        second = self.get(f"{self.urls['list']}?cursor={page.next_cursor}")
+        last = self.get(f"{self.urls['list']}?cursor={page.last_cursor}")
+
+        self.assertEqual(len(first.context["object_list"]), 5)
+        self.assertEqual(second.context["page_obj"].number, 2)
+        self.assertEqual(len(second.context["object_list"]), 2)
+        self.assertEqual(
+            list(last.context["object_list"]), list(second.context["object_list"])
+        )
+
+    def test_waitlisted_users_see_their_place(self):
+        self.event.maximum_attendees = 1
+        self.event.save()
+        other = User.objects.create_user(username="c")
+        WaitlistEntry.objects.create(event=self.event, user=other)
+        self.async_client.force_login(other)
+
+        response = self.get(self.urls["detail"])
+
+        self.assertEqual(response.context["event"].waitlist_position, 1)
+
+    @override_settings(EVENTS_PAGE_CACHE_SECONDS=30)
+    def test_anonymous_pages_are_served_from_the_page_cache(self):
+        cache.clear()
+        self.async_client.logout()
+        for name in ("list", "detail"):
+            with self.subTest(view=name):
+                first = self.get(self.urls[name])
+
+                with self.assertNumQueries(0):
+                    second = self.get(self.urls[name])
+
+                self.assertEqual(second.content, first.content)
@@ -0,0 +1,112 @@
+import threading
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import (
+    Client,
+    TestCase,
+    TransactionTestCase,
+    skipUnlessDBFeature,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import RSVP, Event
+from users.models import User
+
+
+def create_event(organiser):
+    return Event.objects.create(
+        title="event",
+        organiser=organiser,
+        contact=organiser,
+        starts_at=timezone.now() + timezone.timedelta(hours=1),
+        ends_at=timezone.now() + timezone.timedelta(hours=2),
+        location="here",
+        maximum_attendees=15,
+    )
+
+
+class AttendanceIdempotencyTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="b")
+        cls.other_user = User.objects.create_user(username="c")
+        cls.event = create_event(cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def post(self, action, idempotency_key, client=None):
+        return (client or self.client).post(
+            reverse("event_attendance", args=[self.event.pk, action]),
+            HTTP_ACCEPT="application/json",
+            HTTP_IDEMPOTENCY_KEY=idempotency_key,
+        )
+
+    def test_repeats_get_the_stored_response(self):
+        first = self.post("attend", "key-1")
+
+        with CaptureQueriesContext(connection) as ctx:
+            repeat = self.post("attend", "key-1")
+
+        self.assertEqual(repeat.status_code, HTTPStatus.OK)
+        self.assertEqual(repeat.json(), first.json())
+        self.assertFalse(any("events_" in query["sql"] for query in ctx))
+        self.assertEqual(RSVP.objects.filter(event=self.event).count(), 1)
+
+    def test_new_keys_are_carried_out(self):
+        self.post("attend", "key-1")
+
+        self.assertEqual(self.post("unattend", "key-2").status_code, HTTPStatus.OK)
+        self.assertEqual(self.post("attend", "key-3").status_code, HTTPStatus.OK)
+        self.assertEqual(self.post("attend", "key-4").status_code, HTTPStatus.CONFLICT)
+
+    def test_keys_are_scoped_to_the_user(self):
+        self.post("attend", "key-1")
+        other_client = Client()
+        other_client.force_login(self.other_user)
+
+        response = self.post("attend", "key-1", client=other_client)
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(
+            RSVP.objects.filter(event=self.event, user=self.other_user).exists()
+        )
+
+
+@skipUnlessDBFeature("test_db_allows_multiple_connections")
+class AttendanceCoalescingTestCase(TransactionTestCase):
+    def test_concurrent_duplicates_are_carried_out_once(self):
+        cache.clear()
+        user = User.objects.create_user(username="b")
+        event = create_event(user)
+        url = reverse("event_attendance", args=[event.pk, "attend"])
+        clients = [Client() for _ in range(4)]
+        for client in clients:
+            client.force_login(user)
+        barrier = threading.Barrier(len(clients))
+        statuses = []
+
+        def attend(client):
+            try:
+                barrier.wait()
+                response = client.post(
+                    url, HTTP_ACCEPT="application/json", HTTP_IDEMPOTENCY_KEY="key-1"
+                )
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=attend, args=[client]) for client in clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Without coalescing, all but one would be told they already attend
+        self.assertEqual(statuses, [HTTPStatus.OK] * len(clients))
+        self.assertEqual(RSVP.objects.filter(event=event).count(), 1)
@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import RSVP, Event
+from users.models import User
+
+
+class AttendanceStatusViewTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="b")
+        cls.events = [
+            Event.objects.create(
+                title=f"event_{i}",
+                organiser=cls.user,
+                contact=cls.user,
+                starts_at=timezone.now() + timezone.timedelta(hours=2 * i - 2),
+                ends_at=timezone.now() + timezone.timedelta(hours=2 * i - 1),
+                location="here",
+                maximum_attendees=2,
+            )
+            for i in range(3)
+        ]
+        # Ended, attending, and full
+        RSVP.objects.create(event=cls.events[1], user=cls.user)
+        RSVP.objects.create(
+            event=cls.events[2], user=User.objects.create_user(username="c")
+        )
+        RSVP.objects.create(
+            event=cls.events[2], user=User.objects.create_user(username="d")
+        )
+        cls.url = reverse("event_attendance_status")
+        cls.ids = ",".join(str(event.pk) for event in cls.events)
+
+    def test_statuses_for_the_user_in_one_query(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("event_new"))
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {"ids": f"{self.ids},0"})
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(
+            response.json()["events"],
+            {
+                str(self.events[0].pk): {
+                    "attendee_count": 0,
+                    "maximum_attendees": 2,
+                    "remaining_spaces": 2,
+                    "has_user_rsvp": False,
+                    "accepting_attendees": False,
+                },
+                str(self.events[1].pk): {
+                    "attendee_count": 1,
+                    "maximum_attendees": 2,
+                    "remaining_spaces": 1,
+                    "has_user_rsvp": True,
+                    "accepting_attendees": True,
+                },
+                str(self.events[2].pk): {
+                    "attendee_count": 2,
+                    "maximum_attendees": 2,
+                    "remaining_spaces": 0,
+                    "has_user_rsvp": False,
+                    "accepting_attendees": False,
+                },
+            },
+        )
+        self.assertIn("no-cache", response["Cache-Control"])
+
+    def test_anonymous_users_have_no_rsvps(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {"ids": self.ids})
+
+        statuses = response.json()["events"].values()
+        self.assertFalse(any(status["has_user_rsvp"] for status in statuses))
+
+    @override_settings(EVENTS_ATTENDANCE_STATUS_MAX_IDS=2)
+    def test_bad_ids(self):
+        for ids in ("", "a,b", self.ids):
+            with self.subTest(ids=ids):
+                response = self.client.get(self.url, {"ids": ids})
+
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+                self.assertFalse(response.json()["success"])
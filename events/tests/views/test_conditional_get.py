@@ -0,0 +1,146 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import RSVP, ContributionItem, ContributionRequirement, Event
+from users.models import User
+
+
+class ConditionalGetTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organiser = User.objects.create_user(username="organiser")
+        cls.attendee = User.objects.create_user(username="attendee")
+        cls.item = ContributionItem.objects.create(title="Crisps")
+        cls.event = Event.objects.create(
+            title="event",
+            organiser=cls.organiser,
+            contact=cls.organiser,
+            starts_at=timezone.now() + timezone.timedelta(hours=1),
+            ends_at=timezone.now() + timezone.timedelta(hours=2),
+            location="here",
+            maximum_attendees=15,
+        )
+        cls.detail_urls = [
+            reverse(name, kwargs={"pk": cls.event.pk})
+            for name in ("event_detail", "event_detail_contributions")
+        ]
+        cls.list_url = reverse("event_list", kwargs={"when": "future"})
+
+    def setUp(self):
+        cache.clear()
+
+    def revalidate(self, url):
+        etag = self.client.get(url)["ETag"]
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def assertNotModified(self, url):
+        response = self.revalidate(url)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def assertChangedBy(self, url, change):
+        etag = self.client.get(url)["ETag"]
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_unchanged_pages_are_not_modified(self):
+        for url in [*self.detail_urls, self.list_url]:
+            with self.subTest(url=url):
+                self.assertNotModified(url)
+
+    def test_not_modified_skips_the_views_queries(self):
+        url = self.detail_urls[0]
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_if_modified_since(self):
+        url = self.detail_urls[0]
+        last_modified = self.client.get(url)["Last-Modified"]
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_rsvp_changes_event_pages(self):
+        for url in [*self.detail_urls, self.list_url]:
+            with self.subTest(url=url):
+                self.assertChangedBy(
+                    url,
+                    lambda: RSVP.objects.get_or_create(
+                        event=self.event, user=self.attendee
+                    ),
+                )
+                self.assertChangedBy(
+                    url, lambda: RSVP.objects.filter(event=self.event).delete()
+                )
+
+    def test_requirement_and_commitment_changes_event_pages(self):
+        url = self.detail_urls[1]
+        rsvp = RSVP.objects.create(event=self.event, user=self.attendee)
+
+        self.assertChangedBy(
+            url,
+            lambda: ContributionRequirement.objects.set_quantity(
+                self.event, self.item, 2
+            ),
+        )
+        self.assertChangedBy(
+            url,
+            lambda: ContributionRequirement.objects.claim_for_rsvp(rsvp, self.item, 1),
+        )
+
+    def test_ending_changes_event_pages(self):
+        def move_event(hours):
+            # Without save(), so updated_at is left alone
+            Event.objects.filter(pk=self.event.pk).update(
+                starts_at=timezone.now() + timezone.timedelta(hours=hours - 1),
+                ends_at=timezone.now() + timezone.timedelta(hours=hours),
+            )
+
+        for url in [*self.detail_urls, self.list_url]:
+            with self.subTest(url=url):
+                move_event(2)
+                self.assertChangedBy(url, lambda: move_event(-1))
+
+    def test_pages_differ_between_users(self):
+        url = self.detail_urls[0]
+        etag = self.client.get(url)["ETag"]
+        self.client.force_login(self.attendee)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_pending_messages_are_shown(self):
+        etag = self.client.get(self.list_url)["ETag"]
+        # Sends an anonymous user to log in with a message for the next page
+        self.client.get(reverse("event_edit", kwargs={"pk": self.event.pk}))
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_missing_event_is_not_found(self):
+        response = self.client.get(reverse("event_detail", kwargs={"pk": 0}))
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    @override_settings(EVENTS_PAGE_CACHE_SECONDS=30)
+    def test_cached_pages_are_revalidated_without_queries(self):
+        for url in (self.detail_urls[0], self.list_url):
+            with self.subTest(url=url):
+                etag = self.client.get(url)["ETag"]
+
+                with self.assertNumQueries(0):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+                self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
@@ -0,0 +1,43 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from events.forms import ContributionForm
+from events.models import ContributionItem
+
+
+class ContributionItemAutocompleteViewTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.beer = ContributionItem.objects.create(title="Beer")
+        ContributionItem.objects.create(title="Beer glasses")
+        ContributionItem.objects.create(title="Cider")
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, terms):
+        return self.client.get(reverse("contribution_item_autocomplete"), {"q": terms})
+
+    def test_items_are_suggested_for_terms(self):
+        response = self.get("Bee")
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        items = response.json()["items"]
+        self.assertEqual(items[0], {"id": self.beer.pk, "title": "Beer"})
+        self.assertNotIn("Cider", [item["title"] for item in items])
+
+    @override_settings(EVENTS_AUTOCOMPLETE_LIMIT=1)
+    def test_suggestions_are_limited(self):
+        self.assertEqual(len(self.get("b").json()["items"]), 1)
+
+    def test_no_terms(self):
+        self.assertEqual(self.get("").json(), {"success": True, "items": []})
+
+    def test_contribution_form_asks_for_suggestions(self):
+        self.assertIn(
+            f'data-autocomplete-url="{reverse("contribution_item_autocomplete")}"',
+            str(ContributionForm()["contribution_item"]),
+        )
@@ -10,6 +10,7 @@ from events.models import (
     ContributionCommitment,
     ContributionItem,
     ContributionRequirement,
+    ContributionSummary,
     Event,
 )
 from users.models import User
@@ -92,6 +93,20 @@ class RequirmentCreateViewTestCase(TestCase):
         for instance in contribution_requirements:
             self.assertEqual(instance.contribution_item, created_item)
 
+    def test_near_duplicate_titles_use_the_existing_item(self):
+        self.client.force_login(self.new_user)
+        existing_item = ContributionItem.objects.create(title="Beer")
+
+        self.client.post(self.url, {"contribution_item": " BEERS", "quantity": 2})
+
+        self.assertEqual(ContributionItem.objects.count(), 1)
+        self.assertEqual(
+            ContributionRequirement.objects.filter(
+                contribution_item=existing_item
+            ).count(),
+            2,
+        )
+
     def test_happy_path_existing_contribution_item(self):
         # Arrange
         self.client.force_login(self.new_user)
@@ -126,6 +141,22 @@ class RequirmentCreateViewTestCase(TestCase):
         for instance in contribution_requirements:
             self.assertEqual(instance.contribution_item, previously_existing_item)
 
+    def test_contributions_tab_reads_summary(self):
+        self.client.force_login(self.new_user)
+        self.client.post(self.url, self.requirement_data)
+        self.client.post(self.url, {"contribution_item": "other", "quantity": 2})
+
+        response = self.client.get(
+            reverse("event_detail_contributions", args=[self.event.pk])
+        )
+
+        summaries = list(response.context["contribution_summaries"])
+        self.assertEqual(
+            [(summary.required, summary.committed) for summary in summaries],
+            [(self.requirement_data["quantity"], 0), (2, 0)],
+        )
+        self.assertEqual(summaries, list(ContributionSummary.objects.order_by("pk")))
+
 
 class RequirmentEditViewTestCase(TestCase):
     @classmethod
@@ -169,6 +200,8 @@ class RequirmentEditViewTestCase(TestCase):
             if i < 3
         ]
         ContributionCommitment.objects.bulk_create(contribution_commitments)
+        # bulk_create skips the signal handlers that maintain the summary
+        ContributionSummary.objects.rebuild()
 
     def test_forbidden_for_unauthenticated_user(self):
         response = self.client.post(self.url, {"quantity": 500})
@@ -195,6 +228,7 @@ class RequirmentEditViewTestCase(TestCase):
         self.assertEqual(response.context["contribution_item"], self.contribution_item)
 
         self.assertContains(response, 'name="quantity"')
+        self.assertContains(response, "3 items commited out of a total of 5")
 
     def test_post_request_with_fewer_requirements_than_committed_no_db_change(self):
         self.client.login(username="b", password="b")
@@ -0,0 +1,98 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import Event
+from users.models import User
+
+
+class EventSearchViewTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organiser = User.objects.create(username="b", password="b")
+        now = timezone.now()
+        cls.future_events = [
+            cls.create_event(f"Barbecue {i}", now + timezone.timedelta(days=i + 1))
+            for i in range(7)
+        ]
+        cls.picnic = cls.create_event(
+            "Picnic",
+            now + timezone.timedelta(days=1),
+            description="Bring something for the barbecue",
+        )
+        cls.past_event = cls.create_event(
+            "Barbecue last year", now - timezone.timedelta(days=365)
+        )
+        cls.create_event("Bake sale", now + timezone.timedelta(days=1))
+
+    @classmethod
+    def create_event(cls, title, ends_at, description=""):
+        return Event.objects.create(
+            title=title,
+            organiser=cls.organiser,
+            contact=cls.organiser,
+            starts_at=ends_at - timezone.timedelta(hours=1),
+            ends_at=ends_at,
+            location="here",
+            description=description,
+            maximum_attendees=15,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, terms, when="future", **params):
+        url = reverse("event_list", kwargs={"when": when})
+        return self.client.get(url, {"q": terms, **params})
+
+    def test_matching_events_are_listed_best_first(self):
+        response = self.search("barbecue")
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        page = response.context["page_obj"]
+        self.assertEqual(page.paginator.count, 8)
+        self.assertNotIn(self.picnic, page.object_list)
+        self.assertEqual(response.context["title"], 'Events matching "barbecue"')
+
+    def test_search_is_combined_with_the_time_filter(self):
+        response = self.search("barbecue", when="past")
+
+        self.assertEqual(list(response.context["page_obj"]), [self.past_event])
+
+    def test_pages_are_walked_by_cursor(self):
+        first_page = self.search("barbecue").context["page_obj"]
+        self.assertContains(
+            self.search("barbecue"),
+            f"?q=barbecue&amp;cursor={first_page.next_cursor}",
+        )
+
+        second_page = self.search("barbecue", cursor=first_page.next_cursor).context[
+            "page_obj"
+        ]
+        events = list(first_page) + list(second_page)
+
+        self.assertFalse(second_page.has_next())
+        self.assertEqual(len(events), 8)
+        self.assertEqual(events[-1], self.picnic)
+        self.assertEqual(
+            set(events), {*self.future_events, self.picnic}, "No event is listed twice"
+        )
+        previous_page = self.search(
+            "barbecue", cursor=second_page.previous_cursor
+        ).context["page_obj"]
+        self.assertEqual(list(previous_page), list(first_page))
+
+    def test_blank_search_lists_every_event(self):
+        response = self.search("  ")
+
+        self.assertEqual(response.context["page_obj"].paginator.count, 9)
+        self.assertEqual(response.context["search_params"], "")
+
+    def test_no_matches(self):
+        response = self.search("fireworks")
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(list(response.context["page_obj"]), [])
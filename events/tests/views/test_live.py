@@ -0,0 +1,107 @@
+import json
+from http import HTTPStatus
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from events.live import CapacityBroadcaster
+from events.models import RSVP, Event
+from users.models import User
+
+
+class LiveCapacityTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="b")
+        cls.events = [
+            Event.objects.create(
+                title=f"event_{i}",
+                organiser=cls.user,
+                contact=cls.user,
+                starts_at=timezone.now() + timezone.timedelta(hours=1),
+                ends_at=timezone.now() + timezone.timedelta(hours=2),
+                location="here",
+                maximum_attendees=15,
+            )
+            for i in range(2)
+        ]
+
+    def drain(self, queue):
+        messages = []
+        while not queue.empty():
+            messages.append(queue.get_nowait())
+        return messages
+
+    def test_one_query_per_poll_for_every_stream(self):
+        broadcaster = CapacityBroadcaster()
+        pks = {event.pk for event in self.events}
+        queues = [broadcaster.subscribe(pks) for _ in range(3)]
+
+        with self.assertNumQueries(1):
+            async_to_sync(broadcaster.publish_changes)()
+
+        for queue in queues:
+            self.assertEqual(
+                sorted(self.drain(queue)), [(pk, 0, 15) for pk in sorted(pks)]
+            )
+
+    def test_only_changes_are_published(self):
+        broadcaster = CapacityBroadcaster()
+        queue = broadcaster.subscribe({self.events[0].pk})
+        async_to_sync(broadcaster.publish_changes)()
+        self.drain(queue)
+
+        async_to_sync(broadcaster.publish_changes)()
+        self.assertEqual(self.drain(queue), [])
+
+        RSVP.objects.create(event=self.events[0], user=self.user)
+        async_to_sync(broadcaster.publish_changes)()
+        self.assertEqual(self.drain(queue), [(self.events[0].pk, 1, 15)])
+
+    def test_new_streams_get_known_capacities(self):
+        broadcaster = CapacityBroadcaster()
+        first = broadcaster.subscribe({self.events[0].pk})
+        async_to_sync(broadcaster.publish_changes)()
+
+        second = broadcaster.subscribe({self.events[0].pk})
+
+        self.assertEqual(self.drain(second), self.drain(first))
+
+    def test_unsubscribed_events_are_no_longer_polled(self):
+        broadcaster = CapacityBroadcaster()
+        queue = broadcaster.subscribe({self.events[0].pk})
+
+        broadcaster.unsubscribe({self.events[0].pk}, queue)
+
+        self.assertEqual(broadcaster.subscribers, {})
+
+    def test_bad_ids(self):
+        response = self.client.get(reverse("event_attendance_stream"), {"ids": "a"})
+
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    @override_settings(EVENTS_LIVE_POLL_SECONDS=0.01)
+    async def test_capacity_changes_are_streamed(self):
+        event = self.events[0]
+        response = await self.async_client.get(
+            reverse("event_attendance_stream"), {"ids": event.pk}
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        content = response.streaming_content
+
+        self.assertEqual(await anext(content), b"retry: 1000\n\n")
+
+        def get_capacity(message):
+            name, data = message.decode().strip().split("\n")
+            self.assertEqual(name, "event: capacity")
+            return json.loads(data.removeprefix("data: "))
+
+        self.assertEqual(
+            get_capacity(await anext(content)),
+            {"id": event.pk, "attendee_count": 0, "maximum_attendees": 15},
+        )
+        await sync_to_async(RSVP.objects.create)(event=event, user=self.user)
+        self.assertEqual(get_capacity(await anext(content))["attendee_count"], 1)
+        await content.aclose()
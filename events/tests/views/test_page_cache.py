@@ -0,0 +1,115 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from events.cache import get_cache_stats
+from events.models import RSVP, Event
+from users.models import User
+
+
+@override_settings(EVENTS_PAGE_CACHE_SECONDS=30)
+class AnonymousPageCacheTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="b", password="b")
+        for i in range(7):
+            cls.event = Event.objects.create(
+                title=f"event_{i}",
+                organiser=cls.user,
+                contact=cls.user,
+                starts_at=timezone.now() + timezone.timedelta(days=1, hours=i),
+                ends_at=timezone.now() + timezone.timedelta(days=1, hours=i + 1),
+                location="here",
+                maximum_attendees=15,
+            )
+        cls.list_url = reverse("event_list", kwargs={"when": "future"})
+        cls.detail_url = reverse("event_detail", kwargs={"pk": cls.event.pk})
+
+    def setUp(self):
+        cache.clear()
+
+    def test_second_request_is_served_from_cache(self):
+        for url in (self.list_url, self.detail_url):
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                hits = get_cache_stats("page")["hits"]
+
+                with self.assertNumQueries(0):
+                    second = self.client.get(url)
+
+                self.assertEqual(second.content, first.content)
+                self.assertEqual(get_cache_stats("page")["hits"], hits + 1)
+
+    def test_when_and_cursor_are_cached_separately(self):
+        first_page = self.client.get(self.list_url)
+        cursor = first_page.context["page_obj"].next_cursor
+        past = self.client.get(reverse("event_list", kwargs={"when": "past"}))
+
+        second_page = self.client.get(self.list_url, {"cursor": cursor})
+
+        self.assertEqual(second_page.context["page_obj"].number, 2)
+        self.assertNotEqual(second_page.content, first_page.content)
+        self.assertNotEqual(past.content, first_page.content)
+
+    def test_changing_an_event_purges_cached_pages(self):
+        self.client.get(self.list_url)
+        self.client.get(self.detail_url)
+
+        self.event.title = "renamed"
+        self.event.save()
+
+        self.assertIsNotNone(self.client.get(self.list_url).context)
+        self.assertContains(self.client.get(self.detail_url), "renamed")
+
+    def test_rsvps_keep_cached_pages(self):
+        self.client.get(self.list_url)
+        self.client.get(self.detail_url)
+
+        rsvp = RSVP.objects.create(event=self.event, user=self.user)
+        rsvp.delete()
+        RSVP.objects.attend(self.event, self.user)
+
+        with self.assertNumQueries(0):
+            self.client.get(self.list_url)
+            self.client.get(self.detail_url)
+
+    def test_only_shared_pages_are_hydrated(self):
+        status_url = reverse("event_attendance_status")
+
+        self.assertContains(self.client.get(self.list_url), status_url)
+        self.assertContains(self.client.get(self.list_url), status_url)
+
+        self.client.force_login(self.user)
+        self.assertNotContains(self.client.get(self.list_url), status_url)
+
+    def test_pages_are_rendered_as_of_the_bucket_start(self):
+        response = self.client.get(self.list_url)
+
+        self.assertEqual(response.context["now"].timestamp() % 30, 0)
+
+    def test_authenticated_users_are_not_cached(self):
+        self.client.force_login(self.user)
+        self.client.get(self.list_url)
+
+        response = self.client.get(self.list_url)
+
+        self.assertIsNotNone(response.context)
+
+    def test_pending_messages_are_not_cached(self):
+        self.client.get(self.list_url)
+        # Sends an anonymous user to log in with a message for the next page
+        self.client.get(reverse("event_edit", kwargs={"pk": self.event.pk}))
+
+        response = self.client.get(self.list_url)
+
+        self.assertIsNotNone(response.context)
+        self.assertEqual(len(response.context["messages"]), 1)
+
+    @override_settings(EVENTS_PAGE_CACHE_SECONDS=0)
+    def test_disabled_by_default(self):
+        self.client.get(self.list_url)
+
+        response = self.client.get(self.list_url)
+
+        self.assertIsNotNone(response.context)
@@ -0,0 +1,225 @@
+"""
+Per-route query budgets.
+
+Every named route in events.urls and users.urls is requested as an
+anonymous user, an attendee and the organiser, against datasets of two
+sizes. The number of queries must stay within the route's budget at both
+sizes, so a query that runs once per event, RSVP, requirement or
+commitment fails here with the SQL listed.
+
+A new route needs an entry in BUDGETS - test_every_route_has_a_budget
+fails until it has one.
+"""
+
+from dataclasses import dataclass, field
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, reverse
+from django.utils import timezone
+
+from events import urls as events_urls
+from events.autocomplete import uses_trigram_index
+from events.models import (
+    RSVP,
+    ContributionCommitment,
+    ContributionItem,
+    ContributionRequirement,
+    Event,
+)
+from users import urls as users_urls
+from users.models import User
+
+ROLES = ("anonymous", "attendee", "organiser")
+
+
+@dataclass
+class Budget:
+    """
+    The most queries a route may run for each role.
+
+    kwargs and data map URL arguments and request data to values, or to
+    functions of the test case for routes that point at the seeded event
+    and item. Requests that write are rolled back afterwards, so every
+    request sees the same data. Streamed responses are read up to their
+    first event.
+    """
+
+    anonymous: int
+    attendee: int
+    organiser: int
+    method: str = "get"
+    kwargs: dict = field(default_factory=dict)
+    data: dict = field(default_factory=dict)
+
+
+EVENT = {"pk": lambda case: case.event.pk}
+EVENT_AND_ITEM = {**EVENT, "contribution_item_pk": lambda case: case.item.pk}
+
+BUDGETS = {
+    "signup": Budget(0, 2, 2),
+    "home": Budget(0, 0, 0),
+    # Three more than a single page of events needs, for the page
+    # validators and to estimate and count the pages - the attendee and
+    # organiser use the count cached by the anonymous request
+    "event_list": Budget(4, 5, 5, kwargs={"when": "future"}),
+    "event_detail": Budget(2, 6, 6, kwargs=EVENT),
+    "event_detail_contributions": Budget(4, 7, 7, kwargs=EVENT),
+    "event_attendance": Budget(
+        0, 9, 9, method="post", kwargs={**EVENT, "action": "unattend"}
+    ),
+    "event_attendance_status": Budget(1, 3, 3, data={"ids": "1,2,3,4,5"}),
+    # The first poll of the stream's events
+    "event_attendance_stream": Budget(
+        1, 1, 1, data={"ids": lambda case: case.event.pk}
+    ),
+    # One to load the in-memory title index, when items have changed
+    "contribution_item_autocomplete": Budget(1, 3, 3, data={"q": "item"}),
+    "event_new": Budget(0, 3, 3),
+    "event_edit": Budget(2, 4, 6, kwargs=EVENT),
+    "event_delete": Budget(2, 4, 5, kwargs=EVENT),
+    "requirement_create": Budget(
+        0,
+        4,
+        8,
+        method="post",
+        kwargs=EVENT,
+        data={"contribution_item": "item_0", "quantity": 2},
+    ),
+    "requirement_edit": Budget(0, 4, 5, kwargs=EVENT_AND_ITEM),
+    "commitment_create": Budget(0, 6, 6, kwargs=EVENT_AND_ITEM),
+    "profile": Budget(
+        4, 6, 6, kwargs={"username": lambda case: case.attendee.username}
+    ),
+}
+
+
+def get_route_names(urlpatterns):
+    names = set()
+    for pattern in urlpatterns:
+        # Included URLconfs (such as django.contrib.auth.urls) are not ours
+        if isinstance(pattern, URLPattern) and pattern.name:
+            names.add(pattern.name)
+        elif not isinstance(pattern, URLResolver):
+            raise TypeError(f"Unexpected URL pattern {pattern!r}")
+    return names
+
+
+class QueryBudgetTestMixin:
+    """
+    Seeds scale events attended by the attendee, each with scale other
+    attendees, and scale items required and committed to.
+    """
+
+    scale = 1
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organiser = User.objects.create_user(username="organiser")
+        cls.attendee = User.objects.create_user(username="attendee")
+        others = [
+            User.objects.create_user(username=f"other_{i}") for i in range(cls.scale)
+        ]
+        items = [
+            ContributionItem.objects.create(title=f"item_{i}") for i in range(cls.scale)
+        ]
+        for i in range(cls.scale * 3):
+            event = Event.objects.create(
+                title=f"event_{i}",
+                organiser=cls.organiser,
+                contact=cls.organiser,
+                starts_at=timezone.now() + timezone.timedelta(days=1, hours=i),
+                ends_at=timezone.now() + timezone.timedelta(days=1, hours=i + 1),
+                location="here",
+                maximum_attendees=cls.scale + 10,
+            )
+            RSVP.objects.create(event=event, user=cls.organiser)
+            rsvp = RSVP.objects.create(event=event, user=cls.attendee)
+            for other in others:
+                RSVP.objects.create(event=event, user=other)
+            for item in items:
+                for _ in range(2):
+                    requirement = ContributionRequirement.objects.create(
+                        event=event, contribution_item=item
+                    )
+                ContributionCommitment.objects.create(
+                    RSVP=rsvp, contribution_requirement=requirement
+                )
+        cls.event = event
+        cls.item = items[0]
+
+    def setUp(self):
+        # So counts and pages cached by earlier tests are not relied on
+        cache.clear()
+        # Checked once per process, by whichever request comes first
+        uses_trigram_index(connection.alias)
+
+    def resolve(self, values):
+        return {
+            name: value(self) if callable(value) else value
+            for name, value in values.items()
+        }
+
+    async def read_first_event(self, response):
+        content = response.streaming_content
+        try:
+            async for message in content:
+                if message.startswith(b"event:"):
+                    break
+        finally:
+            await content.aclose()
+
+    def count_queries(self, route_name, budget, role):
+        if role != "anonymous":
+            self.client.force_login(getattr(self, role))
+        url = reverse(route_name, kwargs=self.resolve(budget.kwargs))
+        request = getattr(self.client, budget.method)
+        with CaptureQueriesContext(connection) as ctx:
+            with transaction.atomic():
+                response = request(url, self.resolve(budget.data))
+                if response.streaming:
+                    async_to_sync(self.read_first_event)(response)
+                transaction.set_rollback(True)
+        self.client.logout()
+        self.assertLess(response.status_code, 500)
+        return [
+            query["sql"]
+            for query in ctx.captured_queries
+            if not query["sql"].startswith(
+                ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK")
+            )
+        ]
+
+    # Streams end without an event rather than hang, should none be sent
+    @override_settings(EVENTS_LIVE_STREAM_SECONDS=1)
+    def test_routes_stay_within_query_budgets(self):
+        for route_name, budget in BUDGETS.items():
+            for role in ROLES:
+                with self.subTest(route=route_name, role=role):
+                    queries = self.count_queries(route_name, budget, role)
+                    allowed = getattr(budget, role)
+                    if len(queries) > allowed:
+                        self.fail(
+                            f"{route_name} ran {len(queries)} queries as {role} "
+                            f"at scale {self.scale}, over its budget of {allowed}:\n"
+                            + "\n".join(
+                                f"{i}. {sql}" for i, sql in enumerate(queries, 1)
+                            )
+                        )
+
+
+class QueryBudgetTestCase(QueryBudgetTestMixin, TestCase):
+    def test_every_route_has_a_budget(self):
+        route_names = get_route_names(events_urls.urlpatterns) | get_route_names(
+            users_urls.urlpatterns
+        )
+
+        self.assertEqual(route_names - BUDGETS.keys(), set())
+        self.assertEqual(BUDGETS.keys() - route_names, set())
+
+
+class ScaledQueryBudgetTestCase(QueryBudgetTestMixin, TestCase):
+    scale = 4
@@ -7,7 +7,7 @@ from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
-from events.models import Event
+from events.models import RSVP, Event
 from users.models import User
 
 
@@ -115,8 +115,8 @@ class ListQueryTestCase(TestCase):
         Ensure that there is not an n+1 query on the list view
 
         This test asserts that the number of db queries that the list view
-        incurrs with multiple events present is only one more than that it incurs
-        when it is empty.
+        incurrs with multiple events present is the same as it incurs when it
+        is empty - a page of events is fetched in a single query.
         """
 
         # Arrange
@@ -127,17 +127,77 @@ class ListQueryTestCase(TestCase):
             self.client.get(self.url)
             # Arrange - get the number of queries present with 0 events
             queries_without_events = len(ctx.captured_queries)
-            expected_queries_with_events = queries_without_events + 1
+            expected_queries_with_events = queries_without_events
 
             # Act - Create three future events
             bulk_event_creator(
                 3, self.new_user, timezone.now() + timezone.timedelta(hours=1)
             )
 
-            # Assert - Extra events have resulted in only one more query
+            # Assert - Extra events have not resulted in any more queries
             self.assertNumQueries(expected_queries_with_events, call_route)
 
 
+class ListUserRSVPTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organiser = User.objects.create(username="a", password="a")
+        cls.attendee = User.objects.create(username="b", password="b")
+        bulk_event_creator(
+            3, cls.organiser, timezone.now() + timezone.timedelta(hours=1)
+        )
+        cls.attended_event = Event.objects.order_by("pk").first()
+        RSVP.objects.create(user=cls.attendee, event=cls.attended_event)
+        cls.url = reverse("event_list", kwargs={"when": "future"})
+
+    def test_has_user_rsvp_is_set_from_the_users_rsvps(self):
+        self.client.force_login(self.attendee)
+
+        response = self.client.get(self.url)
+
+        flags = {
+            event.pk: event.has_user_rsvp for event in response.context["object_list"]
+        }
+        self.assertEqual(len(flags), 3)
+        self.assertTrue(flags.pop(self.attended_event.pk))
+        self.assertFalse(any(flags.values()))
+
+    def test_page_query_has_no_per_row_rsvp_subquery(self):
+        """
+        The user's RSVPs are loaded once for the request rather than being
+        checked by a subquery against every event on the page.
+        """
+        self.client.force_login(self.attendee)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url)
+
+        rsvp_table = RSVP._meta.db_table
+        page_queries = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if Event._meta.db_table in query["sql"]
+        ]
+        self.assertTrue(page_queries)
+        self.assertEqual(
+            [sql for sql in page_queries if rsvp_table in sql],
+            [],
+        )
+        rsvp_queries = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if query["sql"].startswith("SELECT") and rsvp_table in query["sql"]
+        ]
+        self.assertEqual(len(rsvp_queries), 1)
+
+    def test_anonymous_user_has_no_rsvps(self):
+        response = self.client.get(self.url)
+
+        self.assertFalse(
+            any(event.has_user_rsvp for event in response.context["object_list"])
+        )
+
+
 class DetailTestCase(TestCase):
     @classmethod
     def setUpTestData(cls):
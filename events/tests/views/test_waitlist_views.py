@@ -0,0 +1,178 @@
+from http import HTTPStatus
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import RSVP, Event, WaitlistEntry, WaitlistEntryQuerySet
+from users.models import User
+
+
+class WaitlistViewTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organiser = User.objects.create_user(username="organiser")
+        cls.attendee = User.objects.create_user(username="attendee")
+        cls.waiting = [User.objects.create_user(username=f"user_{i}") for i in range(3)]
+        cls.event = Event.objects.create(
+            title="event",
+            organiser=cls.organiser,
+            contact=cls.organiser,
+            starts_at=timezone.now() + timezone.timedelta(hours=1),
+            ends_at=timezone.now() + timezone.timedelta(hours=2),
+            location="here",
+            maximum_attendees=1,
+        )
+        RSVP.objects.create(event=cls.event, user=cls.attendee)
+
+    def post(self, user, action):
+        self.client.force_login(user)
+        return self.client.post(
+            reverse("event_attendance", args=[self.event.pk, action]),
+            HTTP_ACCEPT="application/json",
+        )
+
+    def get_attendees(self):
+        return set(RSVP.objects.filter(event=self.event).values_list("user", flat=True))
+
+    def test_join_waitlist_of_full_event(self):
+        for position, user in enumerate(self.waiting, start=1):
+            response = self.post(user, "join_waitlist")
+
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            self.assertEqual(
+                response.json(),
+                {"success": True, "attending": False, "waitlist_position": position},
+            )
+        self.assertEqual(self.get_attendees(), {self.attendee.pk})
+
+    def test_join_waitlist_with_space_attends(self):
+        Event.objects.filter(pk=self.event.pk).update(maximum_attendees=2)
+
+        response = self.post(self.waiting[0], "join_waitlist")
+
+        self.assertTrue(response.json()["attending"])
+        self.assertIn(self.waiting[0].pk, self.get_attendees())
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+    def test_join_waitlist_when_attending(self):
+        response = self.post(self.attendee, "join_waitlist")
+
+        self.assertEqual(response.status_code, HTTPStatus.CONFLICT)
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+    def test_leave_waitlist(self):
+        self.post(self.waiting[0], "join_waitlist")
+
+        response = self.post(self.waiting[0], "leave_waitlist")
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        response = self.post(self.waiting[0], "leave_waitlist")
+        self.assertEqual(response.status_code, HTTPStatus.CONFLICT)
+
+    def test_unattend_promotes_the_first_waiting(self):
+        for user in self.waiting:
+            self.post(user, "join_waitlist")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post(self.attendee, "unattend")
+
+        self.assertEqual(self.get_attendees(), {self.waiting[0].pk})
+        self.assertEqual(WaitlistEntry.objects.count(), 2)
+
+    def test_deleting_an_attendee_promotes_the_first_waiting(self):
+        for user in self.waiting:
+            self.post(user, "join_waitlist")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.attendee.delete()
+
+        self.assertEqual(self.get_attendees(), {self.waiting[0].pk})
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendee_count, 1)
+
+    def test_deleting_the_event_promotes_nobody(self):
+        self.post(self.waiting[0], "join_waitlist")
+
+        with mock.patch.object(WaitlistEntryQuerySet, "promote") as promote:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.event.delete()
+
+        promote.assert_not_called()
+
+    def test_waitlist_position_is_shown(self):
+        for user in self.waiting:
+            self.post(user, "join_waitlist")
+
+        self.client.force_login(self.waiting[1])
+        response = self.client.get(reverse("event_detail", args=[self.event.pk]))
+
+        self.assertContains(response, "You are number 2 on the waitlist.")
+        self.assertContains(
+            response,
+            reverse("event_attendance", args=[self.event.pk, "leave_waitlist"]),
+        )
+        self.assertNotContains(response, "Join waitlist")
+
+        self.post(self.waiting[0], "leave_waitlist")
+        self.client.force_login(self.waiting[1])
+        response = self.client.get(reverse("event_detail", args=[self.event.pk]))
+
+        self.assertContains(response, "You are number 1 on the waitlist.")
+
+    def test_waitlist_changes_are_not_answered_not_modified(self):
+        url = reverse("event_detail", args=[self.event.pk])
+        self.client.force_login(self.waiting[1])
+        etag = self.client.get(url)["ETag"]
+
+        self.post(self.waiting[0], "join_waitlist")
+        self.post(self.waiting[1], "join_waitlist")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, "You are number 2 on the waitlist.")
+
+        etag = response["ETag"]
+        self.post(self.waiting[0], "leave_waitlist")
+        self.client.force_login(self.waiting[1])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, "You are number 1 on the waitlist.")
+
+    def test_join_waitlist_is_offered_when_not_waiting(self):
+        self.client.force_login(self.waiting[0])
+        response = self.client.get(reverse("event_detail", args=[self.event.pk]))
+
+        self.assertContains(response, "Join waitlist")
+        self.assertNotContains(response, "on the waitlist")
+
+    def test_raising_maximum_attendees_promotes_in_order(self):
+        for user in reversed(self.waiting):
+            self.post(user, "join_waitlist")
+        self.client.force_login(self.organiser)
+        starts_at = timezone.localtime(self.event.starts_at)
+        ends_at = timezone.localtime(self.event.ends_at)
+
+        self.client.post(
+            reverse("event_edit", args=[self.event.pk]),
+            {
+                "title": self.event.title,
+                "contact": self.organiser.pk,
+                "maximum_attendees": 3,
+                "starts_at": starts_at.strftime("%Y-%m-%dT%H:%M"),
+                "ends_at": ends_at.strftime("%Y-%m-%dT%H:%M"),
+                "location": self.event.location,
+            },
+        )
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendee_count, 3)
+        self.assertEqual(
+            self.get_attendees(),
+            {self.attendee.pk, self.waiting[2].pk, self.waiting[1].pk},
+        )
+        self.assertEqual(
+            list(WaitlistEntry.objects.values_list("user", flat=True)),
+            [self.waiting[0].pk],
+        )
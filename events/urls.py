@@ -1,25 +1,55 @@
+from django.conf import settings
 from django.urls import include, path, register_converter
 
 from . import converters, views
 
 register_converter(converters.WhenConverter, "when")
 
+if settings.EVENTS_ASYNC_VIEWS:
+    EventListView = views.AsyncEventListView
+    EventDetailView = views.AsyncEventDetailView
+    EventDetailContributionsView = views.AsyncEventDetailContributionsView
+else:
+    EventListView = views.EventListView
+    EventDetailView = views.EventDetailView
+    EventDetailContributionsView = views.EventDetailContributionsView
+
 urlpatterns = [
     path("accounts/", include("django.contrib.auth.urls")),
     path("signup/", views.signup_view, name="signup"),
-    path("events/", views.EventListView.as_view(), name="event_list"),
+    path("events/", EventListView.as_view(), name="event_list"),
     path("", views.home_view, name="home"),
-    path("events/<int:pk>/", views.EventDetailView.as_view(), name="event_detail"),
+    path("events/<int:pk>/", EventDetailView.as_view(), name="event_detail"),
     path(
         "events/<int:pk>/contributions/",
-        views.EventDetailContributionsView.as_view(),
+        EventDetailContributionsView.as_view(),
         name="event_detail_contributions",
     ),
+    path(
+        "events/<when:when>/",
+        EventListView.as_view(),
+        name="event_list",
+    ),
     path(
         "events/<when:when>/<int:page>/",
-        views.EventListView.as_view(),
+        EventListView.as_view(),
         name="event_list",
     ),
+    path(
+        "events/attendance/",
+        views.attendance_status_view,
+        name="event_attendance_status",
+    ),
+    path(
+        "events/live/",
+        views.attendance_stream_view,
+        name="event_attendance_stream",
+    ),
+    path(
+        "events/contribution-items/",
+        views.contribution_item_autocomplete_view,
+        name="contribution_item_autocomplete",
+    ),
     path(
         "events/<int:pk>/attendance/<str:action>/",
         views.manage_event_attendance,
@@ -1,9 +1,14 @@
-from datetime import datetime
+import asyncio
+from hashlib import md5
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import authenticate, login
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db import models, transaction
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.db import IntegrityError, models, transaction
 from django.http import (
     Http404,
     HttpResponseBadRequest,
@@ -11,10 +16,14 @@ from django.http import (
     HttpResponseNotAllowed,
     HttpResponseRedirect,
     JsonResponse,
+    StreamingHttpResponse,
 )
-from django.shortcuts import get_object_or_404, redirect, render
+from django.shortcuts import redirect, render
 from django.urls import reverse_lazy
 from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.http import urlencode
+from django.views.decorators.cache import never_cache
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -23,8 +32,11 @@ from django.views.generic import (
     UpdateView,
 )
 
-from users.models import User
-
+from .cache import (
+    attach_event_versions,
+    get_attendance_cache_key,
+    get_count_cache_key,
+)
 from .constants import TimeFilterOptions
 from .forms import (
     CommitmentForm,
@@ -33,143 +45,448 @@ from .forms import (
     DeleteEventForm,
     EventCreateForm,
     EventForm,
+    EventSearchForm,
     SignUpForm,
 )
-from .mixins import AuthenticatedEventOrganiserMixin
+from .live import stream_capacities
+from .loaders import (
+    aget_event_list_validators,
+    aget_event_validators,
+    alist,
+    get_event_list_validators,
+    get_event_validators,
+)
+from .mixins import (
+    AnonymousPageCacheMixin,
+    AsyncPageMixin,
+    AuthenticatedEventOrganiserMixin,
+    ConditionalGetMixin,
+    UserRSVPMixin,
+)
 from .models import (
     RSVP,
-    ContributionCommitment,
     ContributionItem,
     ContributionRequirement,
+    ContributionSummary,
     Event,
+    WaitlistEntry,
 )
+from .pagination import CachedCountKeysetPaginator
 
 
 def home_view(request):
     return redirect("event_list")
 
 
-class EventListView(ListView):
+class EventListView(
+    AnonymousPageCacheMixin, ConditionalGetMixin, UserRSVPMixin, ListView
+):
     paginate_by = 5
+    paginator_class = CachedCountKeysetPaginator
+
+    def get_validators(self):
+        return get_event_list_validators()
+
+    def get(self, request, *args, **kwargs):
+        if self.kwargs.get("page", 1) != 1:
+            # Numbered pages predate cursor pagination - start from the top
+            return redirect("event_list", when=self.kwargs["when"])
+        return super().get(request, *args, **kwargs)
 
     def get_time_filter(self) -> tuple[str, models.Q]:
         when = self.kwargs.get("when", "future")
         try:
-            return TimeFilterOptions.get_option(when)
+            return TimeFilterOptions.get_option(when, self.now)
         except ValueError:
             raise Http404()
 
+    @cached_property
+    def search_form(self):
+        return EventSearchForm(self.request.GET)
+
+    def get_search_terms(self):
+        if not self.search_form.is_valid():
+            return ""
+        return self.search_form.cleaned_data["q"].strip()
+
     def get_queryset(self):
         _, event_order, event_filter = self.get_time_filter()
-        qs = (
-            Event.objects.with_attendance_fields()
-            .filter(event_filter)
-            .order_by(event_order)
+        queryset = Event.objects.with_attendance_fields().filter(event_filter)
+        if terms := self.get_search_terms():
+            # Best matches first, in place of the time filter's ordering
+            return queryset.search(terms).order_by("-rank", "id")
+        return queryset.order_by(event_order)
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        count_name = when = self.kwargs.get("when", "future")
+        if terms := self.get_search_terms():
+            terms_hash = md5(terms.lower().encode(), usedforsecurity=False)
+            count_name = f"{when}:search:{terms_hash.hexdigest()}"
+        return self.paginator_class(
+            queryset, per_page, count_cache_key=get_count_cache_key(count_name)
         )
-        if self.request.user.is_authenticated:
-            qs = qs.with_has_user_rsvp(self.request.user)
-        return qs
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = self.get_paginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get("cursor"))
+        except InvalidPage:
+            raise Http404("Invalid page")
+        return (paginator, page, page.object_list, page.has_other_pages())
 
     def get_context_data(self, **kwargs):
         title, _, _ = self.get_time_filter()
         when = self.kwargs.get("when", "future")
+        terms = self.get_search_terms()
+        if terms:
+            title = f'{title} matching "{terms}"'
 
-        return super().get_context_data(
+        context = super().get_context_data(
             when=when,
             title=title,
-            now=timezone.now(),
+            search_form=self.search_form,
+            search_params=urlencode({"q": terms}) if terms else "",
+            now=self.now,
             button_text_unattend="Cancel",
             button_text_attend="Join!",
             **kwargs,
         )
+        self.mark_user_rsvps(context["object_list"])
+        attach_event_versions(context["object_list"])
+        return context
 
 
-class EventDetailView(DetailView):
+class EventDetailView(
+    AnonymousPageCacheMixin, ConditionalGetMixin, UserRSVPMixin, DetailView
+):
+    def get_validators(self):
+        return get_event_validators(self.kwargs["pk"])
+
     def get_queryset(self):
-        qs = Event.objects.with_attendance_fields()
-        if self.request.user.is_authenticated:
-            qs = qs.with_has_user_rsvp(self.request.user)
-        return qs
+        return Event.objects.with_attendance_fields()
+
+    def get_object(self, queryset=None):
+        event = super().get_object(queryset)
+        self.mark_user_rsvps([event])
+        if self.shows_waitlist_position(event):
+            event.waitlist_position = WaitlistEntry.objects.position(
+                event, self.request.user
+            )
+        return event
+
+    def shows_waitlist_position(self, event):
+        return self.request.user.is_authenticated and not (
+            event.has_user_rsvp or event.accepting_attendees
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(
             button_text_unattend="Cancel your attendance",
             button_text_attend="Join this Event!",
-            now=timezone.make_aware(datetime.now()),
+            now=self.now,
             **kwargs,
         )
         return context
 
 
-class EventDetailContributionsView(DetailView):
+class EventDetailContributionsView(ConditionalGetMixin, UserRSVPMixin, DetailView):
     template_name = "events/event_detail_contributions.html"
 
+    def get_validators(self):
+        return get_event_validators(self.kwargs["pk"])
+
     def get_queryset(self):
-        qs = Event.objects.with_attendance_fields()
-        if self.request.user.is_authenticated:
-            qs = qs.with_has_user_rsvp(self.request.user)
-        return qs
+        return Event.objects.with_attendance_fields()
+
+    def get_object(self, queryset=None):
+        event = super().get_object(queryset)
+        self.mark_user_rsvps([event])
+        return event
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(
             form=ContributionForm,
             **kwargs,
         )
-        context["contribution_items"] = ContributionItem.objects.filter_for_event(
-            self.object
-        ).with_counts_for_event(self.object)
+        context["contribution_summaries"] = self.get_contribution_summaries()
         return context
 
+    def get_contribution_summaries(self):
+        return (
+            ContributionSummary.objects.filter(
+                event_id=self.kwargs["pk"], required__gt=0
+            )
+            .select_related("contribution_item")
+            .order_by("contribution_item_id")
+        )
+
+
+async def aget_event(view):
+    """
+    The view's event with the async ORM, marked with the user's RSVP, for
+    the async event pages.
+    """
+    event = await view.get_queryset().filter(pk=view.kwargs["pk"]).afirst()
+    if event is None:
+        raise Http404("No event found matching the query")
+    view.mark_user_rsvps([event])
+    return event
+
+
+class AsyncEventListView(AsyncPageMixin, EventListView):
+    async def aget_validators(self):
+        return await aget_event_list_validators()
+
+    async def get(self, request, *args, **kwargs):
+        if self.kwargs.get("page", 1) != 1:
+            return redirect("event_list", when=self.kwargs["when"])
+        self.object_list = self.get_queryset()
+        paginator = await sync_to_async(self.get_paginator)(
+            self.object_list, self.paginate_by
+        )
+        try:
+            page = await paginator.apage(request.GET.get("cursor"))
+        except InvalidPage:
+            raise Http404("Invalid page")
+        self.paginated = (paginator, page, page.object_list, page.has_other_pages())
+        # Reads the count and event versions through the cache
+        context = await sync_to_async(self.get_context_data)()
+        return self.render_to_response(context)
+
+    def paginate_queryset(self, queryset, page_size):
+        return self.paginated
+
+
+class AsyncEventDetailView(AsyncPageMixin, EventDetailView):
+    async def aget_validators(self):
+        return await aget_event_validators(self.kwargs["pk"])
+
+    async def get(self, request, *args, **kwargs):
+        self.object = await aget_event(self)
+        if self.shows_waitlist_position(self.object):
+            self.object.waitlist_position = await WaitlistEntry.objects.aposition(
+                self.object, request.user
+            )
+        context = self.get_context_data(object=self.object)
+        return self.render_to_response(context)
+
+
+class AsyncEventDetailContributionsView(AsyncPageMixin, EventDetailContributionsView):
+    async def aget_validators(self):
+        return await aget_event_validators(self.kwargs["pk"])
+
+    async def get(self, request, *args, **kwargs):
+        # The summaries are looked up by the event's pk, so need not wait
+        self.object, self.contribution_summaries = await asyncio.gather(
+            aget_event(self),
+            alist(super().get_contribution_summaries()),
+        )
+        context = self.get_context_data(object=self.object)
+        return self.render_to_response(context)
+
+    def get_contribution_summaries(self):
+        return self.contribution_summaries
+
+
+def get_event_ids(request):
+    """
+    The event ids listed in ?ids=, or None if they are missing, malformed or
+    more than settings.EVENTS_ATTENDANCE_STATUS_MAX_IDS.
+    """
+    try:
+        ids = {int(pk) for pk in request.GET.get("ids", "").split(",") if pk}
+    except ValueError:
+        return None
+    if not ids or len(ids) > settings.EVENTS_ATTENDANCE_STATUS_MAX_IDS:
+        return None
+    return ids
+
+
+def get_event_ids_error_response():
+    data = {
+        "success": False,
+        "error_message": "ids must list 1 to "
+        f"{settings.EVENTS_ATTENDANCE_STATUS_MAX_IDS} event ids",
+    }
+    return JsonResponse(data, status=400)
+
+
+@never_cache
+def attendance_status_view(request):
+    """
+    Attendee counts and the user's RSVP for each event in ?ids=, in one
+    query, for attendance-form.js to bring cached pages up to date.
+    """
+    ids = get_event_ids(request)
+    if ids is None:
+        return get_event_ids_error_response()
+
+    events = Event.objects.filter(pk__in=ids).with_is_accepting_attendees()
+    if request.user.is_authenticated:
+        events = events.with_has_user_rsvp(request.user)
+    else:
+        events = events.annotate(has_user_rsvp=models.Value(False))
+    data = {
+        "success": True,
+        "events": {
+            event["pk"]: {
+                "attendee_count": event["attendee_count"],
+                "maximum_attendees": event["maximum_attendees"],
+                "remaining_spaces": event["remaining_spaces"],
+                "has_user_rsvp": event["has_user_rsvp"],
+                "accepting_attendees": event["is_accepting_attendees"],
+            }
+            for event in events.with_attendance_fields().values(
+                "pk",
+                "attendee_count",
+                "maximum_attendees",
+                "remaining_spaces",
+                "has_user_rsvp",
+                "is_accepting_attendees",
+            )
+        },
+    }
+    return JsonResponse(data)
+
+
+async def attendance_stream_view(request):
+    """
+    Push the attendee counts of the events in ?ids= as they change, as
+    server-sent events. Needs the ASGI application to stream.
+    """
+    ids = get_event_ids(request)
+    if ids is None:
+        return get_event_ids_error_response()
+    response = StreamingHttpResponse(
+        stream_capacities(ids), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # Otherwise nginx holds events back to fill its buffer
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def contribution_item_autocomplete_view(request):
+    """
+    Contribution item titles for ?q=, for the requirement form to suggest
+    existing items rather than near-duplicates of them.
+    """
+    terms = request.GET.get("q", "")[:100]
+    items = ContributionItem.objects.autocomplete(
+        terms, settings.EVENTS_AUTOCOMPLETE_LIMIT
+    )
+    return JsonResponse(
+        {"success": True, "items": [{"id": pk, "title": title} for pk, title in items]}
+    )
+
+
+def update_attendance(pk, user, action):
+    """
+    Carry out an attendance action for user, returning the response data
+    and status for manage_event_attendance.
+    """
+    if action == "attend":
+        try:
+            rsvp = RSVP.objects.attend(pk, user)
+        except IntegrityError:
+            data = {
+                "success": False,
+                "error_message": "You are already attending this Event - this may have been updated elsewhere",
+            }
+            status = 409
+        else:
+            if rsvp is not None:
+                data = {
+                    "success": True,
+                }
+                status = 200
+            elif Event.objects.filter(pk=pk).exists():
+                data = {
+                    "success": False,
+                    "error_message": "This Event is no longer accepting attendees - it could be full, or have ended.",
+                }
+                status = 409
+            else:
+                raise Http404("Event not found - this may have been deleted elsewhere")
+    elif action == "unattend":
+        with transaction.atomic():
+            # Locks only this RSVP, so a repeated request waits and
+            # then finds it gone rather than deleting it twice
+            rsvp = (
+                RSVP.objects.select_for_update().filter(event_id=pk, user=user).first()
+            )
+            if rsvp is not None:
+                rsvp.delete()
+        if rsvp is not None:
+            data = {
+                "success": True,
+            }
+            status = 200
+        elif Event.objects.filter(pk=pk).exists():
+            data = {
+                "success": False,
+                "error_message": "You are not attending this event - this may have been updated elsewhere.",
+            }
+            status = 409
+        else:
+            raise Http404("Event not found - this may have been deleted elsewhere")
+    elif action == "join_waitlist":
+        event = Event.objects.filter(pk=pk).first()
+        if event is None:
+            raise Http404("Event not found - this may have been deleted elsewhere")
+        if event.ends_at <= timezone.now():
+            data = {
+                "success": False,
+                "error_message": "This Event has ended.",
+            }
+            status = 409
+        elif RSVP.objects.filter(event=event, user=user).exists():
+            data = {
+                "success": False,
+                "error_message": "You are already attending this Event - this may have been updated elsewhere",
+            }
+            status = 409
+        else:
+            entry = WaitlistEntry.objects.join(event, user)
+            data = {
+                "success": True,
+                "attending": entry is None,
+                "waitlist_position": entry and entry.get_position(),
+            }
+            status = 200
+    elif action == "leave_waitlist":
+        if WaitlistEntry.objects.leave(pk, user):
+            data = {
+                "success": True,
+            }
+            status = 200
+        else:
+            data = {
+                "success": False,
+                "error_message": "You are not on the waitlist for this Event - this may have been updated elsewhere.",
+            }
+            status = 409
+    else:
+        raise Http404("Unknown attendance action")
+    return data, status
+
 
 def manage_event_attendance(request, pk, action):
     if request.user.is_authenticated:
         if request.method == "POST":
-            with transaction.atomic():
-                user = get_object_or_404(User, id=request.user.id)
-
-                try:
-                    event = Event.objects.select_for_update().get(pk=pk)
-                except Event.DoesNotExist:
-                    raise Http404(
-                        "Event not found - this may have been deleted elsewhere"
-                    )
-
-                if action == "attend":
-                    if event.accepting_attendees:
-                        _, rsvp_created = RSVP.objects.get_or_create(
-                            event=event, user=user
-                        )
-                        if rsvp_created:
-                            data = {
-                                "success": True,
-                            }
-                            status = 200
-                        else:
-                            data = {
-                                "success": False,
-                                "error_message": "You are already attending this Event - this may have been updated elsewhere",
-                            }
-                            status = 409
-                    else:
-                        data = {
-                            "success": False,
-                            "error_message": "This Event is no longer accepting attendees - it could be full, or have ended.",
-                        }
-                        status = 409
-                elif action == "unattend":
-                    try:
-                        rsvp = RSVP.objects.get(event=event, user=user)
-                        rsvp.delete()
-                        data = {
-                            "success": True,
-                        }
-                        status = 200
-                    except RSVP.DoesNotExist:
-                        data = {
-                            "success": False,
-                            "error_message": "You are not attending this event - this may have been updated elsewhere.",
-                        }
-                        status = 409
+            idempotency_key = request.headers.get("Idempotency-Key")
+            if idempotency_key:
+                # Repeats are answered from the cache, and duplicates sent
+                # together wait for the first to finish and share its result
+                data, status = cache.get_or_set(
+                    get_attendance_cache_key(
+                        request.user.pk, pk, action, idempotency_key
+                    ),
+                    lambda: update_attendance(pk, request.user, action),
+                    settings.EVENTS_IDEMPOTENCY_SECONDS,
+                )
+            else:
+                data, status = update_attendance(pk, request.user, action)
 
             if request.accepts("text/html"):
                 redirect_target = request.POST.get("redirect_target", "/")
@@ -212,12 +529,13 @@ class EventCreateView(LoginRequiredMixin, CreateView):
         return reverse_lazy("event_detail", args=[self.object.id])
 
     def form_valid(self, form):
-        event = form.save(commit=False)
-        event.organiser = self.request.user
-        event.save()
-        RSVP.objects.create(user=self.request.user, event=event)
+        with transaction.atomic():
+            self.object = form.save(commit=False)
+            self.object.organiser = self.request.user
+            self.object.save()
+            RSVP.objects.create(user=self.request.user, event=self.object)
         messages.success(self.request, "Event created successfully!")
-        return super().form_valid(form)
+        return HttpResponseRedirect(self.get_success_url())
 
 
 class EventUpdateView(AuthenticatedEventOrganiserMixin, UpdateView):
@@ -230,7 +548,10 @@ class EventUpdateView(AuthenticatedEventOrganiserMixin, UpdateView):
     def form_valid(self, form):
         if form.has_changed():
             messages.success(self.request, "Event modified successfully!")
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        if "maximum_attendees" in form.changed_data:
+            WaitlistEntry.objects.promote(self.object)
+        return response
 
 
 class EventDeleteView(AuthenticatedEventOrganiserMixin, DeleteView):
@@ -256,15 +577,20 @@ def requirement_create_view(request, pk):
         contribution_title = cleaned_data.get("contribution_item")
         contribution_quantity = cleaned_data.get("quantity")
 
-        contribution_item, _ = ContributionItem.objects.get_or_create(
-            title=contribution_title
+        contribution_item, _ = ContributionItem.objects.get_or_create_by_title(
+            contribution_title
         )
 
         contributions = [
             ContributionRequirement(event=event, contribution_item=contribution_item)
             for _ in range(contribution_quantity)
         ]
-        ContributionRequirement.objects.bulk_create(contributions)
+        with transaction.atomic():
+            ContributionRequirement.objects.bulk_create(contributions)
+            # bulk_create skips the signal handlers that maintain the summary
+            ContributionSummary.objects.adjust(
+                event.pk, contribution_item.pk, required=contribution_quantity
+            )
 
     return HttpResponseRedirect(
         reverse_lazy(
@@ -284,44 +610,17 @@ def requirement_edit_view(request, pk, contribution_item_pk):
         error_message = "Unauthorised to modify event requirements"
         return HttpResponseForbidden(error_message)
 
-    contribution_item = ContributionItem.objects.with_counts_for_event(event).get(
-        pk=contribution_item_pk
-    )
-
     if request.method == "POST":
-        form = ContributionEditForm(request.POST, contribution_item=contribution_item)
+        # set_quantity counts the requirements itself, under a lock
+        contribution_item = ContributionItem.objects.get(pk=contribution_item_pk)
+        form = ContributionEditForm(request.POST)
         if form.is_valid():
             cleaned_data = form.cleaned_data
             new_required_quantity = cleaned_data.get("quantity")
 
-            # If requirements are to be created
-            if new_required_quantity > contribution_item.requirements_count:
-                number_for_creation = (
-                    new_required_quantity - contribution_item.requirements_count
-                )
-                new_requirements = [
-                    ContributionRequirement(
-                        contribution_item=contribution_item, event=event
-                    )
-                    for _ in range(number_for_creation)
-                ]
-                ContributionRequirement.objects.bulk_create(new_requirements)
-
-            # If requirements are to be deleted
-            elif (
-                new_required_quantity < contribution_item.requirements_count
-                and new_required_quantity >= contribution_item.commitments_count
-            ):
-                number_for_deletion = (
-                    contribution_item.requirements_count - new_required_quantity
-                )
-                instances_for_deletion_pks = ContributionRequirement.objects.get_unfulfilled_requirements_for_item_for_event(
-                    contribution_item, event
-                ).values_list("pk", flat=True)[0:number_for_deletion]
-                if instances_for_deletion_pks:
-                    ContributionRequirement.objects.filter(
-                        pk__in=list(instances_for_deletion_pks)
-                    ).delete()
+            ContributionRequirement.objects.set_quantity(
+                event, contribution_item, new_required_quantity
+            )
 
             return HttpResponseRedirect(
                 reverse_lazy(
@@ -331,6 +630,20 @@ def requirement_edit_view(request, pk, contribution_item_pk):
             )
 
     else:
+        # Counted from the summary row, as the contributions tab does
+        summary = (
+            ContributionSummary.objects.filter(
+                event=event, contribution_item_id=contribution_item_pk
+            )
+            .select_related("contribution_item")
+            .first()
+        )
+        if summary is None:
+            contribution_item = ContributionItem.objects.get(pk=contribution_item_pk)
+            summary = ContributionSummary(contribution_item=contribution_item)
+        contribution_item = summary.contribution_item
+        contribution_item.requirements_count = summary.required
+        contribution_item.commitments_count = summary.committed
         form = ContributionEditForm(contribution_item=contribution_item)
 
         context = {"form": form, "event": event, "contribution_item": contribution_item}
@@ -358,20 +671,16 @@ def commitment_create_view(request, pk, contribution_item_pk):
         )
         if form.is_valid():
             cleaned_data = form.cleaned_data
-            unfulfilled_requirements = ContributionRequirement.objects.get_unfulfilled_requirements_for_item_for_event(
-                contribution_item, event
-            )
-            number_available = unfulfilled_requirements.count()
-
             commitment_quantity = cleaned_data.get("quantity")
-            if commitment_quantity > number_available:
-                return HttpResponseBadRequest()
-
-            for i, requirement in enumerate(unfulfilled_requirements):
-                if i < commitment_quantity:
-                    ContributionCommitment.objects.create(
-                        RSVP=rsvp, contribution_requirement=requirement
-                    )
+
+            with transaction.atomic():
+                number_claimed = ContributionRequirement.objects.claim_for_rsvp(
+                    rsvp, contribution_item, commitment_quantity
+                )
+                if number_claimed < commitment_quantity:
+                    # Not enough left - claim all or nothing
+                    transaction.set_rollback(True)
+                    return HttpResponseBadRequest()
 
             return HttpResponseRedirect(
                 reverse_lazy(
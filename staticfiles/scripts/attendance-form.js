@@ -1,3 +1,17 @@
+function describeAttendance(type, attendeeCount, maximumAttendees, attending) {
+  const remainingSpaces = Math.max(maximumAttendees - attendeeCount, 0);
+  if (type === "list") {
+    return `${remainingSpaces} spaces left${
+      attending ? " - you are attending" : ""
+    }`;
+  }
+  return `${attendeeCount} ${
+    attendeeCount === 1 ? "attendee" : "attendees"
+  } out of ${maximumAttendees} spaces filled - ${remainingSpaces} spaces left${
+    attending ? " - you are attending." : "."
+  }`;
+}
+
 class AttendanceForm {
   constructor(node) {
     this.eventCard = node;
@@ -6,6 +20,7 @@ class AttendanceForm {
     );
     if (this.attendanceForm) {
       this.getDomData();
+      this.newIdempotencyKey();
       this.handleClick = this.handleClick.bind(this);
       this.attendanceButton.addEventListener("click", this.handleClick);
     }
@@ -45,6 +60,9 @@ class AttendanceForm {
     this.errorMessage.classList.add("hidden");
     try {
       const result = await this.sendAjaxRequest();
+      // Answered - the next click is a new request. A retry after a network
+      // error keeps the key, so the server can tell it is a repeat.
+      this.newIdempotencyKey();
       if (result.success) {
         this.updateAttendanceDescription();
         this.swapButtonType();
@@ -69,6 +87,7 @@ class AttendanceForm {
       body: data,
       headers: {
         "X-CSRFToken": csrfToken,
+        "Idempotency-Key": this.idempotencyKey,
         Accept: "application/json",
       },
     };
@@ -85,38 +104,62 @@ class AttendanceForm {
     return result;
   }
 
+  newIdempotencyKey() {
+    this.idempotencyKey = window.crypto.randomUUID
+      ? window.crypto.randomUUID()
+      : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+  }
+
   updateAttendanceDescription() {
-    if (this.attendanceDescriptionType === "list") {
-      if (this.formAction === "unattend") {
-        this.attendeeCount--;
-        this.attendanceDescription.innerText = `${
-          this.maximumAttendees - this.attendeeCount
-        } spaces left`;
-      } else if (this.formAction === "attend") {
-        this.attendeeCount++;
-        this.attendanceDescription.innerText = `${
-          this.maximumAttendees - this.attendeeCount
-        } spaces left - you are attending`;
-      }
-    } else if (this.attendanceDescriptionType === "detail") {
-      if (this.formAction === "unattend") {
-        this.attendeeCount--;
-        const remainingSpaces = this.maximumAttendees - this.attendeeCount;
-        this.attendanceDescription.innerText = `${this.attendeeCount} ${
-          this.attendeeCount === 1 ? "attendee" : "attendees"
-        } out of ${
-          this.maximumAttendees
-        } spaces filled - ${remainingSpaces} spaces left.`;
-      } else if (this.formAction === "attend") {
-        this.attendeeCount++;
-        const remainingSpaces = this.maximumAttendees - this.attendeeCount;
-        this.attendanceDescription.innerText = `${this.attendeeCount} ${
-          this.attendeeCount === 1 ? "attendee" : "attendees"
-        } out of ${
-          this.maximumAttendees
-        } spaces filled - ${remainingSpaces} spaces left - you are attending.`;
+    if (this.formAction === "unattend") {
+      this.attendeeCount--;
+    } else if (this.formAction === "attend") {
+      this.attendeeCount++;
+    }
+    this.attendanceDescription.innerText = describeAttendance(
+      this.attendanceDescriptionType,
+      this.attendeeCount,
+      this.maximumAttendees,
+      this.formAction === "attend",
+    );
+  }
+
+  setCapacity(attendeeCount, maximumAttendees) {
+    this.attendeeCount = attendeeCount;
+    this.maximumAttendees = maximumAttendees;
+    this.attendanceDescription.innerText = describeAttendance(
+      this.attendanceDescriptionType,
+      this.attendeeCount,
+      this.maximumAttendees,
+      this.formAction === "unattend",
+    );
+    // A full event can still be left, but not joined
+    this.attendanceButton.disabled =
+      this.formAction === "attend" && attendeeCount >= maximumAttendees;
+  }
+
+  // The attendance status endpoint's answer, for a page that was cached or
+  // revalidated - counts, the button and the description alike
+  hydrate(status) {
+    this.eventCard.setAttribute("data-has-user-rsvp", status.has_user_rsvp);
+    if (!this.attendanceForm) {
+      const description = this.eventCard.querySelector(
+        "p[data-attendance-description]",
+      );
+      if (description) {
+        description.innerText = describeAttendance(
+          description.getAttribute("data-attendance-description-type"),
+          status.attendee_count,
+          status.maximum_attendees,
+          status.has_user_rsvp,
+        );
       }
+      return;
     }
+    if ((this.formAction === "unattend") !== status.has_user_rsvp) {
+      this.swapButtonType();
+    }
+    this.setCapacity(status.attendee_count, status.maximum_attendees);
   }
 
   swapButtonType() {
@@ -146,9 +189,87 @@ class AttendanceForm {
   }
 }
 
+// Pages from the cache shared between anonymous users carry the attendance
+// status URL - bring each card's attendance up to date with one request.
+// Other pages were rendered for this user, and revalidate only while current.
+async function hydrateEventCards(attendanceForms) {
+  const container = document.querySelector("[data-attendance-status-url]");
+  if (!container || !attendanceForms.size) {
+    return;
+  }
+
+  const url = `${container.getAttribute("data-attendance-status-url")}?ids=${[
+    ...attendanceForms.keys(),
+  ].join(",")}`;
+  try {
+    const res = await fetch(url, { headers: { Accept: "application/json" } });
+    const result = await res.json();
+    if (!result.success) {
+      return;
+    }
+    attendanceForms.forEach((attendanceForm, id) => {
+      const status = result.events[id];
+      if (status) {
+        attendanceForm.hydrate(status);
+      }
+    });
+  } catch {
+    // The rendered state stays, as it was before hydration
+  }
+}
+
+// Attendee counts pushed by the server as they change, so the page does not
+// offer places that have gone
+function streamCapacities(attendanceForms) {
+  const container = document.querySelector("[data-attendance-stream-url]");
+  if (!container || !window.EventSource || !attendanceForms.size) {
+    return;
+  }
+
+  const url = `${container.getAttribute("data-attendance-stream-url")}?ids=${[
+    ...attendanceForms.keys(),
+  ].join(",")}`;
+  const source = new EventSource(url);
+  source.addEventListener("capacity", (message) => {
+    const capacity = JSON.parse(message.data);
+    const attendanceForm = attendanceForms.get(String(capacity.id));
+    if (!attendanceForm) {
+      return;
+    }
+    if (attendanceForm.attendanceForm) {
+      attendanceForm.setCapacity(
+        capacity.attendee_count,
+        capacity.maximum_attendees,
+      );
+    } else {
+      const eventCard = attendanceForm.eventCard;
+      const description = eventCard.querySelector(
+        "p[data-attendance-description]",
+      );
+      if (description) {
+        description.innerText = describeAttendance(
+          "list",
+          capacity.attendee_count,
+          capacity.maximum_attendees,
+          eventCard.getAttribute("data-has-user-rsvp") === "true",
+        );
+      }
+    }
+  });
+}
+
 document.addEventListener("DOMContentLoaded", () => {
   eventCardNodeList = document.querySelectorAll("article[data-event-card]");
+  const attendanceForms = new Map();
   eventCardNodeList.forEach((eventCard) => {
-    new AttendanceForm(eventCard);
+    const attendanceForm = new AttendanceForm(eventCard);
+    if (eventCard.hasAttribute("data-event-id")) {
+      attendanceForms.set(
+        eventCard.getAttribute("data-event-id"),
+        attendanceForm,
+      );
+    }
   });
+  hydrateEventCards(attendanceForms);
+  streamCapacities(attendanceForms);
 });
@@ -0,0 +1,43 @@
+// Suggest existing contribution items as the organiser types, so requirements
+// are added to "Beer" rather than to a new "beers"
+function suggestContributionItems(input) {
+  const options = document.getElementById(input.getAttribute("list"));
+  const url = input.getAttribute("data-autocomplete-url");
+  let timeout;
+  let controller;
+
+  input.addEventListener("input", () => {
+    clearTimeout(timeout);
+    timeout = setTimeout(async () => {
+      const terms = input.value.trim();
+      if (controller) {
+        controller.abort();
+      }
+      if (!terms) {
+        options.replaceChildren();
+        return;
+      }
+      controller = new AbortController();
+      try {
+        const res = await fetch(`${url}?q=${encodeURIComponent(terms)}`, {
+          headers: { Accept: "application/json" },
+          signal: controller.signal,
+        });
+        const result = await res.json();
+        if (result.success) {
+          options.replaceChildren(
+            ...result.items.map((item) => new Option(item.title)),
+          );
+        }
+      } catch {
+        // Typing on without suggestions is fine
+      }
+    }, 150);
+  });
+}
+
+document.addEventListener("DOMContentLoaded", () => {
+  document
+    .querySelectorAll("input[data-autocomplete-url]")
+    .forEach(suggestContributionItems);
+});
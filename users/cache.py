@@ -0,0 +1,22 @@
+from django.core.cache import caches
+
+USER_KEY = "users:user:{pk}"
+USER_TIMEOUT = 60 * 60
+
+
+def get_shared_cache():
+    # Past the per-process tier, so a password change or deactivation is seen
+    # by every worker at once. Looked up per call, as caches[] is per thread.
+    return caches["shared"]
+
+
+def get_cached_user(pk):
+    return get_shared_cache().get(USER_KEY.format(pk=pk))
+
+
+def cache_user(user):
+    get_shared_cache().set(USER_KEY.format(pk=user.pk), user, USER_TIMEOUT)
+
+
+def forget_user(pk):
+    get_shared_cache().delete(USER_KEY.format(pk=pk))
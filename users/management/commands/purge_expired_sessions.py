@@ -0,0 +1,53 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired sessions from the database in small batches, so the "
+        "session table is never locked for long. Use in place of "
+        "clearsessions, which deletes them all in one statement."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.1,
+            help="Seconds to wait between batches",
+        )
+
+    def handle(self, *args, **options):
+        engine = import_string(f"{settings.SESSION_ENGINE}.SessionStore")
+        if not hasattr(engine, "get_model_class"):
+            self.stdout.write(
+                f"{settings.SESSION_ENGINE} does not keep sessions in the "
+                "database, so there are none to purge"
+            )
+            return
+
+        sessions = engine.get_model_class().objects
+        now = timezone.now()
+        purged = 0
+        while True:
+            batch = list(
+                sessions.filter(expire_date__lt=now).values_list(
+                    "session_key", flat=True
+                )[: options["batch_size"]]
+            )
+            if not batch:
+                break
+            purged += sessions.filter(session_key__in=batch).delete()[0]
+            self.stdout.write(f"Purged {purged} expired sessions")
+            if len(batch) < options["batch_size"]:
+                break
+            time.sleep(options["pause"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully purged {purged} expired sessions")
+        )
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+from .cache import cache_user, get_cached_user
+
+
+def get_user(request):
+    """
+    The session's user, from the shared cache when it is there.
+
+    A cached user is only used if the session's auth hash verifies against
+    it, as auth.get_user would check a user loaded from the database - so a
+    password change still ends every other session. Anything else, such as
+    a session signed with a fallback secret, goes through auth.get_user.
+    """
+    try:
+        user_id = auth._get_user_session_key(request)
+        backend_path = request.session[BACKEND_SESSION_KEY]
+        session_hash = request.session[HASH_SESSION_KEY]
+    except KeyError:
+        return auth.get_user(request)
+
+    user = get_cached_user(user_id)
+    if (
+        user is not None
+        and backend_path in settings.AUTHENTICATION_BACKENDS
+        and constant_time_compare(session_hash, user.get_session_auth_hash())
+    ):
+        return user
+
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache_user(user)
+    return user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    AuthenticationMiddleware that resolves request.user from the shared
+    cache, saving a query per authenticated request. Cached users are
+    dropped whenever the User row is saved or deleted, see users.models.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: self.get_user(request))
+
+    @staticmethod
+    def get_user(request):
+        if not hasattr(request, "_cached_user"):
+            request._cached_user = get_user(request)
+        return request._cached_user
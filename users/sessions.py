@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.contrib.auth import HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+KEY_PREFIX = "users.sessions.write_behind"
+
+
+class SessionStore(CachedDBStore):
+    """
+    Sessions read from and written to the cache, and saved to the database
+    behind it.
+
+    New sessions, including the new key issued at login, are saved to the
+    database straight away, and so is the first save after one is created
+    or the logged in user changes - a session evicted from the cache must
+    never come back logged out, or as someone else. Other changes are saved
+    to the database at most once every settings.SESSION_WRITE_BEHIND_SECONDS
+    per session, so a session evicted from the cache in between is reloaded
+    without them. Use with a SESSION_CACHE_ALIAS shared by every worker.
+    """
+
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self.created = False
+        # The logged in user as last saved to the database
+        self.saved_auth = None
+
+    @staticmethod
+    def get_auth(session):
+        return session.get(SESSION_KEY), session.get(HASH_SESSION_KEY)
+
+    @property
+    def saved_key(self):
+        return f"{self.cache_key}:saved"
+
+    def load(self):
+        session = super().load()
+        # Whether from the cache or the database, as every change of user is
+        # written through to both
+        self.saved_auth = self.get_auth(session)
+        return session
+
+    def create(self):
+        super().create()
+        self.created = True
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        auth = self.get_auth(self._get_session(no_load=must_create))
+        write_through = must_create or self.created or auth != self.saved_auth
+        # add() only succeeds once the last save to the database has expired
+        if write_through or self._cache.add(
+            self.saved_key, True, settings.SESSION_WRITE_BEHIND_SECONDS
+        ):
+            super().save(must_create)
+            self.created = False
+            self.saved_auth = auth
+            if write_through:
+                self._cache.set(
+                    self.saved_key, True, settings.SESSION_WRITE_BEHIND_SECONDS
+                )
+        else:
+            self._cache.set(self.cache_key, self._get_session(), self.get_expiry_age())
+
+    def delete(self, session_key=None):
+        if session_key is None and self.session_key is not None:
+            session_key = self.session_key
+        super().delete(session_key)
+        if session_key is not None:
+            self._cache.delete(f"{self.cache_key_prefix}{session_key}:saved")
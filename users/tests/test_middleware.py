@@ -0,0 +1,89 @@
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import RSVP, Event
+from users.cache import get_cached_user
+from users.models import User
+
+
+class CachedAuthenticationMiddlewareTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="b", password="b")
+        cls.event = Event.objects.create(
+            title="event",
+            organiser=cls.user,
+            contact=cls.user,
+            starts_at=timezone.now() + timezone.timedelta(hours=1),
+            ends_at=timezone.now() + timezone.timedelta(hours=2),
+            location="here",
+            maximum_attendees=15,
+        )
+
+    def setUp(self):
+        caches["shared"].clear()
+        self.client.force_login(self.user)
+
+    def get_user_queries(self, url, method="get"):
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url)
+        return response, [
+            query["sql"] for query in ctx if 'FROM "users_user"' in query["sql"]
+        ]
+
+    def test_user_is_loaded_once_then_cached(self):
+        url = reverse("event_new")
+        _, first_queries = self.get_user_queries(url)
+
+        response, queries = self.get_user_queries(url)
+
+        self.assertEqual(len(queries), len(first_queries) - 1)
+        self.assertEqual(response.context["user"], self.user)
+
+    def test_saving_the_user_drops_the_cached_copy(self):
+        self.client.get(reverse("event_new"))
+
+        self.user.first_name = "Dave"
+        self.user.save()
+
+        self.assertIsNone(get_cached_user(self.user.pk))
+        response = self.client.get(reverse("event_new"))
+        self.assertEqual(response.context["user"].first_name, "Dave")
+
+    def test_password_change_ends_other_sessions(self):
+        self.client.get(reverse("event_new"))
+
+        # As changing the password in another session would
+        self.user.set_password("changed")
+        self.user.save()
+
+        response = self.client.get(reverse("event_new"))
+
+        self.assertRedirects(
+            response, f"{reverse('login')}?next={reverse('event_new')}"
+        )
+
+    def test_deactivated_users_are_logged_out(self):
+        self.client.get(reverse("event_new"))
+
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(reverse("event_new"))
+        self.assertEqual(response.status_code, 302)
+
+    def test_attendance_uses_the_request_user(self):
+        self.client.get(reverse("event_new"))
+        url = reverse(
+            "event_attendance", kwargs={"pk": self.event.pk, "action": "attend"}
+        )
+
+        response, queries = self.get_user_queries(url, method="post")
+
+        self.assertEqual(queries, [])
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(RSVP.objects.filter(event=self.event, user=self.user).exists())
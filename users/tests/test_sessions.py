@@ -0,0 +1,170 @@
+from io import StringIO
+
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import Event
+from users.models import User
+from users.sessions import SessionStore
+
+
+class WriteBehindSessionStoreTestCase(TestCase):
+    def setUp(self):
+        caches["shared"].clear()
+
+    def get_saved_data(self, session):
+        return SessionStore().decode(
+            Session.objects.get(session_key=session.session_key).session_data
+        )
+
+    def test_new_sessions_are_saved_to_the_database(self):
+        session = SessionStore()
+        session["a"] = 1
+        session.save()
+
+        self.assertEqual(self.get_saved_data(session), {"a": 1})
+
+    def test_changes_are_saved_to_the_cache_only(self):
+        session = SessionStore()
+        session["a"] = 1
+        session.save()
+
+        session = SessionStore(session.session_key)
+        session["a"] = 2
+        with self.assertNumQueries(0):
+            session.save()
+
+        self.assertEqual(SessionStore(session.session_key)["a"], 2)
+        self.assertEqual(self.get_saved_data(session), {"a": 1})
+
+    def test_changes_are_saved_to_the_database_behind_the_cache(self):
+        session = SessionStore()
+        session.save()
+        # As if SESSION_WRITE_BEHIND_SECONDS had passed
+        caches["shared"].delete(session.saved_key)
+
+        session["a"] = 2
+        session.save()
+
+        self.assertEqual(self.get_saved_data(session), {"a": 2})
+
+    @override_settings(SESSION_ENGINE="users.sessions")
+    def test_login_is_saved_to_the_database(self):
+        user = User.objects.create_user(username="b", password="b")
+        session = SessionStore()
+        session["a"] = 1
+        session.save()
+
+        # Cycles the key, then sets the user on the new one
+        self.client.cookies["sessionid"] = session.session_key
+        self.client.force_login(user)
+        caches["shared"].clear()
+
+        response = self.client.get(reverse("event_new"))
+        self.assertEqual(response.context["user"], user)
+
+    def test_change_of_user_is_saved_to_the_database(self):
+        session = SessionStore()
+        session["_auth_user_id"] = "1"
+        session.save()
+
+        session = SessionStore(session.session_key)
+        session["_auth_user_id"] = "2"
+        session.save()
+
+        self.assertEqual(self.get_saved_data(session), {"_auth_user_id": "2"})
+
+        session = SessionStore(session.session_key)
+        session["a"] = 1
+        with self.assertNumQueries(0):
+            session.save()
+
+    def test_evicted_sessions_are_loaded_from_the_database(self):
+        session = SessionStore()
+        session["a"] = 1
+        session.save()
+        caches["shared"].clear()
+
+        self.assertEqual(SessionStore(session.session_key)["a"], 1)
+
+    def test_delete_removes_both_copies(self):
+        session = SessionStore()
+        session.save()
+        session_key = session.session_key
+
+        session.delete()
+
+        self.assertFalse(Session.objects.filter(session_key=session_key).exists())
+        self.assertFalse(SessionStore().exists(session_key))
+
+    @override_settings(SESSION_ENGINE="users.sessions")
+    def test_login_and_logout(self):
+        user = User.objects.create_user(username="b", password="b")
+        self.client.force_login(user)
+
+        response = self.client.get(reverse("event_new"))
+        self.assertEqual(response.context["user"], user)
+
+        self.client.logout()
+        response = self.client.get(reverse("event_new"))
+        self.assertRedirects(
+            response, f"{reverse('login')}?next={reverse('event_new')}"
+        )
+
+
+class PurgeExpiredSessionsTestCase(TestCase):
+    def create_sessions(self, prefix, count, expire_date):
+        Session.objects.bulk_create(
+            Session(
+                session_key=f"{prefix}_{i:030}",
+                session_data="",
+                expire_date=expire_date,
+            )
+            for i in range(count)
+        )
+
+    def test_expired_sessions_are_purged_in_batches(self):
+        self.create_sessions("expired", 25, timezone.now() - timezone.timedelta(days=1))
+        self.create_sessions("live", 3, timezone.now() + timezone.timedelta(days=1))
+        output = StringIO()
+
+        call_command("purge_expired_sessions", batch_size=10, pause=0, stdout=output)
+
+        self.assertEqual(Session.objects.count(), 3)
+        self.assertIn("Purged 10 expired sessions", output.getvalue())
+        self.assertIn("Successfully purged 25 expired sessions", output.getvalue())
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies")
+    def test_sessions_outside_the_database_are_left_alone(self):
+        self.create_sessions("expired", 1, timezone.now() - timezone.timedelta(days=1))
+        output = StringIO()
+
+        call_command("purge_expired_sessions", stdout=output)
+
+        self.assertEqual(Session.objects.count(), 1)
+        self.assertIn("none to purge", output.getvalue())
+
+
+class CookieMessageStorageTestCase(TestCase):
+    def test_messages_do_not_need_a_session(self):
+        user = User.objects.create_user(username="b", password="b")
+        event = Event.objects.create(
+            title="event",
+            organiser=user,
+            contact=user,
+            starts_at=timezone.now() + timezone.timedelta(hours=1),
+            ends_at=timezone.now() + timezone.timedelta(hours=2),
+            location="here",
+            maximum_attendees=15,
+        )
+
+        # Sends an anonymous user to log in with a message
+        response = self.client.get(reverse("event_edit", kwargs={"pk": event.pk}))
+
+        self.assertIn("messages", response.cookies)
+        self.assertNotIn("sessionid", response.cookies)
+        self.assertFalse(Session.objects.exists())
@@ -0,0 +1,82 @@
+from http import HTTPStatus
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import (
+    RSVP,
+    ContributionCommitment,
+    ContributionItem,
+    ContributionRequirement,
+    Event,
+)
+from users.models import User
+
+
+class ProfileViewTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organiser = User.objects.create(username="a", password="a")
+        cls.attendee = User.objects.create(username="b", password="b")
+        cls.crisps = ContributionItem.objects.create(title="crisps")
+        cls.dip = ContributionItem.objects.create(title="dip")
+        cls.url = reverse("profile", args=[cls.attendee.username])
+
+    def create_attended_event(self, commitments):
+        event = Event.objects.create(
+            title="event",
+            organiser=self.organiser,
+            contact=self.organiser,
+            starts_at=timezone.now() + timezone.timedelta(hours=1),
+            ends_at=timezone.now() + timezone.timedelta(hours=2),
+            location="here",
+            maximum_attendees=15,
+        )
+        rsvp = RSVP.objects.create(event=event, user=self.attendee)
+        for item, quantity in commitments:
+            for _ in range(quantity):
+                requirement = ContributionRequirement.objects.create(
+                    event=event, contribution_item=item
+                )
+                ContributionCommitment.objects.create(
+                    RSVP=rsvp, contribution_requirement=requirement
+                )
+        return event
+
+    def test_commitments_totalled_by_item(self):
+        event = self.create_attended_event([(self.crisps, 2), (self.dip, 1)])
+        other_rsvp = RSVP.objects.create(event=event, user=self.organiser)
+        ContributionCommitment.objects.create(
+            RSVP=other_rsvp,
+            contribution_requirement=ContributionRequirement.objects.create(
+                event=event, contribution_item=self.dip
+            ),
+        )
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        (event,) = response.context["events"]
+        self.assertEqual(
+            event.commitments_for_user_by_item, [("crisps", 2), ("dip", 1)]
+        )
+
+    def test_query_count_does_not_grow_with_events(self):
+        self.create_attended_event([(self.crisps, 1)])
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url)
+        queries_for_one_event = len(ctx.captured_queries)
+
+        for _ in range(3):
+            self.create_attended_event([(self.crisps, 1), (self.dip, 2)])
+
+        with self.assertNumQueries(queries_for_one_event):
+            self.client.get(self.url)
+
+    def test_unknown_username_returns_404(self):
+        response = self.client.get(reverse("profile", args=["nobody"]))
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
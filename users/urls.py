@@ -1,7 +1,13 @@
+from django.conf import settings
 from django.urls import path
 
 from . import views
 
+if settings.EVENTS_ASYNC_VIEWS:
+    ProfileView = views.AsyncProfileView
+else:
+    ProfileView = views.ProfileView
+
 urlpatterns = [
-    path("<str:username>/", views.ProfileView.as_view(), name="profile"),
+    path("<str:username>/", ProfileView.as_view(), name="profile"),
 ]
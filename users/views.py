@@ -1,13 +1,11 @@
+import asyncio
+
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.views.generic import DetailView
 
-from events.models import (
-    RSVP,
-    ContributionCommitment,
-    ContributionItem,
-    ContributionRequirement,
-    Event,
-)
+from events.loaders import aattach_user_commitments, alist, attach_user_commitments
+from events.models import Event
 
 from .models import Profile, User
 
@@ -20,38 +18,48 @@ class ProfileView(DetailView):
 
     def get_object(self):
         username = self.kwargs.get("username")
-        user = get_object_or_404(User, username=username)
-        return get_object_or_404(Profile, user=user)
+        return get_object_or_404(
+            Profile.objects.select_related("user"), user__username=username
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.get_object().user
-        events = Event.objects.for_user(user).in_future()
-        past_events = Event.objects.for_user(user).in_past()
-        for event in events:
-            rsvp = RSVP.objects.get(user=user, event=event)
-            items_pks = ContributionItem.objects.filter_for_event(event).values_list(
-                "pk", flat=True
-            )
-            requirements_pks = ContributionRequirement.objects.filter(
-                event=event, contribution_item__in=items_pks
-            ).values_list("pk", flat=True)
-
-            commitments = ContributionCommitment.objects.select_related(
-                "contribution_requirement__contribution_item"
-            ).filter(RSVP=rsvp, contribution_requirement__in=requirements_pks)
-            commitment_dict = {}
-            for commitment in commitments:
-                contribution_item_title = (
-                    commitment.contribution_requirement.contribution_item.title
-                )
-                commitment_dict[contribution_item_title] = (
-                    commitment_dict.get(contribution_item_title, 0) + 1
-                )
-            event.commitments_for_user_by_item = [
-                (key, value) for key, value in commitment_dict.items()
-            ]
-
-        context["events"] = events
-        context["past_events"] = past_events
+        context["events"], context["past_events"] = self.get_events()
         return context
+
+    def get_events(self):
+        user = self.object.user
+        events = list(Event.objects.for_user(user).in_future())
+        past_events = list(Event.objects.for_user(user).in_past())
+        attach_user_commitments(events + past_events, user)
+        return events, past_events
+
+
+class AsyncProfileView(ProfileView):
+    """
+    ProfileView with the async ORM, for the ASGI application. The profile
+    and the user's future and past events are loaded at once with
+    asyncio.gather, then what the user is bringing to them.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        username = self.kwargs.get("username")
+        # By username, so the events need not wait for the profile
+        user = User.objects.filter(username=username).values("pk")[:1]
+        self.object, events, past_events = await asyncio.gather(
+            Profile.objects.select_related("user")
+            .filter(user__username=username)
+            .afirst(),
+            alist(Event.objects.for_user(user).in_future()),
+            alist(Event.objects.for_user(user).in_past()),
+        )
+        if self.object is None:
+            raise Http404("No profile found matching the query")
+        await aattach_user_commitments(events + past_events, self.object.user)
+        self.events = events, past_events
+
+        context = self.get_context_data(object=self.object)
+        return self.render_to_response(context)
+
+    def get_events(self):
+        return self.events